@@ -1,8 +1,8 @@
 import { NextResponse } from 'next/server'
-import { spawn } from 'child_process'
 import path from 'path'
 import { createClient } from '@supabase/supabase-js'
 import { neo4jService } from '../../../../lib/neo4j.js'
+import { runAceAgent } from '../../../../lib/aceAgentWorker.js'
 
 async function ensureEnvLoaded() {
   if (process.env.GEMINI_API_KEY) return
@@ -131,74 +131,13 @@ export async function POST(request) {
       conversation_id: conversationId ?? null
     }
 
-    const scriptPath = path.join(process.cwd(), 'scripts', 'run_ace_agent.py')
-    const scriptCwd = path.join(process.cwd(), 'scripts')
-    const pythonPathParts = [scriptCwd]
-    if (process.env.PYTHONPATH) {
-      pythonPathParts.push(process.env.PYTHONPATH)
+    const threadId = conversationId ? `ace-thread-${conversationId}` : undefined
+    const payload = { messages, scratch }
+    if (threadId) {
+      payload.thread_id = threadId
     }
 
-    const childEnv = {
-      ...process.env,
-      GEMINI_API_KEY: process.env.GEMINI_API_KEY,
-      GEMINI_MODEL: process.env.GEMINI_MODEL ?? 'gemini-2.5-flash',
-      ACE_LLM_TEMPERATURE: process.env.ACE_LLM_TEMPERATURE ?? '0.2',
-      PYTHONPATH: pythonPathParts.join(path.delimiter)
-    }
-
-    const stdout = await new Promise((resolve, reject) => {
-      // Use custom Python path if provided, otherwise default to 'python3'
-      const pythonCmd = process.env.PYTHON_PATH || 'python3'
-      const py = spawn(pythonCmd, [scriptPath], {
-        cwd: scriptCwd,
-        env: childEnv
-      })
-
-      let out = ''
-      let err = ''
-
-      py.stdout.on('data', (data) => {
-        out += data.toString()
-      })
-
-      py.stderr.on('data', (data) => {
-        const text = data.toString()
-        err += text
-        // Surface ACE runner logs in the Next.js console for visibility
-        process.stderr.write(text)
-      })
-
-      py.on('error', (spawnError) => reject(spawnError))
-
-      py.on('close', (code) => {
-        if (code !== 0) {
-          const errorMessage = (err || out || `ACE agent exited with code ${code}`).trim()
-          let parsed
-          try {
-            parsed = JSON.parse(errorMessage)
-          } catch {
-            parsed = null
-          }
-          if (parsed && typeof parsed === 'object') {
-            const errorObj = new Error(parsed.error || 'ACE agent failed')
-            errorObj.details = parsed
-            return reject(errorObj)
-          }
-          return reject(new Error(errorMessage))
-        }
-        return resolve(out)
-      })
-
-      const threadId = conversationId ? `ace-thread-${conversationId}` : undefined
-      const payload = { messages, scratch }
-      if (threadId) {
-        payload.thread_id = threadId
-      }
-      py.stdin.write(JSON.stringify(payload))
-      py.stdin.end()
-    })
-
-    const parsed = JSON.parse(stdout)
+    const parsed = await runAceAgent(payload)
     if (parsed.error) {
       const err = new Error(parsed.error)
       err.details = parsed
@@ -0,0 +1,234 @@
+import { spawn } from 'child_process'
+import path from 'path'
+import readline from 'readline'
+
+const DEFAULT_TIMEOUT_MS = 120 * 1000
+
+function buildChildEnv() {
+  const scriptCwd = path.join(process.cwd(), 'scripts')
+  const pythonPathParts = [scriptCwd]
+  if (process.env.PYTHONPATH) {
+    pythonPathParts.push(process.env.PYTHONPATH)
+  }
+
+  return {
+    ...process.env,
+    GEMINI_API_KEY: process.env.GEMINI_API_KEY,
+    GEMINI_MODEL: process.env.GEMINI_MODEL ?? 'gemini-2.5-flash',
+    ACE_LLM_TEMPERATURE: process.env.ACE_LLM_TEMPERATURE ?? '0.2',
+    PYTHONPATH: pythonPathParts.join(path.delimiter)
+  }
+}
+
+function scriptLocation() {
+  const scriptCwd = path.join(process.cwd(), 'scripts')
+  return {
+    scriptCwd,
+    scriptPath: path.join(scriptCwd, 'run_ace_agent.py'),
+    pythonCmd: process.env.PYTHON_PATH || 'python3'
+  }
+}
+
+/**
+ * Run the ACE agent in a fresh Python process (one process per request).
+ * Kept as a fallback for ACE_RUNNER_MODE=spawn.
+ *
+ * The runner writes its answer as the first stdout line and only then
+ * drains background learning and queued memory saves, so the promise
+ * settles on that line instead of waiting for the process to exit.
+ */
+export function runAceAgentOnce(payload) {
+  const { scriptCwd, scriptPath, pythonCmd } = scriptLocation()
+
+  return new Promise((resolve, reject) => {
+    const py = spawn(pythonCmd, [scriptPath], {
+      cwd: scriptCwd,
+      env: buildChildEnv()
+    })
+
+    let settled = false
+    let out = ''
+    let err = ''
+
+    const settle = (fn, value) => {
+      if (settled) return
+      settled = true
+      fn(value)
+    }
+
+    const rejectWith = (parsed) => {
+      const errorObj = new Error(parsed.error || 'ACE agent failed')
+      errorObj.details = parsed
+      settle(reject, errorObj)
+    }
+
+    const lines = readline.createInterface({ input: py.stdout })
+    lines.on('line', (line) => {
+      out += `${line}\n`
+      if (settled || !line.trim()) return
+      let message
+      try {
+        message = JSON.parse(line)
+      } catch {
+        return
+      }
+      if (message && typeof message === 'object') {
+        if (message.error) {
+          rejectWith(message)
+        } else {
+          settle(resolve, message)
+        }
+      }
+    })
+
+    py.stderr.on('data', (data) => {
+      const text = data.toString()
+      err += text
+      // Surface ACE runner logs in the Next.js console for visibility
+      process.stderr.write(text)
+    })
+
+    py.on('error', (spawnError) => settle(reject, spawnError))
+
+    py.on('close', (code) => {
+      if (settled) return
+      if (code !== 0) {
+        const errorMessage = (err || out || `ACE agent exited with code ${code}`).trim()
+        let parsed
+        try {
+          parsed = JSON.parse(errorMessage)
+        } catch {
+          parsed = null
+        }
+        if (parsed && typeof parsed === 'object') {
+          return rejectWith(parsed)
+        }
+        return settle(reject, new Error(errorMessage))
+      }
+      try {
+        return settle(resolve, JSON.parse(out))
+      } catch (parseError) {
+        return settle(reject, parseError)
+      }
+    })
+
+    py.stdin.write(JSON.stringify(payload))
+    py.stdin.end()
+  })
+}
+
+/**
+ * Long-lived `run_ace_agent.py --serve` process.
+ *
+ * Requests are written as one JSON line each and tagged with an id; the
+ * worker answers with one JSON line carrying the same id, so several chats
+ * can be in flight at once. The process is respawned lazily if it exits.
+ */
+class AceAgentWorker {
+  constructor() {
+    this.process = null
+    this.pending = new Map()
+    this.nextId = 1
+  }
+
+  start() {
+    if (this.process) {
+      return this.process
+    }
+
+    const { scriptCwd, scriptPath, pythonCmd } = scriptLocation()
+    const py = spawn(pythonCmd, [scriptPath, '--serve'], {
+      cwd: scriptCwd,
+      env: buildChildEnv()
+    })
+
+    py.stderr.on('data', (data) => {
+      process.stderr.write(data.toString())
+    })
+
+    const lines = readline.createInterface({ input: py.stdout })
+    lines.on('line', (line) => this.handleLine(line))
+
+    py.on('error', (spawnError) => this.handleExit(spawnError))
+    py.on('close', (code) => {
+      this.handleExit(new Error(`ACE worker exited with code ${code}`))
+    })
+
+    this.process = py
+    return py
+  }
+
+  handleLine(line) {
+    if (!line.trim()) return
+
+    let message
+    try {
+      message = JSON.parse(line)
+    } catch {
+      console.warn('[ACE Worker] Ignoring non-JSON output:', line)
+      return
+    }
+
+    if (message.ready) {
+      console.log(`[ACE Worker] Ready (pid=${message.pid})`)
+      return
+    }
+
+    const entry = this.pending.get(message.id)
+    if (!entry) return
+    this.pending.delete(message.id)
+    clearTimeout(entry.timer)
+
+    if (message.error) {
+      const errorObj = new Error(message.error)
+      errorObj.details = message
+      entry.reject(errorObj)
+    } else {
+      entry.resolve(message)
+    }
+  }
+
+  handleExit(error) {
+    this.process = null
+    for (const entry of this.pending.values()) {
+      clearTimeout(entry.timer)
+      entry.reject(error)
+    }
+    this.pending.clear()
+  }
+
+  request(payload, { timeoutMs } = {}) {
+    const py = this.start()
+    const id = `req-${this.nextId++}`
+    const limit = timeoutMs ?? (Number(process.env.ACE_RUNNER_TIMEOUT_MS) || DEFAULT_TIMEOUT_MS)
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id)
+        reject(new Error(`ACE worker timed out after ${limit}ms`))
+      }, limit)
+
+      this.pending.set(id, { resolve, reject, timer })
+      py.stdin.write(JSON.stringify({ ...payload, id }) + '\n')
+    })
+  }
+}
+
+// Reuse one worker across hot reloads in development
+const globalForAce = globalThis
+if (!globalForAce.__aceAgentWorker) {
+  globalForAce.__aceAgentWorker = new AceAgentWorker()
+}
+
+export const aceAgentWorker = globalForAce.__aceAgentWorker
+
+/**
+ * Run the ACE agent with the configured runner mode.
+ * ACE_RUNNER_MODE=spawn restores the one-process-per-request behaviour.
+ */
+export function runAceAgent(payload) {
+  if ((process.env.ACE_RUNNER_MODE || 'resident') === 'spawn') {
+    return runAceAgentOnce(payload)
+  }
+  return aceAgentWorker.request(payload)
+}
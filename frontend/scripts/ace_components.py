@@ -7,7 +7,7 @@ Implements the three-role architecture from the ACE paper:
 3. Curator: Synthesizes lessons into delta updates
 """
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import json
 import os
@@ -17,8 +17,16 @@ import sys
 # Add project root to path to import prompts
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from ace_memory import Bullet, DeltaUpdate, ACEMemory
-from prompts.ace_memory_prompts import REFLECTOR_PROMPT, CURATOR_PROMPT
+from ace_memory import Bullet, DeltaUpdate, ACEMemory, RETRIEVAL_CACHE_KEY
+from prompts.ace_memory_prompts import (
+    CURATOR_PROMPT,
+    REFLECTOR_BATCH_PROMPT,
+    REFLECTOR_BATCH_TRACE,
+    REFLECTOR_PROMPT,
+)
+
+# Traces packed into one Reflector request by reflect_batch()
+DEFAULT_REFLECT_BATCH_SIZE = int(os.getenv("ACE_REFLECT_BATCH_SIZE", "4"))
 
 
 # ============== COMPONENTS ==============
@@ -93,6 +101,87 @@ class Reflector:
             success="✓ Success" if trace.success else "✗ Failed",
         )
         
+        lessons_data = self._request_json(prompt, "lessons", max_refinement_rounds, max_tokens=2000)
+        return lessons_data["lessons"] if lessons_data else []
+
+    def reflect_batch(
+        self,
+        traces: List[ExecutionTrace],
+        max_refinement_rounds: int = 3,
+        batch_size: Optional[int] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Reflect on several execution traces with one LLM call per batch.
+
+        The traces share a single prompt preamble and the response holds one
+        lesson array per trace. A batch whose response cannot be parsed is
+        reflected on trace by trace instead.
+
+        Args:
+            traces: The execution traces to analyze (any mix of learners)
+            max_refinement_rounds: Number of refinement iterations per call
+            batch_size: Traces per request (default ACE_REFLECT_BATCH_SIZE)
+
+        Returns:
+            One list of lessons per trace, in the order of ``traces``
+        """
+        size = max(1, batch_size or DEFAULT_REFLECT_BATCH_SIZE)
+        results: List[List[Dict[str, Any]]] = []
+        for start in range(0, len(traces), size):
+            chunk = traces[start:start + size]
+            if len(chunk) == 1:
+                results.append(self.reflect(chunk[0], max_refinement_rounds))
+            else:
+                results.extend(self._reflect_chunk(chunk, max_refinement_rounds))
+        return results
+
+    def _reflect_chunk(
+        self,
+        traces: List[ExecutionTrace],
+        max_refinement_rounds: int,
+    ) -> List[List[Dict[str, Any]]]:
+        blocks = [
+            REFLECTOR_BATCH_TRACE.format(
+                index=idx,
+                trace=trace.format_trace(),
+                question=trace.question,
+                ground_truth=trace.ground_truth or "Not available",
+                model_answer=trace.model_answer,
+                success="✓ Success" if trace.success else "✗ Failed",
+            )
+            for idx, trace in enumerate(traces, 1)
+        ]
+        prompt = REFLECTOR_BATCH_PROMPT.format(count=len(traces), traces="\n\n".join(blocks))
+        data = self._request_json(
+            prompt,
+            "traces",
+            max_refinement_rounds,
+            max_tokens=min(2000 * len(traces), 8000),
+        )
+        if data is None:
+            print(f"[Reflector] Batch of {len(traces)} traces failed; reflecting one at a time")
+            return [self.reflect(trace, max_refinement_rounds) for trace in traces]
+
+        lessons: List[List[Dict[str, Any]]] = [[] for _ in traces]
+        for pos, entry in enumerate(data["traces"]):
+            if not isinstance(entry, dict) or not isinstance(entry.get("lessons"), list):
+                continue
+            try:
+                idx = int(entry.get("index", pos + 1)) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= idx < len(traces):
+                lessons[idx] = [lesson for lesson in entry["lessons"] if isinstance(lesson, dict)]
+        return lessons
+
+    def _request_json(
+        self,
+        prompt: str,
+        key: str,
+        max_refinement_rounds: int,
+        max_tokens: int,
+    ) -> Optional[Dict[str, Any]]:
+        """Ask for JSON holding ``key``, re-prompting on invalid output."""
         # Call LLM with strict JSON-only instructions
         messages = [
             {
@@ -110,16 +199,16 @@ class Reflector:
                 response = self.llm.chat(
                     messages,
                     temperature=0.3,
-                    max_tokens=2000,
+                    max_tokens=max_tokens,
                 )
                 
                 content = response["choices"][0]["message"]["content"]
                 
                 # Parse JSON response
-                lessons_data = self._parse_json_response(content)
+                data = self._parse_json_response(content)
                 
-                if lessons_data and "lessons" in lessons_data:
-                    return lessons_data["lessons"]
+                if isinstance(data, dict) and isinstance(data.get(key), list):
+                    return data
                 
                 # If parsing failed, try refinement
                 if round_num < max_refinement_rounds - 1:
@@ -132,9 +221,9 @@ class Reflector:
             except Exception as e:
                 print(f"[Reflector] Error in round {round_num + 1}: {e}")
                 if round_num == max_refinement_rounds - 1:
-                    return []
+                    return None
         
-        return []
+        return None
     
     def _parse_json_response(self, content: str) -> Optional[Dict[str, Any]]:
         """Parse JSON from LLM response, handling markdown code blocks"""
@@ -367,6 +456,8 @@ class Curator:
         learner_id: Optional[str] = None,
         topic: Optional[str] = None,
         facets: Optional[Dict[str, Any]] = None,
+        retrieval_cache: Optional[Dict[str, Any]] = None,
+        retrieval_query: Optional[str] = None,
         **_: Any,
     ) -> DeltaUpdate:
         """
@@ -377,6 +468,8 @@ class Curator:
             query: The original query (for retrieving relevant bullets)
             learner_id: Optional learner identifier for personalised bullets
             topic: Optional inferred topic for improved tagging
+            retrieval_cache: Per-turn cache from ``ACEMemory.retrieve_for_turn``
+            retrieval_query: Query the turn's ranking was keyed by (defaults to ``query``)
         
         Returns:
             DeltaUpdate to apply to memory
@@ -387,13 +480,23 @@ class Curator:
         use_llm = os.getenv("ACE_CURATOR_USE_LLM", "false").lower() in {"1", "true", "yes"}
 
         # Get relevant current bullets for context
-        relevant_bullets = self.memory.retrieve_relevant_bullets(
-            query,
-            top_k=10,
-            learner_id=learner_id,
-            topic=topic,
-            facets=facets,
-        )
+        if retrieval_cache is not None:
+            relevant_bullets = self.memory.retrieve_for_turn(
+                retrieval_cache,
+                retrieval_query or query,
+                top_k=10,
+                learner_id=learner_id,
+                topic=topic,
+                facets=facets,
+            )
+        else:
+            relevant_bullets = self.memory.retrieve_relevant_bullets(
+                query,
+                top_k=10,
+                learner_id=learner_id,
+                topic=topic,
+                facets=facets,
+            )
         current_bullets_str = "\n".join(
             f"ID: {b.id}\n{b.format_for_prompt()}\nType: {b.memory_type} | Learner: {b.learner_id} | Topic: {b.topic}"
             for b in relevant_bullets
@@ -588,7 +691,52 @@ class ACEPipeline:
         # Step 1: Reflector extracts lessons
         print("[ACE Pipeline] Step 1: Reflecting on execution...")
         lessons = self.reflector.reflect(trace)
-        
+        return self._curate_execution(trace, lessons, apply_update)
+
+    def process_executions(
+        self,
+        traces: List[ExecutionTrace],
+        apply_update: bool = True,
+        pipeline_for: Optional[Callable[[Optional[str]], "ACEPipeline"]] = None,
+    ) -> List[Optional[DeltaUpdate]]:
+        """
+        Process several execution traces with batched reflection.
+
+        Lessons for every trace come from ``Reflector.reflect_batch`` (one LLM
+        call per batch); each trace is then curated against its own
+        learner's memory.
+
+        Args:
+            traces: The execution traces, possibly from different learners
+            apply_update: Whether to apply the deltas to memory
+            pipeline_for: Returns the pipeline that curates a learner's
+                traces; defaults to this pipeline for every trace
+
+        Returns:
+            One delta per trace (None where curation failed)
+        """
+        print(f"[ACE Pipeline] Processing {len(traces)} executions...")
+        print("[ACE Pipeline] Step 1: Reflecting on executions (batched)...")
+        lesson_sets = self.reflector.reflect_batch(traces)
+
+        deltas: List[Optional[DeltaUpdate]] = []
+        for trace, lessons in zip(traces, lesson_sets):
+            learner_id, _, _ = _trace_context(trace)
+            try:
+                target = pipeline_for(learner_id) if pipeline_for is not None else self
+                deltas.append(target._curate_execution(trace, lessons, apply_update))
+            except Exception as exc:
+                print(f"[ACE Pipeline] Curation failed for learner={learner_id}: {exc}", flush=True)
+                deltas.append(None)
+        return deltas
+
+    def _curate_execution(
+        self,
+        trace: ExecutionTrace,
+        lessons: List[Dict[str, Any]],
+        apply_update: bool,
+    ) -> DeltaUpdate:
+        """Steps 2 and 3: curate a trace's lessons and apply the delta."""
         if not lessons:
             print("[ACE Pipeline] No lessons extracted; using heuristic fallback")
             lessons = self._fallback_lessons(trace)
@@ -604,17 +752,20 @@ class ACEPipeline:
                 flush=True,
             )
 
-        metadata = trace.metadata or {}
-        scratch_state = metadata.get("scratch") if isinstance(metadata, dict) else {}
-        if not isinstance(scratch_state, dict):
-            scratch_state = {}
-        learner_id = metadata.get("learner_id") or scratch_state.get("learner_id")
-        topic = scratch_state.get("topic") or _infer_topic_from_text(trace.question)
+        learner_id, topic, scratch_state = _trace_context(trace)
 
         # Step 2: Curator creates delta update
         print("[ACE Pipeline] Step 2: Curating delta update...")
-        facets = scratch_state.get("ace_retrieval_facets") if isinstance(scratch_state, dict) else None
-        delta = self.curator.curate(lessons, trace.question, learner_id=learner_id, topic=topic, facets=facets)
+        facets = scratch_state.get("ace_retrieval_facets")
+        delta = self.curator.curate(
+            lessons,
+            trace.question,
+            learner_id=learner_id,
+            topic=topic,
+            facets=facets,
+            retrieval_cache=scratch_state.get(RETRIEVAL_CACHE_KEY),
+            retrieval_query=scratch_state.get("ace_latest_question"),
+        )
 
         print(f"[ACE Pipeline] Created delta: {len(delta.new_bullets)} new, "
               f"{len(delta.update_bullets)} updates, {len(delta.remove_bullets)} removals")
@@ -678,6 +829,17 @@ class ACEPipeline:
             return f"{base_prompt}\n\nQuestion: {question}"
 
 
+def _trace_context(trace: ExecutionTrace) -> Tuple[Optional[str], Optional[str], Dict[str, Any]]:
+    """Learner id, topic and scratch state recorded on a trace."""
+    metadata = trace.metadata or {}
+    scratch_state = metadata.get("scratch") if isinstance(metadata, dict) else {}
+    if not isinstance(scratch_state, dict):
+        scratch_state = {}
+    learner_id = metadata.get("learner_id") or scratch_state.get("learner_id")
+    topic = scratch_state.get("topic") or _infer_topic_from_text(trace.question)
+    return learner_id, topic, scratch_state
+
+
 def _infer_topic_from_text(text: str) -> Optional[str]:
     lowered = (text or "").lower()
     if "fraction" in lowered or "/" in lowered:
@@ -0,0 +1,154 @@
+"""
+Background queue for the ACE learning stage.
+
+With ``ACE_LEARNING_MODE=background`` the graph's ``ace_learning`` node only
+hands the turn's ``ExecutionTrace`` to this queue, so the answer is returned
+without waiting for the Reflector/Curator LLM calls or the memory save.
+
+- ``ACE_LEARNING_WORKERS`` threads run the handler (default 2). Traces for
+  the same learner are processed one at a time.
+- At most ``ACE_LEARNING_MAX_PENDING`` traces wait or run at once (default 32).
+  When the queue is full, ``submit`` blocks for up to
+  ``ACE_LEARNING_SUBMIT_TIMEOUT_S`` seconds and then learns inline, so
+  lessons are slowed down rather than dropped.
+- With a ``batch_handler``, traces that pile up while every worker is busy
+  are handed over together (up to ``ACE_LEARNING_BATCH_SIZE``, default 4) so
+  the Reflector can cover them in one LLM call. An idle queue still hands
+  over one trace at a time.
+- ``drain()`` waits for queued work; it is registered with ``atexit`` and
+  called by the runner before the process exits.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import os
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_WORKERS = int(os.getenv("ACE_LEARNING_WORKERS", "2"))
+DEFAULT_MAX_PENDING = int(os.getenv("ACE_LEARNING_MAX_PENDING", "32"))
+DEFAULT_SUBMIT_TIMEOUT = float(os.getenv("ACE_LEARNING_SUBMIT_TIMEOUT_S", "2"))
+DEFAULT_MAX_BATCH = int(os.getenv("ACE_LEARNING_BATCH_SIZE", "4"))
+
+LearningItem = Tuple[Optional[str], Any, bool]
+
+
+def background_learning_enabled() -> bool:
+    return os.getenv("ACE_LEARNING_MODE", "inline").strip().lower() == "background"
+
+
+class LearningQueue:
+    """
+    Bounded thread pool that runs ``handler(learner_id, trace, apply_update)``.
+
+    When ``batch_handler`` is given, queued traces are instead passed to
+    ``batch_handler(items)`` as lists of ``(learner_id, trace, apply_update)``.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Optional[str], Any, bool], Any],
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        submit_timeout: Optional[float] = None,
+        batch_handler: Optional[Callable[[List[LearningItem]], Any]] = None,
+        max_batch: Optional[int] = None,
+    ):
+        self.handler = handler
+        self.max_workers = max(1, DEFAULT_WORKERS if max_workers is None else max_workers)
+        self.max_pending = max(1, DEFAULT_MAX_PENDING if max_pending is None else max_pending)
+        self.submit_timeout = DEFAULT_SUBMIT_TIMEOUT if submit_timeout is None else submit_timeout
+        self.batch_handler = batch_handler
+        self.max_batch = max(1, DEFAULT_MAX_BATCH if max_batch is None else max_batch)
+        self._backlog: Deque[LearningItem] = deque()
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="ace-learning")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._learner_locks: Dict[Optional[str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Condition()
+        atexit.register(self.drain)
+
+    @property
+    def pending(self) -> int:
+        with self._idle:
+            return self._pending
+
+    def submit(self, learner_id: Optional[str], trace: Any, apply_update: bool = True) -> bool:
+        """Queue a trace; returns False when it had to be learned inline (queue full)."""
+        if not self._slots.acquire(timeout=self.submit_timeout):
+            print(
+                f"[ACE Learning] Queue full ({self.max_pending} pending); learning inline for learner={learner_id}",
+                flush=True,
+            )
+            self._run(learner_id, trace, apply_update)
+            return False
+        with self._idle:
+            self._pending += 1
+            if self.batch_handler is not None:
+                self._backlog.append((learner_id, trace, apply_update))
+        if self.batch_handler is not None:
+            self._executor.submit(self._batch_job)
+        else:
+            self._executor.submit(self._job, learner_id, trace, apply_update)
+        return True
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued trace is processed; False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def _learner_lock(self, learner_id: Optional[str]) -> threading.Lock:
+        with self._locks_guard:
+            return self._learner_locks.setdefault(learner_id, threading.Lock())
+
+    def _job(self, learner_id: Optional[str], trace: Any, apply_update: bool) -> None:
+        try:
+            self._run(learner_id, trace, apply_update)
+        finally:
+            self._done(1)
+
+    def _batch_job(self) -> None:
+        # One job is submitted per trace; earlier jobs may already have taken
+        # this one's trace as part of their batch.
+        with self._idle:
+            items = [self._backlog.popleft() for _ in range(min(self.max_batch, len(self._backlog)))]
+        if not items:
+            return
+        try:
+            self._run_batch(items)
+        finally:
+            self._done(len(items))
+
+    def _done(self, count: int) -> None:
+        for _ in range(count):
+            self._slots.release()
+        with self._idle:
+            self._pending -= count
+            if not self._pending:
+                self._idle.notify_all()
+
+    def _run(self, learner_id: Optional[str], trace: Any, apply_update: bool) -> None:
+        with self._learner_lock(learner_id):
+            try:
+                self.handler(learner_id, trace, apply_update)
+            except Exception as exc:
+                print(f"[ACE Learning] Background error for learner={learner_id}: {exc}", flush=True)
+                traceback.print_exc()
+
+    def _run_batch(self, items: List[LearningItem]) -> None:
+        learners = sorted({item[0] for item in items}, key=lambda lid: (lid is not None, str(lid)))
+        # Locks are always taken in sorted order, so batches cannot deadlock
+        with contextlib.ExitStack() as stack:
+            for learner_id in learners:
+                stack.enter_context(self._learner_lock(learner_id))
+            try:
+                self.batch_handler(items)
+            except Exception as exc:
+                print(f"[ACE Learning] Background error for learners={learners}: {exc}", flush=True)
+                traceback.print_exc()
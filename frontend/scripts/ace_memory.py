@@ -8,19 +8,55 @@ Implements the core memory system from the ACE paper:
 - Semantic deduplication
 """
 
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
+import copy
+import functools
 import json
 import hashlib
 import re
+import threading
 from pathlib import Path
 from collections import defaultdict
 import numpy as np
 import math
 import os
+import zlib
 
 DEFAULT_MEMORY_STRENGTH = float(os.getenv("ACE_MEMORY_BASE_STRENGTH", "100.0"))
+RETRIEVAL_CACHE_KEY = "_ace_retrieval_cache"  # scratch slot for ACEMemory.retrieve_for_turn
+# Reload/re-apply attempts when another writer saved the same learner first
+DEFAULT_SAVE_RETRIES = int(os.getenv("ACE_MEMORY_SAVE_RETRIES", "3"))
+
+# MinHash: h_i(x) = (a_i * crc32(x) + b_i) mod p with p prime > 2**32, so every
+# product fits in uint64. Seeded so signatures are identical across processes.
+_MINHASH_PRIME = np.uint64(4294967311)
+_MINHASH_SEED = 0xACE
+_MINHASH_PARAMS: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _minhash_params(num_perm: int) -> Tuple[np.ndarray, np.ndarray]:
+    params = _MINHASH_PARAMS.get(num_perm)
+    if params is None:
+        rng = np.random.default_rng(_MINHASH_SEED)
+        a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+        params = _MINHASH_PARAMS[num_perm] = (a, b)
+    return params
+
+
+def minhash_signature(tokens: Set[str], num_perm: int = 64) -> Optional[np.ndarray]:
+    """MinHash signature of a token set (None for an empty set)."""
+    if not tokens:
+        return None
+    a, b = _minhash_params(num_perm)
+    hashes = np.fromiter(
+        (zlib.crc32(token.encode("utf-8")) for token in tokens),
+        dtype=np.uint64,
+        count=len(tokens),
+    )
+    return ((np.outer(a, hashes) + b[:, None]) % _MINHASH_PRIME).min(axis=1)
 
 
 @dataclass
@@ -52,6 +88,9 @@ class Bullet:
     memory_type: Optional[str] = None  # semantic, episodic, procedural
     ttl_days: Optional[int] = None
     content_hash: Optional[str] = None
+    minhash: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # LSH signature (not persisted)
+    _token_cache: Optional[FrozenSet[str]] = field(default=None, init=False, repr=False, compare=False)
+    _token_cache_key: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Generate ID from content if not provided"""
@@ -103,6 +142,14 @@ class Bullet:
     def _compute_hash(text: str) -> str:
         normalized = re.sub(r"\s+", " ", (text or "").strip().lower())
         return hashlib.sha256(normalized.encode()).hexdigest()
+
+    def tokens(self) -> FrozenSet[str]:
+        """Lowercased word set used for similarity scoring, cached per content hash."""
+        key = self.content_hash or self._compute_hash(self.content)
+        if self._token_cache is None or self._token_cache_key != key:
+            self._token_cache = frozenset(self.content.lower().split())
+            self._token_cache_key = key
+        return self._token_cache
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
@@ -176,6 +223,26 @@ class Bullet:
         return max(DEFAULT_MEMORY_STRENGTH, DEFAULT_MEMORY_STRENGTH + float(delta))
 
 
+class MemoryConflictError(Exception):
+    """Raised by a storage adapter when a save's expected version is stale."""
+
+
+def _synchronized(method):
+    """
+    Run an ACEMemory method under the instance lock.
+
+    Write-behind saves and background learning touch the playbook from other
+    threads while ``reload_from_storage`` may rebuild its indexes.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 @dataclass
 class DeltaUpdate:
     """
@@ -188,6 +255,115 @@ class DeltaUpdate:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+MEMORY_COMPONENTS = ("semantic", "episodic", "procedural")
+
+
+class _ScoreColumns:
+    """
+    Columnar copy of the per-bullet fields used for retrieval scoring.
+
+    One row per registered bullet; removal moves the last row into the hole.
+    Missing access indices are stored as NaN (decay treats them as "now").
+    Learner, topic and memory type are interned to int codes, 0 meaning unset.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self.bullets: List[Bullet] = []
+        self.row: Dict[str, int] = {}
+        self.codes: Dict[str, Dict[str, int]] = {"type": {}, "learner": {}, "topic": {}}
+        self.type_names: List[Optional[str]] = [None]
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        def grow(old: Optional[np.ndarray], shape, dtype, fill) -> np.ndarray:
+            new = np.full(shape, fill, dtype=dtype)
+            if old is not None:
+                new[: self.size] = old[: self.size]
+            return new
+
+        get = lambda name: getattr(self, name, None)  # noqa: E731
+        self.strength = grow(get("strength"), (capacity, 3), np.float64, 0.0)
+        self.access = grow(get("access"), (capacity, 3), np.float64, np.nan)
+        self.type_code = grow(get("type_code"), capacity, np.int32, 0)
+        self.learner_code = grow(get("learner_code"), capacity, np.int32, 0)
+        self.topic_code = grow(get("topic_code"), capacity, np.int32, 0)
+        self.helpful = grow(get("helpful"), capacity, np.int64, 0)
+        self.harmful = grow(get("harmful"), capacity, np.int64, 0)
+        self.token_count = grow(get("token_count"), capacity, np.int64, 0)
+        self.visual = grow(get("visual"), capacity, bool, False)
+        self.rank = grow(get("rank"), capacity, np.int64, 0)
+        self.capacity = capacity
+
+    def code(self, kind: str, value: Optional[str], create: bool = False) -> int:
+        """Interned code for ``value`` (0 for unset, -1 if unknown and not created)."""
+        if not value:
+            return 0
+        table = self.codes[kind]
+        code = table.get(value)
+        if code is None:
+            if not create:
+                return -1
+            code = table[value] = len(table) + 1
+            if kind == "type":
+                self.type_names.append(value)
+        return code
+
+    def upsert(self, bullet: Bullet, rank: int):
+        idx = self.row.get(bullet.id)
+        if idx is None:
+            if self.size == self.capacity:
+                self._allocate(self.capacity * 2)
+            idx = self.size
+            self.size += 1
+            self.row[bullet.id] = idx
+            self.bullets.append(bullet)
+        else:
+            self.bullets[idx] = bullet
+        self.strength[idx] = (bullet.semantic_strength, bullet.episodic_strength, bullet.procedural_strength)
+        self.set_access(bullet, idx)
+        self.type_code[idx] = self.code("type", (bullet.memory_type or "semantic").lower(), create=True)
+        self.learner_code[idx] = self.code("learner", bullet.learner_id, create=True)
+        self.topic_code[idx] = self.code("topic", bullet.topic, create=True)
+        self.helpful[idx] = bullet.helpful_count
+        self.harmful[idx] = bullet.harmful_count
+        self.token_count[idx] = len(bullet.tokens())
+        tags = {t.lower() for t in bullet.tags}
+        self.visual[idx] = "visual" in tags or "diagram" in tags or "picture" in bullet.content.lower()
+        self.rank[idx] = rank
+
+    def set_access(self, bullet: Bullet, idx: Optional[int] = None):
+        if idx is None:
+            idx = self.row.get(bullet.id)
+            if idx is None or self.bullets[idx] is not bullet:
+                return
+        self.access[idx] = [
+            np.nan if value is None else value
+            for value in (
+                bullet.semantic_access_index,
+                bullet.episodic_access_index,
+                bullet.procedural_access_index,
+            )
+        ]
+
+    def remove(self, bullet_id: str):
+        idx = self.row.pop(bullet_id, None)
+        if idx is None:
+            return
+        last = self.size - 1
+        if idx != last:
+            moved = self.bullets[last]
+            self.bullets[idx] = moved
+            self.row[moved.id] = idx
+            for column in (
+                self.strength, self.access, self.type_code, self.learner_code, self.topic_code,
+                self.helpful, self.harmful, self.token_count, self.visual, self.rank,
+            ):
+                column[idx] = column[last]
+        self.bullets.pop()
+        self.size = last
+
+
 class ACEMemory:
     """
     ACE Memory System - Evolving playbook with structured bullets.
@@ -206,6 +382,11 @@ class ACEMemory:
         prune_threshold: float = 0.3,
         decay_rates: Optional[Dict[str, float]] = None,
         storage: Any = None,
+        dedup_exact_verify: bool = True,
+        minhash_permutations: int = 64,
+        lsh_bands: int = 16,
+        save_retries: Optional[int] = None,
+        write_behind: Any = None,
     ):
         # Require Neo4j storage - no JSON fallback
         if storage is None:
@@ -217,6 +398,22 @@ class ACEMemory:
         self.max_bullets = max_bullets
         self.dedup_threshold = dedup_threshold  # Cosine similarity threshold for deduplication
         self.prune_threshold = prune_threshold  # Score threshold for pruning low-quality bullets
+        # Dedup only compares LSH collisions; exact verify re-checks them with
+        # word-set Jaccard so merges keep the dedup_threshold semantics.
+        # 16 bands x 4 rows collide pairs at Jaccard 0.85 with p > 0.99999;
+        # use more, narrower bands for a lower dedup_threshold.
+        if minhash_permutations % lsh_bands:
+            raise ValueError("minhash_permutations must be divisible by lsh_bands")
+        self.dedup_exact_verify = dedup_exact_verify
+        self.minhash_permutations = minhash_permutations
+        self.lsh_bands = lsh_bands
+        self._lsh_rows = minhash_permutations // lsh_bands
+        self.save_retries = DEFAULT_SAVE_RETRIES if save_retries is None else save_retries
+        # Optional ace_memory_writer.WriteBehindWriter: apply_delta then only
+        # queues the save. The lock guards state shared with its thread.
+        self._write_behind = write_behind
+        self._lock = threading.RLock()
+        self._pending_deltas: List[DeltaUpdate] = []  # applied locally, not yet saved
         default_decay = {
             "semantic": 0.01,
             "episodic": 0.05,
@@ -226,10 +423,14 @@ class ACEMemory:
             default_decay.update(decay_rates)
         self.decay_rates = {k: max(0.0, min(1.0, v)) for k, v in default_decay.items()}
         self.access_clock = 0
+        self.memory_version = 0  # bumped whenever the playbook contents change
+        self._storage_version: Any = None  # storage revision our copy reflects
         
         self.bullets: Dict[str, Bullet] = {}  # id -> Bullet
-        self.categories: Dict[str, List[str]] = defaultdict(list)  # tag -> [bullet_ids]
+        self.categories: Dict[str, Set[str]] = defaultdict(set)  # tag -> bullet ids
         self.hash_index: Dict[str, Set[str]] = defaultdict(set)  # normalized content hash -> bullet ids
+        self._bullet_hash: Dict[str, str] = {}  # bullet id -> its key in hash_index
+        self._reset_indexes()
         self._fresh_from_init = False
         self._loaded_once = False
         
@@ -237,6 +438,17 @@ class ACEMemory:
         self._fresh_from_init = True
         self._loaded_once = True
 
+    def __getstate__(self):
+        # Locks don't copy or pickle; a copy saves synchronously.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_write_behind"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
     @staticmethod
     def _normalized_hash(text: str) -> str:
         normalized = re.sub(r"\s+", " ", text.strip().lower())
@@ -250,16 +462,112 @@ class ACEMemory:
     def is_loaded(self) -> bool:
         return bool(getattr(self, "_loaded_once", False))
 
+    @staticmethod
+    def _tokenize(text: str) -> FrozenSet[str]:
+        """Word set used by ``_text_similarity`` (lowercased, whitespace split)."""
+        return frozenset(text.lower().split())
+
+    def _reset_indexes(self):
+        self.token_index: Dict[str, Set[str]] = defaultdict(set)  # token -> bullet ids
+        self._bullet_tokens: Dict[str, FrozenSet[str]] = {}  # bullet id -> indexed token set
+        self._bullet_rank: Dict[str, int] = {}  # bullet id -> insertion order in self.bullets
+        self._rank_counter = 0
+        self.lsh_buckets: Dict[Tuple[int, bytes], Set[str]] = defaultdict(set)  # (band, band signature) -> bullet ids
+        self._bullet_bands: Dict[str, List[Tuple[int, bytes]]] = {}  # bullet id -> its LSH bucket keys
+        self._columns = _ScoreColumns()  # vectorized scoring rows
+        # Changes since the last save, for storages that persist deltas
+        self._dirty_ids: Set[str] = set()
+        self._removed_ids: Set[str] = set()
+
+    def _index_tokens(self, bullet: Bullet):
+        """Add a bullet to the token inverted index (no-op if already indexed)."""
+        if bullet.id in self._bullet_tokens:
+            return
+        tokens = bullet.tokens()
+        self._bullet_tokens[bullet.id] = tokens
+        self._rank_counter += 1
+        self._bullet_rank[bullet.id] = self._rank_counter
+        for token in tokens:
+            self.token_index[token].add(bullet.id)
+
+    def _index_minhash(self, bullet: Bullet):
+        """Add a bullet's MinHash bands to the LSH index (no-op if already indexed)."""
+        if bullet.id in self._bullet_bands:
+            return
+        if bullet.minhash is None or len(bullet.minhash) != self.minhash_permutations:
+            bullet.minhash = minhash_signature(self._bullet_tokens[bullet.id], self.minhash_permutations)
+        keys: List[Tuple[int, bytes]] = []
+        if bullet.minhash is not None:
+            rows = self._lsh_rows
+            for band in range(self.lsh_bands):
+                key = (band, bullet.minhash[band * rows:(band + 1) * rows].tobytes())
+                self.lsh_buckets[key].add(bullet.id)
+                keys.append(key)
+        self._bullet_bands[bullet.id] = keys
+
+    def _unindex_minhash(self, bullet_id: str):
+        for key in self._bullet_bands.pop(bullet_id, ()):
+            ids = self.lsh_buckets.get(key)
+            if ids is None:
+                continue
+            ids.discard(bullet_id)
+            if not ids:
+                self.lsh_buckets.pop(key, None)
+
+    def _lsh_candidates(self, bullet_id: str) -> Set[str]:
+        """Bullets sharing at least one LSH band with ``bullet_id``."""
+        candidates: Set[str] = set()
+        for key in self._bullet_bands.get(bullet_id, ()):
+            candidates.update(self.lsh_buckets.get(key, ()))
+        candidates.discard(bullet_id)
+        return candidates
+
+    def _dedup_similarity(self, a: Bullet, b: Bullet) -> float:
+        if self.dedup_exact_verify or a.minhash is None or b.minhash is None:
+            return self._token_similarity(a.tokens(), b.tokens())
+        return float(np.mean(a.minhash == b.minhash))
+
+    def _unindex_tokens(self, bullet_id: str):
+        tokens = self._bullet_tokens.pop(bullet_id, None)
+        self._bullet_rank.pop(bullet_id, None)
+        if not tokens:
+            return
+        for token in tokens:
+            ids = self.token_index.get(token)
+            if ids is None:
+                continue
+            ids.discard(bullet_id)
+            if not ids:
+                self.token_index.pop(token, None)
+
     def _register_bullet(self, bullet: Bullet):
         bullet.content_hash = bullet.content_hash or self._normalized_hash(bullet.content)
-        self.hash_index[bullet.content_hash].add(bullet.id)
+        if self._bullet_hash.get(bullet.id) != bullet.content_hash:
+            self._unindex_hash(bullet.id)
+            self.hash_index[bullet.content_hash].add(bullet.id)
+            self._bullet_hash[bullet.id] = bullet.content_hash
+        self._index_tokens(bullet)
+        self._index_minhash(bullet)
+        self._columns.upsert(bullet, self._bullet_rank[bullet.id])
+        self._dirty_ids.add(bullet.id)
+        self._removed_ids.discard(bullet.id)
+
+    def _unindex_hash(self, bullet_id: str):
+        hash_val = self._bullet_hash.pop(bullet_id, None)
+        ids = self.hash_index.get(hash_val) if hash_val is not None else None
+        if ids is None:
+            return
+        ids.discard(bullet_id)
+        if not ids:
+            self.hash_index.pop(hash_val, None)
 
     def _unregister_bullet(self, bullet_id: str):
-        for hash_val, ids in list(self.hash_index.items()):
-            if bullet_id in ids:
-                ids.remove(bullet_id)
-                if not ids:
-                    self.hash_index.pop(hash_val, None)
+        self._unindex_hash(bullet_id)
+        self._unindex_tokens(bullet_id)
+        self._unindex_minhash(bullet_id)
+        self._columns.remove(bullet_id)
+        self._dirty_ids.discard(bullet_id)
+        self._removed_ids.add(bullet_id)
 
     def _is_duplicate(self, bullet: Bullet) -> Optional[str]:
         candidate_hash = bullet.content_hash or self._normalized_hash(bullet.content)
@@ -292,6 +600,39 @@ class ACEMemory:
         t = max(self.access_clock - last_index, 0)
         return strength * math.pow(base, t)
 
+    def _column_scores(self, rows: np.ndarray) -> np.ndarray:
+        """Vectorized ``_compute_score`` for the given column rows."""
+        cols = self._columns
+        base = np.array(
+            [max(0.0, min(1.0, 1.0 - self.decay_rates.get(key, 0.0))) for key in MEMORY_COMPONENTS]
+        )
+        clock = float(self.access_clock)
+        access = cols.access[rows]
+        t = np.maximum(clock - np.where(np.isnan(access), clock, access), 0.0)
+        strength = cols.strength[rows]
+        components = np.where(strength > 0, strength * np.power(base, t), 0.0)
+        return components[:, 0] + components[:, 1] + components[:, 2]
+
+    @staticmethod
+    def _top_k_order(keys: List[np.ndarray], k: int) -> np.ndarray:
+        """
+        Indices of the ``k`` largest entries, best first.
+
+        ``keys`` are compared lexicographically, all descending except the
+        last, which is ascending and breaks the remaining ties (playbook
+        order) exactly like a stable ``sorted(..., reverse=True)``.
+        argpartition on the primary key bounds the sort to the entries tied
+        with or above the k-th value.
+        """
+        primary = keys[0]
+        lex_keys = [keys[-1]] + [-key for key in reversed(keys[:-1])]
+        if not 0 < k < len(primary):
+            return np.lexsort(lex_keys)[:k]
+        kth = primary[np.argpartition(-primary, k - 1)[:k]].min()
+        window = np.flatnonzero(primary >= kth)
+        ranked = window[np.lexsort([key[window] for key in lex_keys])]
+        return ranked[:k]
+
     def _compute_score(self, bullet: Bullet, now: Optional[datetime] = None) -> float:
         # 'now' retained for backward compatibility but unused in access-count mode.
         semantic = self._component_score(
@@ -359,6 +700,9 @@ class ACEMemory:
             if bullet.procedural_strength > 0:
                 bullet.procedural_last_access = iso_ts
                 bullet.procedural_access_index = access_index
+            self._columns.set_access(bullet)
+            if bullet.id in self._bullet_rank:
+                self._dirty_ids.add(bullet.id)
 
     def _touch_bullet(
         self,
@@ -404,8 +748,7 @@ class ACEMemory:
     def _sync_categories(self, bullet: Bullet):
         """Ensure category index contains the bullet for every tag."""
         for tag in bullet.tags:
-            if bullet.id not in self.categories[tag]:
-                self.categories[tag].append(bullet.id)
+            self.categories[tag].add(bullet.id)
 
     def _normalise_bullet(
         self,
@@ -522,6 +865,7 @@ class ACEMemory:
         )
         return bullet, True
 
+    @_synchronized
     def find_similar_bullet(
         self,
         content: str,
@@ -530,9 +874,65 @@ class ACEMemory:
         threshold: float = 0.9,
         return_score: bool = False,
     ):
-        """Return an existing bullet with similar content (and optionally the score)."""
+        """
+        Return an existing bullet with similar content (and optionally the score).
+
+        Candidates come from the token inverted index: only bullets sharing at
+        least one word with ``content`` can reach a positive Jaccard score, and
+        a bullet with ``s`` words can score at most ``min(q, s) / max(q, s)``
+        against a ``q``-word query, so size-incompatible bullets are skipped
+        before any overlap is counted. Candidates are visited in playbook
+        order so ties resolve exactly as the linear scan did (last one wins).
+        """
         if not content:
             return (None, 0.0) if return_score else None
+        if threshold <= 0:
+            # Zero-overlap bullets qualify too, so the index cannot narrow the search.
+            return self._find_similar_bullet_linear(content, learner_id, topic, threshold, return_score)
+
+        query_tokens = self._tokenize(content)
+        q = len(query_tokens)
+        best = None
+        best_score = threshold
+        if q:
+            overlaps: Dict[str, int] = defaultdict(int)
+            for token in query_tokens:
+                for bullet_id in self.token_index.get(token, ()):
+                    size = len(self._bullet_tokens[bullet_id])
+                    if min(q, size) / max(q, size) < threshold:
+                        continue
+                    overlaps[bullet_id] += 1
+
+            for bullet_id in sorted(overlaps, key=self._bullet_rank.__getitem__):
+                bullet = self.bullets.get(bullet_id)
+                if bullet is None:
+                    continue
+                if learner_id and bullet.learner_id and bullet.learner_id != learner_id:
+                    continue
+                if topic and bullet.topic and bullet.topic != topic:
+                    continue
+                size = len(self._bullet_tokens[bullet_id])
+                if min(q, size) / max(q, size) < best_score:
+                    continue
+                overlap = overlaps[bullet_id]
+                score = overlap / (q + size - overlap)
+                if score >= best_score:
+                    best = bullet
+                    best_score = score
+        if return_score:
+            return best, (best_score if best is not None else 0.0)
+        return best
+
+    def _find_similar_bullet_linear(
+        self,
+        content: str,
+        learner_id: Optional[str] = None,
+        topic: Optional[str] = None,
+        threshold: float = 0.9,
+        return_score: bool = False,
+    ):
+        """Reference full scan over every bullet (used when the index cannot prune)."""
+        query_tokens = self._tokenize(content)
         best = None
         best_score = threshold
         for bullet in self.bullets.values():
@@ -540,7 +940,7 @@ class ACEMemory:
                 continue
             if topic and bullet.topic and bullet.topic != topic:
                 continue
-            score = self._text_similarity(content, bullet.content)
+            score = self._token_similarity(query_tokens, bullet.tokens())
             if score >= best_score:
                 best = bullet
                 best_score = score
@@ -550,9 +950,12 @@ class ACEMemory:
     
     def _populate_from_data(self, data: Dict[str, Any]):
         """Hydrate in-memory structures from a serialized payload."""
+        self.memory_version += 1
         self.bullets.clear()
-        self.categories = defaultdict(list)
+        self.categories = defaultdict(set)
         self.hash_index = defaultdict(set)
+        self._bullet_hash = {}
+        self._reset_indexes()
 
         for bullet_data in data.get("bullets", []):
             bullet = Bullet.from_dict(bullet_data)
@@ -565,7 +968,7 @@ class ACEMemory:
             self._ensure_memory_tags(bullet)
             self.bullets[bullet.id] = bullet
             for tag in bullet.tags:
-                self.categories[tag].append(bullet.id)
+                self.categories[tag].add(bullet.id)
             self._register_bullet(bullet)
 
         self.access_clock = int(data.get("access_clock", len(self.bullets)))
@@ -576,6 +979,10 @@ class ACEMemory:
                 bullet.episodic_access_index = self.access_clock
             if bullet.procedural_strength > 0 and (bullet.procedural_access_index is None or bullet.procedural_access_index == 0):
                 bullet.procedural_access_index = self.access_clock
+            self._columns.set_access(bullet)
+        # The in-memory copy now matches storage
+        self._dirty_ids.clear()
+        self._removed_ids.clear()
     
     def _load_memory(self):
         """Load memory from the configured storage backend."""
@@ -585,6 +992,7 @@ class ACEMemory:
             except Exception as exc:  # pragma: no cover - defensive logging
                 print(f"[ACE Memory] Warning: Storage load failed: {exc}", flush=True)
             else:
+                self._storage_version = getattr(self._storage, "version", None)
                 if stored:
                     self._populate_from_data(stored)
                     learner = getattr(self._storage, "learner_id", "unknown")
@@ -603,13 +1011,31 @@ class ACEMemory:
 
         # JSON file fallback removed - Neo4j only storage
     
+    @_synchronized
     def reload_from_storage(self):
-        """Refresh the in-memory snapshot from Neo4j storage."""
+        """
+        Refresh the in-memory snapshot from Neo4j storage.
+
+        Skipped when the storage's ``current_version()`` probe matches the
+        revision this copy was loaded from or last saved as. Deltas still
+        waiting for a save are re-applied on top of the fresh copy.
+        """
+        if self._storage_is_current():
+            learner = getattr(self._storage, "learner_id", "unknown")
+            print(
+                f"[ACE Memory] Memory for learner={learner} is current; skipped reload",
+                flush=True,
+            )
+            self._loaded_once = True
+            self._fresh_from_init = False
+            return
+
         try:
             stored = self._storage.load()
         except Exception as exc:
             print(f"[ACE Memory] ERROR: Storage reload failed: {exc}", flush=True)
             raise  # Re-raise to alert on reload failures
+        self._storage_version = getattr(self._storage, "version", None)
 
         if not stored:
             learner = getattr(self._storage, "learner_id", "unknown")
@@ -620,6 +1046,8 @@ class ACEMemory:
             return
 
         self._populate_from_data(stored)
+        for pending in self._pending_deltas:
+            self._apply_delta_locally(copy.deepcopy(pending))
         learner = getattr(self._storage, "learner_id", "unknown")
         print(
             f"[ACE Memory] Reloaded {len(self.bullets)} bullets from Neo4j for learner={learner}",
@@ -627,28 +1055,200 @@ class ACEMemory:
         )
         self._loaded_once = True
         self._fresh_from_init = False
+
+    def _storage_is_current(self) -> bool:
+        probe = getattr(self._storage, "current_version", None)
+        if probe is None or self._storage_version is None:
+            return False
+        try:
+            current = probe()
+        except Exception as exc:
+            print(f"[ACE Memory] Warning: Storage version probe failed: {exc}", flush=True)
+            return False
+        return current is not None and current == self._storage_version
     
-    def _save_memory(self):
+    def _save_memory(self, delta: Optional[DeltaUpdate] = None):
         """Persist memory to Neo4j storage."""
-        data = {
-            "bullets": [bullet.to_dict() for bullet in self.bullets.values()],
-            "version": "1.0",
-            "last_updated": datetime.now().isoformat(),
-            "access_clock": self.access_clock,
+        with self._lock:
+            request = self._prepare_save(self._delta_summary([delta] if delta else []))
+        self._send_save(request)
+
+    def _prepare_save(self, summary: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the storage call for the current state (caller holds the lock).
+
+        Dirty/removed ids are handed to the request, so changes made while it
+        is in flight accumulate for the next save.
+        """
+        request: Dict[str, Any] = {
+            "dirty": self._dirty_ids,
+            "removed": self._removed_ids,
+            "expected": self._expected_version(),
         }
+        if getattr(self._storage, "supports_delta", False):
+            # Only the bullets added, changed, touched or removed since the last save
+            if getattr(self._storage, "needs_full_sync", False):
+                upsert_ids = list(self.bullets)
+            else:
+                upsert_ids = sorted(
+                    (bid for bid in self._dirty_ids if bid in self.bullets),
+                    key=self._bullet_rank.__getitem__,
+                )
+            changes = {
+                "upserts": [self.bullets[bid].to_dict() for bid in upsert_ids],
+                "removed": sorted(self._removed_ids),
+                "access_clock": self.access_clock,
+            }
+            if summary is not None:
+                # Summary for log-structured stores; the upserts carry the state.
+                changes["delta"] = summary
+            request["changes"] = changes
+        else:
+            request["data"] = {
+                "bullets": [bullet.to_dict() for bullet in self.bullets.values()],
+                "version": "1.0",
+                "last_updated": datetime.now().isoformat(),
+                "access_clock": self.access_clock,
+            }
+        self._dirty_ids = set()
+        self._removed_ids = set()
+        return request
 
-        # Always save to Neo4j storage (JSON fallback removed)
+    def _send_save(self, request: Dict[str, Any]) -> bool:
+        """Run a prepared save; on failure its ids are merged back as pending."""
+        saved: Any = None
         try:
-            self._storage.save(data)
+            if "changes" in request:
+                saved = self._storage.save_delta(request["changes"], **request["expected"])
+            else:
+                # Always save to Neo4j storage (JSON fallback removed)
+                saved = self._storage.save(request["data"], **request["expected"])
+        except MemoryConflictError:
+            self._restore_pending_ids(request)
+            raise
         except Exception as exc:
-            print(f"[ACE Memory] ERROR: Failed to save memory to Neo4j: {exc}", flush=True)
+            kind = "memory delta" if "changes" in request else "memory"
+            print(f"[ACE Memory] ERROR: Failed to save {kind} to Neo4j: {exc}", flush=True)
+            self._restore_pending_ids(request)
             raise  # Re-raise to alert on save failures
-    
+        if not saved:
+            self._restore_pending_ids(request)  # keep the pending changes for the next save
+            return False
+        with self._lock:
+            self._storage_version = getattr(self._storage, "version", None)
+        return True
+
+    def _restore_pending_ids(self, request: Dict[str, Any]) -> None:
+        with self._lock:
+            self._dirty_ids |= request["dirty"]
+            self._removed_ids |= request["removed"] - set(self.bullets)
+
+    @staticmethod
+    def _delta_summary(deltas: List[DeltaUpdate]) -> Optional[Dict[str, Any]]:
+        """Log summary of the deltas covered by one save (several when coalesced)."""
+        if not deltas:
+            return None
+        updates: Dict[str, Dict[str, int]] = {}
+        removed: Set[str] = set()
+        metadata: Dict[str, Any] = {}
+        for delta in deltas:
+            for bullet_id, counts in delta.update_bullets.items():
+                merged = updates.setdefault(bullet_id, {})
+                for key, value in counts.items():
+                    merged[key] = merged.get(key, 0) + value
+            removed |= delta.remove_bullets
+            metadata.update(
+                (key, value)
+                for key, value in delta.metadata.items()
+                if isinstance(value, (str, int, float, bool))
+            )
+        summary = {
+            "new": [bullet.content for delta in deltas for bullet in delta.new_bullets],
+            "updates": updates,
+            "removed": sorted(removed),
+            "metadata": metadata,
+        }
+        if len(deltas) > 1:
+            summary["coalesced"] = len(deltas)
+        return summary
+
+    def _expected_version(self) -> Dict[str, Any]:
+        """Compare-and-set argument for versioned stores (none for plain adapters)."""
+        if self._storage_version is None:
+            return {}
+        return {"expected_version": self._storage_version}
+
     def apply_delta(self, delta: DeltaUpdate):
         """
         Apply a delta update to the memory.
         This is the core of incremental adaptation.
+
+        Saves are compare-and-set against the stored version. When another
+        writer got there first, the memory is reloaded and the delta applied
+        again, up to ``save_retries`` times. With a write-behind writer the
+        save is only queued; see ``flush``.
         """
+        # _apply_delta_locally mutates the delta; keep an untouched copy
+        # whenever it outlives this call (conflict retries or a queued save).
+        kept = self.save_retries or self._write_behind is not None
+        pristine = copy.deepcopy(delta) if kept else delta
+        with self._lock:
+            self._apply_delta_locally(delta)
+            self._pending_deltas.append(pristine)
+        if self._write_behind is not None:
+            self._write_behind.schedule(self, pristine)
+            return
+        self._persist_pending()
+
+    def has_pending_save(self) -> bool:
+        return bool(self._pending_deltas or self._dirty_ids or self._removed_ids)
+
+    def flush(self) -> bool:
+        """Write any queued save now; returns False if it could not be persisted."""
+        if self._write_behind is not None:
+            return self._write_behind.flush(self)
+        return self._persist_pending()
+
+    def _persist_pending(self) -> bool:
+        """Save the queued deltas in one write, reloading and re-applying on conflicts."""
+        if not self.has_pending_save():
+            return True
+        learner = getattr(self._storage, "learner_id", "unknown")
+        for attempt in range(self.save_retries + 1):
+            with self._lock:
+                deltas, self._pending_deltas = self._pending_deltas, []
+                request = self._prepare_save(self._delta_summary(deltas))
+            try:
+                saved = self._send_save(request)
+            except MemoryConflictError as exc:
+                with self._lock:
+                    self._pending_deltas = deltas + self._pending_deltas
+                    if attempt == self.save_retries:
+                        self._pending_deltas = []
+                        print(
+                            f"[ACE Memory] ERROR: Save conflict for learner={learner} persisted after "
+                            f"{attempt + 1} attempts; delta dropped",
+                            flush=True,
+                        )
+                        raise
+                    print(
+                        f"[ACE Memory] Save conflict for learner={learner} ({exc}); reloading and re-applying delta",
+                        flush=True,
+                    )
+                    self.reload_from_storage()
+                continue
+            except Exception:
+                with self._lock:
+                    self._pending_deltas = deltas + self._pending_deltas
+                raise
+            if not saved:
+                with self._lock:
+                    self._pending_deltas = deltas + self._pending_deltas
+            return saved
+        return False
+
+    def _apply_delta_locally(self, delta: DeltaUpdate):
+        """Apply ``delta`` to the in-process playbook without saving it."""
         has_changes = bool(
             delta.new_bullets or delta.update_bullets or delta.remove_bullets
         )
@@ -683,8 +1283,7 @@ class ACEMemory:
             if bullet_id in self.bullets:
                 bullet = self.bullets.pop(bullet_id)
                 for tag in bullet.tags:
-                    if bullet_id in self.categories[tag]:
-                        self.categories[tag].remove(bullet_id)
+                    self.categories[tag].discard(bullet_id)
                 self._unregister_bullet(bullet_id)
                 print(
                     f"[ACE Memory][Delta Remove] id={bullet_id} tags={bullet.tags} content={bullet.content}",
@@ -693,9 +1292,8 @@ class ACEMemory:
         
         # Grow-and-refine: deduplicate and prune if needed
         self._refine()
-        
-        # Save to disk
-        self._save_memory()
+        if has_changes:
+            self.memory_version += 1
     
     def _refine(self):
         """
@@ -714,42 +1312,59 @@ class ACEMemory:
         """
         Remove duplicate bullets based on semantic similarity.
         Uses simple text similarity (can be enhanced with embeddings).
+
+        Walks the playbook in the same pairwise order as a full O(n²) scan,
+        but each bullet is only compared with the later bullets it collides
+        with in the MinHash LSH index.
         """
         bullets_list = list(self.bullets.values())
+        position = {bullet.id: idx for idx, bullet in enumerate(bullets_list)}
         to_remove = set()
         
         for i in range(len(bullets_list)):
             if bullets_list[i].id in to_remove:
                 continue
-            
-            for j in range(i + 1, len(bullets_list)):
-                if bullets_list[j].id in to_remove:
-                    continue
-                
-                # Simple text similarity (can use embeddings for better results)
-                similarity = self._text_similarity(
-                    bullets_list[i].content,
-                    bullets_list[j].content
+
+            start = i + 1
+            while True:
+                current = bullets_list[i]
+                later = sorted(
+                    position[cid]
+                    for cid in self._lsh_candidates(current.id)
+                    if cid in position and position[cid] >= start and cid not in to_remove
                 )
-                
-                if similarity > self.dedup_threshold:
-                    keep, drop = self._select_canonical_bullet(bullets_list[i], bullets_list[j])
-                    self._merge_bullet_into(keep, drop)
-                    print(
-                        f"[ACE Memory][Dedup Merge] kept={keep.id} merged={drop.id}",
-                        flush=True,
-                    )
-                    to_remove.add(drop.id)
-                    if keep is bullets_list[j]:
-                        bullets_list[i], bullets_list[j] = bullets_list[j], bullets_list[i]
+                swapped = False
+                for j in later:
+                    if bullets_list[j].id in to_remove:
+                        continue
+
+                    similarity = self._dedup_similarity(current, bullets_list[j])
+
+                    if similarity > self.dedup_threshold:
+                        keep, drop = self._select_canonical_bullet(current, bullets_list[j])
+                        self._merge_bullet_into(keep, drop)
+                        print(
+                            f"[ACE Memory][Dedup Merge] kept={keep.id} merged={drop.id}",
+                            flush=True,
+                        )
+                        to_remove.add(drop.id)
+                        if keep is bullets_list[j]:
+                            # The survivor takes slot i; keep scanning after j with its candidates.
+                            bullets_list[i], bullets_list[j] = bullets_list[j], bullets_list[i]
+                            position[bullets_list[i].id] = i
+                            position[bullets_list[j].id] = j
+                            start = j + 1
+                            swapped = True
+                            break
+                if not swapped:
+                    break
         
         # Remove duplicates
         for bullet_id in to_remove:
             if bullet_id in self.bullets:
                 bullet = self.bullets.pop(bullet_id)
                 for tag in bullet.tags:
-                    if bullet_id in self.categories[tag]:
-                        self.categories[tag].remove(bullet_id)
+                    self.categories[tag].discard(bullet_id)
                 self._unregister_bullet(bullet_id)
         
         if to_remove:
@@ -760,9 +1375,11 @@ class ACEMemory:
         Calculate text similarity (simple Jaccard similarity).
         Can be enhanced with embeddings for better semantic matching.
         """
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
+        return self._token_similarity(self._tokenize(text1), self._tokenize(text2))
+
+    @staticmethod
+    def _token_similarity(words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+        """``_text_similarity`` for pre-tokenized word sets (see ``Bullet.tokens``)."""
         if not words1 or not words2:
             return 0.0
         
@@ -785,17 +1402,19 @@ class ACEMemory:
         """
         # Rank bullets from most to least valuable using the score + frequency key.
         now = datetime.now()
-        bullets_list = sorted(
-            self.bullets.values(),
-            key=lambda b: (self._compute_score(b, now), b.helpful_count),
-            reverse=True
+        cols = self._columns
+        rows = np.arange(cols.size, dtype=np.intp)
+        scores = self._column_scores(rows)
+        keep_rows = self._top_k_order(
+            [scores, cols.helpful[rows], cols.rank[rows]],
+            self.max_bullets,
         )
         
         # IDs of the bullets we want to keep (highest-ranked window).
-        to_keep = set(b.id for b in bullets_list[:self.max_bullets])
+        to_keep = set(cols.bullets[idx].id for idx in keep_rows)
         
         # Everything else falls outside the retention window and is pruned.
-        to_remove = set(self.bullets.keys()) - to_keep
+        to_remove = [bullet_id for bullet_id in self.bullets if bullet_id not in to_keep]
         for bullet_id in to_remove:
             bullet = self.bullets.pop(bullet_id)
             try:
@@ -809,13 +1428,13 @@ class ACEMemory:
                 flush=True,
             )
             for tag in bullet.tags:
-                if bullet_id in self.categories[tag]:
-                    self.categories[tag].remove(bullet_id)
+                self.categories[tag].discard(bullet_id)
             self._unregister_bullet(bullet_id)
 
         if to_remove:
             print(f"[ACE Memory] Pruned {len(to_remove)} low-quality bullets")
     
+    @_synchronized
     def retrieve_relevant_bullets(
         self,
         query: str,
@@ -830,35 +1449,40 @@ class ACEMemory:
         """Retrieve relevant bullets using structured facets."""
 
         facets = facets or {}
+        cols = self._columns
 
         # Filter by tags if provided
         if tags:
             candidate_ids = set()
             for tag in tags:
                 candidate_ids.update(self.categories.get(tag, []))
-            candidates = [self.bullets[bid] for bid in candidate_ids if bid in self.bullets]
+            rows = np.fromiter(
+                (cols.row[bid] for bid in candidate_ids if bid in self.bullets),
+                dtype=np.intp,
+            )
         else:
-            candidates = list(self.bullets.values())
+            rows = np.arange(cols.size, dtype=np.intp)
+        # Ties resolve in playbook order, as the stable sort over self.bullets did
+        order = cols.rank[rows]
 
+        mask = np.ones(len(rows), dtype=bool)
         if memory_types:
-            allowed = {mt.lower() for mt in memory_types}
-            candidates = [b for b in candidates if (b.memory_type or "semantic") in allowed]
+            allowed = [cols.code("type", mt.lower()) for mt in memory_types]
+            mask &= np.isin(cols.type_code[rows], allowed)
 
         if learner_id:
-            filtered = []
-            for bullet in candidates:
-                if bullet.learner_id and bullet.learner_id != learner_id:
-                    continue
-                filtered.append(bullet)
-            candidates = filtered
+            learners = cols.learner_code[rows]
+            mask &= (learners == 0) | (learners == cols.code("learner", learner_id))
 
         if topic:
-            candidates = [b for b in candidates if not b.topic or b.topic == topic]
+            topics = cols.topic_code[rows]
+            mask &= (topics == 0) | (topics == cols.code("topic", topic))
 
-        score_cache = {b.id: self._compute_score(b) for b in candidates}
-        candidates = [b for b in candidates if score_cache.get(b.id, 0.0) >= min_score]
+        base_scores = self._column_scores(rows)
+        mask &= base_scores >= min_score
+        rows, order, base_scores = rows[mask], order[mask], base_scores[mask]
 
-        if not candidates:
+        if not len(rows):
             return []
 
         query_terms: List[str] = []
@@ -874,46 +1498,95 @@ class ACEMemory:
             query_terms.append("next step")
 
         query_text = " ".join(term for term in query_terms if term).strip()
+        query_tokens = self._tokenize(query_text)
 
         memory_weight = {"procedural": 1.0, "episodic": 0.7, "semantic": 0.4}
-
-        scored_bullets = []
-        for bullet in candidates:
-            mt = (bullet.memory_type or "semantic").lower()
-            bullet_tags = {t.lower() for t in bullet.tags}
-            base_score = score_cache.get(bullet.id, 0.0)
-            normalized_strength = base_score / max(DEFAULT_MEMORY_STRENGTH, 1.0)
-
-            relevance = self._text_similarity(query_text, bullet.content) if query_text else 0.0
-            type_priority = memory_weight.get(mt, 0.3)
-
-            bonus = 0.0
-            if facets.get("needs_visual") and ("visual" in bullet_tags or "diagram" in bullet_tags or "picture" in bullet.content.lower()):
-                bonus += 0.2
-            if persona and persona in bullet_tags:
-                bonus += 0.1
+        type_priority = np.array(
+            [memory_weight.get(name, 0.3) for name in cols.type_names]
+        )[cols.type_code[rows]]
+        normalized_strength = base_scores / max(DEFAULT_MEMORY_STRENGTH, 1.0)
+
+        # Jaccard from the token index: only bullets sharing a query word get a non-zero overlap
+        relevance = np.zeros(len(rows))
+        if query_tokens:
+            overlap = np.zeros(cols.size)
+            for token in query_tokens:
+                for bullet_id in self.token_index.get(token, ()):
+                    overlap[cols.row[bullet_id]] += 1
+            overlap = overlap[rows]
+            union = len(query_tokens) + cols.token_count[rows] - overlap
+            hits = overlap > 0
+            relevance[hits] = overlap[hits] / union[hits]
+
+        bonus = np.zeros(len(rows))
+        if facets.get("needs_visual"):
+            bonus += np.where(cols.visual[rows], 0.2, 0.0)
+        misconceptions = facets.get("misconceptions", [])
+        if persona or fractions or misconceptions:
+            bullets = [cols.bullets[idx] for idx in rows]
+            if persona:
+                bonus += [0.1 if persona in {t.lower() for t in b.tags} else 0.0 for b in bullets]
             if fractions:
-                if any(frac in bullet.content for frac in fractions):
-                    bonus += 0.05
-            for misconception in facets.get("misconceptions", []):
-                if misconception in bullet_tags or misconception in bullet.content.lower():
-                    bonus += 0.2
-
-            combined_score = (
-                0.25 * relevance +
-                0.55 * normalized_strength +
-                0.2 * type_priority +
-                bonus
-            )
-            scored_bullets.append((combined_score, bullet))
+                bonus += [0.05 if any(frac in b.content for frac in fractions) else 0.0 for b in bullets]
+            for misconception in misconceptions:
+                bonus += [
+                    0.2 if misconception in {t.lower() for t in b.tags} or misconception in b.content.lower() else 0.0
+                    for b in bullets
+                ]
+
+        combined_score = (
+            0.25 * relevance +
+            0.55 * normalized_strength +
+            0.2 * type_priority +
+            bonus
+        )
 
-        scored_bullets.sort(key=lambda x: x[0], reverse=True)
-        top_bullets = [bullet for _, bullet in scored_bullets[:top_k]]
+        ranked = self._top_k_order([combined_score, order], len(rows) if top_k < 0 else top_k)
+        top_bullets = [cols.bullets[rows[i]] for i in ranked][:top_k]
         # for bullet in top_bullets:
         #     self._touch_bullet(bullet)
         self._touch_bullets(top_bullets)  # one increment instead of many
         return top_bullets
     
+    @_synchronized
+    def retrieve_for_turn(
+        self,
+        cache: Dict[str, Any],
+        query: str,
+        top_k: int = 10,
+        depth: Optional[int] = None,
+        learner_id: Optional[str] = None,
+        topic: Optional[str] = None,
+        facets: Optional[Dict[str, Any]] = None,
+    ) -> List[Bullet]:
+        """
+        ``retrieve_relevant_bullets`` shared by every consumer in one chat turn.
+
+        The first call ranks ``depth`` bullets (default ``top_k``) and stores
+        their ids in ``cache`` under (query, learner, topic, facets,
+        memory_version). Later calls with the same key slice that ranking, so
+        the playbook is scored and touched once per turn. The cache holds
+        plain ids and can live in graph scratch.
+        """
+        key = json.dumps(
+            [query, learner_id, topic, facets or {}, self.memory_version],
+            sort_keys=True,
+            default=str,
+        )
+        entry = cache.get(key)
+        if entry is None or (top_k > entry["depth"] and len(entry["ids"]) >= entry["depth"]):
+            depth = max(top_k, depth or 0)
+            bullets = self.retrieve_relevant_bullets(
+                query,
+                top_k=depth,
+                learner_id=learner_id,
+                topic=topic,
+                facets=facets,
+            )
+            entry = cache[key] = {"depth": depth, "ids": [b.id for b in bullets]}
+        return [self.bullets[bid] for bid in entry["ids"][:top_k] if bid in self.bullets]
+
+    @_synchronized
     def format_context(
         self,
         query: str,
@@ -949,6 +1622,7 @@ class ACEMemory:
         
         return "\n".join(context_parts)
     
+    @_synchronized
     def get_statistics(self) -> Dict[str, Any]:
         """Get memory statistics"""
         if not self.bullets:
@@ -969,8 +1643,15 @@ class ACEMemory:
             "categories": {tag: len(ids) for tag, ids in self.categories.items()},
         }
     
+    @_synchronized
     def clear(self):
         """Clear all memory (use with caution!)"""
+        removed = set(self.bullets) | self._removed_ids
         self.bullets.clear()
         self.categories.clear()
+        self.hash_index.clear()
+        self._bullet_hash.clear()
+        self._reset_indexes()
+        self._removed_ids = removed
+        self.memory_version += 1
         self._save_memory()
@@ -0,0 +1,260 @@
+"""
+Append-only delta log for ACE memory.
+
+Each save appends one compact entry: the bullets an ``apply_delta`` added,
+changed or touched, the ids it removed, the new ``access_clock`` and a short
+summary of the delta. Loading replays the entries written after the last
+snapshot; compaction folds them back into the snapshot once
+``ACE_MEMORY_LOG_COMPACT_AFTER`` entries are pending. Folded entries are
+kept as an audit trail of how a learner's playbook evolved.
+
+``FileDeltaLogStore`` is a local, file-backed stand-in for the Neo4j log
+mode (``ACE_MEMORY_BACKEND=file``), useful for development and tests.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from ace_memory import MemoryConflictError
+
+DEFAULT_COMPACT_AFTER = int(os.getenv("ACE_MEMORY_LOG_COMPACT_AFTER", "50"))
+DEFAULT_MEMORY_DIR = os.getenv("ACE_MEMORY_DIR") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".ace_memory"
+)
+DEFAULT_KEEP_HISTORY = os.getenv("ACE_MEMORY_LOG_KEEP_HISTORY", "1").strip().lower() not in ("0", "false", "no")
+
+
+def make_log_entry(changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build the log record for one ``save_delta`` call (None when nothing changed)."""
+    if not changes.get("upserts") and not changes.get("removed"):
+        return None
+    entry = {
+        "ts": datetime.now().isoformat(),
+        "upserts": changes.get("upserts", []),
+        "removed": list(changes.get("removed", [])),
+        "access_clock": int(changes.get("access_clock", 0)),
+    }
+    if changes.get("delta"):
+        entry["delta"] = changes["delta"]
+    return entry
+
+
+def replay_delta_log(snapshot: Optional[Dict[str, Any]], entries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply log entries on top of a snapshot payload.
+
+    Upserts replace a bullet in place or append it (playbook order is kept),
+    removals drop it, and the last entry's ``access_clock`` wins.
+    """
+    data = dict(snapshot or {"bullets": [], "access_clock": 0})
+    bullets: Dict[str, Dict[str, Any]] = {b["id"]: b for b in data.get("bullets", [])}
+    for entry in entries:
+        for bullet in entry.get("upserts", []):
+            bullets[bullet["id"]] = bullet
+        for bullet_id in entry.get("removed", []):
+            bullets.pop(bullet_id, None)
+        if "access_clock" in entry:
+            data["access_clock"] = entry["access_clock"]
+    data["bullets"] = list(bullets.values())
+    return data
+
+
+def decode_log_entries(rows: Iterable[str], learner_id: str) -> List[Dict[str, Any]]:
+    entries = []
+    for raw in rows:
+        if not raw or not raw.strip():
+            continue
+        try:
+            entries.append(json.loads(raw))
+        except json.JSONDecodeError:
+            # A torn final append after a crash; everything before it is intact.
+            print(
+                f"[ACE Memory] Warning: Skipping undecodable delta log entry for learner={learner_id}",
+                flush=True,
+            )
+    return entries
+
+
+class FileDeltaLogStore:
+    """
+    File-backed ACE memory storage with the same interface as Neo4jMemoryStore.
+
+    Layout per learner under ``root``::
+
+        snapshot.json   {"bullets": [...], "access_clock": n, "log_seq": k}
+        log.jsonl       entries with seq > snapshot log_seq (replayed on load)
+        history.jsonl   entries already folded into the snapshot
+
+    Compare-and-set saves compare file stamps under an in-process lock only;
+    concurrent processes need the Neo4j store.
+    """
+
+    supports_delta = True
+
+    def __init__(
+        self,
+        learner_id: str,
+        root: Optional[str] = None,
+        compact_after: Optional[int] = None,
+        keep_history: Optional[bool] = None,
+        fsync: bool = False,
+    ):
+        if not learner_id:
+            raise ValueError("learner_id is required for FileDeltaLogStore")
+        self.learner_id = learner_id
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", learner_id)
+        self.path = os.path.join(root or DEFAULT_MEMORY_DIR, safe_id)
+        self.compact_after = DEFAULT_COMPACT_AFTER if compact_after is None else compact_after
+        self.keep_history = DEFAULT_KEEP_HISTORY if keep_history is None else keep_history
+        self.fsync = fsync
+        self.needs_full_sync = False
+        self._lock = threading.Lock()
+        self._last_seq: Optional[int] = None  # highest seq written (snapshot or log)
+        self._pending = 0  # log entries not yet folded into the snapshot
+        self.version: Optional[tuple] = None  # file stamps after our last load/save
+        os.makedirs(self.path, exist_ok=True)
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.path, "snapshot.json")
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(self.path, "log.jsonl")
+
+    @property
+    def history_path(self) -> str:
+        return os.path.join(self.path, "history.jsonl")
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            print(
+                f"[ACE Memory] Warning: Failed to decode stored memory for learner={self.learner_id}",
+                flush=True,
+            )
+            return None
+
+    def _read_log(self, after_seq: int) -> List[Dict[str, Any]]:
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as fh:
+                entries = decode_log_entries(fh, self.learner_id)
+        except FileNotFoundError:
+            return []
+        return [entry for entry in entries if entry.get("seq", 0) > after_seq]
+
+    def _write_file(self, path: str, text: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(text)
+            fh.flush()
+            if self.fsync:
+                os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    def _append(self, path: str, lines: List[str]) -> None:
+        with open(path, "a", encoding="utf-8") as fh:
+            for line in lines:
+                fh.write(line + "\n")
+            fh.flush()
+            if self.fsync:
+                os.fsync(fh.fileno())
+
+    def current_version(self) -> tuple:
+        """Size and mtime of the snapshot and log files; changes on every write."""
+        stamps = []
+        for path in (self.snapshot_path, self.log_path):
+            try:
+                stat = os.stat(path)
+                stamps.extend((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamps.extend((0, 0))
+        return tuple(stamps)
+
+    def _log_position(self) -> None:
+        """Find the last sequence number and pending entry count (once per process)."""
+        if self._last_seq is not None:
+            return
+        snapshot_seq = int((self._read_snapshot() or {}).get("log_seq", 0))
+        pending = self._read_log(snapshot_seq)
+        self._last_seq = max([snapshot_seq] + [e.get("seq", 0) for e in pending])
+        self._pending = len(pending)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            snapshot = self._read_snapshot()
+            snapshot_seq = int((snapshot or {}).get("log_seq", 0))
+            entries = self._read_log(snapshot_seq)
+            self._last_seq = max([snapshot_seq] + [e.get("seq", 0) for e in entries])
+            self._pending = len(entries)
+            self.version = self.current_version()
+            if snapshot is None and not entries:
+                return None
+            return replay_delta_log(snapshot, entries)
+
+    def _check_version(self, expected_version: Optional[tuple]) -> None:
+        if expected_version is not None and self.current_version() != tuple(expected_version):
+            raise MemoryConflictError(f"delta log for learner={self.learner_id} changed since it was read")
+
+    def save(self, data: Dict[str, Any], expected_version: Optional[tuple] = None) -> bool:
+        """Replace the snapshot outright; pending log entries are archived."""
+        with self._lock:
+            self._check_version(expected_version)
+            self._log_position()
+            snapshot_seq = int((self._read_snapshot() or {}).get("log_seq", 0))
+            self._fold(dict(data), self._read_log(snapshot_seq))
+            self.version = self.current_version()
+        return True
+
+    def save_delta(self, changes: Dict[str, Any], expected_version: Optional[tuple] = None) -> bool:
+        """Append one log entry; compact once enough entries are pending."""
+        with self._lock:
+            entry = make_log_entry(changes)
+            if entry is None:
+                return True
+            self._check_version(expected_version)
+            self._log_position()
+            entry["seq"] = self._last_seq + 1
+            self._append(self.log_path, [json.dumps(entry, ensure_ascii=False)])
+            self._last_seq = entry["seq"]
+            self._pending += 1
+            if self.compact_after and self._pending >= self.compact_after:
+                self._compact()
+            self.version = self.current_version()
+        return True
+
+    def compact(self) -> None:
+        """Fold every pending log entry into the snapshot now."""
+        with self._lock:
+            self._log_position()
+            self._compact()
+
+    def _compact(self) -> None:
+        snapshot = self._read_snapshot()
+        entries = self._read_log(int((snapshot or {}).get("log_seq", 0)))
+        if entries:
+            self._fold(replay_delta_log(snapshot, entries), entries)
+            print(
+                f"[ACE Memory] Compacted {len(entries)} delta log entries for learner={self.learner_id}",
+                flush=True,
+            )
+
+    def _fold(self, data: Dict[str, Any], entries: List[Dict[str, Any]]) -> None:
+        data["log_seq"] = self._last_seq
+        # Snapshot first: if we crash before the log is reset, load() skips
+        # the already-folded entries by their seq.
+        self._write_file(self.snapshot_path, json.dumps(data, ensure_ascii=False))
+        if self.keep_history and entries:
+            self._append(self.history_path, [json.dumps(e, ensure_ascii=False) for e in entries])
+        self._write_file(self.log_path, "")
+        self._pending = 0
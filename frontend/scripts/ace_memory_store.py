@@ -4,6 +4,16 @@ Neo4j-backed persistence for ACE memory.
 Stores each learner's playbook as a single JSON blob attached to an
 `AceMemoryState` node to keep the schema simple while enabling per-user
 isolation across Render dynos.
+
+With ``ACE_MEMORY_STORAGE_MODE=bullets`` each bullet instead lives in its own
+``AceBullet`` node (``(m)-[:HAS_BULLET]->(b)``) and ``save_delta`` writes only
+the bullets an update touched, so write size tracks the delta rather than
+the playbook.
+
+With ``ACE_MEMORY_STORAGE_MODE=log`` each save appends an ``AceMemoryDelta``
+node (``(m)-[:HAS_DELTA]->(d)``) instead; ``load`` replays the entries newer
+than ``m.snapshot_seq`` on top of ``memory_json`` and compaction folds them
+back into ``memory_json`` once ``ACE_MEMORY_LOG_COMPACT_AFTER`` are pending.
 """
 
 from __future__ import annotations
@@ -11,11 +21,20 @@ from __future__ import annotations
 import json
 import os
 import threading
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from neo4j import GraphDatabase
 from neo4j.exceptions import Neo4jError
 
+from ace_memory import MemoryConflictError
+from ace_memory_log import (
+    DEFAULT_COMPACT_AFTER,
+    DEFAULT_KEEP_HISTORY,
+    decode_log_entries,
+    make_log_entry,
+    replay_delta_log,
+)
+
 _DRIVER = None
 _DRIVER_LOCK = threading.Lock()
 
@@ -47,97 +66,536 @@ def _get_database() -> Optional[str]:
     return os.getenv("NEO4J_DATABASE") or None
 
 
+STORAGE_MODES = ("snapshot", "bullets", "log")
+
+
+def _get_storage_mode() -> str:
+    mode = (os.getenv("ACE_MEMORY_STORAGE_MODE") or "snapshot").strip().lower()
+    if mode not in STORAGE_MODES:
+        raise ValueError(
+            f"Unsupported ACE_MEMORY_STORAGE_MODE={mode!r}; expected one of {', '.join(STORAGE_MODES)}"
+        )
+    return mode
+
+
+_NOT_PREFETCHED = object()
+
+# Compare-and-set guard spliced in after the AceMemoryState MERGE. Touching m
+# first takes its write lock, so the revision check cannot race another save;
+# a stale $expectedVersion yields no row and the caller raises a conflict.
+_CAS_GUARD = """
+SET m._cas_lock = true
+REMOVE m._cas_lock
+WITH m
+WHERE $expectedVersion IS NULL OR coalesce(m.revision, 0) = $expectedVersion
+"""
+
+
+def _read_memory_records(tx, learner_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Read transaction: stored memory per learner id (learners without memory are absent)."""
+    result = tx.run(
+        """
+        UNWIND $userIds AS userId
+        MATCH (:User {id: userId})-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
+        OPTIONAL MATCH (m)-[:HAS_BULLET]->(b:AceBullet)
+        WITH userId, m, b ORDER BY b.seq
+        WITH userId, m, collect(b.data) AS bullets
+        OPTIONAL MATCH (m)-[:HAS_DELTA]->(d:AceMemoryDelta)
+        WHERE d.seq > coalesce(m.snapshot_seq, 0)
+        WITH userId, m, bullets, d ORDER BY d.seq
+        RETURN userId,
+               coalesce(m.revision, 0) AS revision,
+               m.memory_json AS memory_json,
+               m.access_clock AS access_clock,
+               m.storage_mode AS storage_mode,
+               bullets,
+               collect(d.payload) AS deltas
+        """,
+        {"userIds": learner_ids},
+    )
+    return {record["userId"]: record.data() for record in result}
+
+
 class Neo4jMemoryStore:
     """Persist ACE memory state for a specific learner in Neo4j."""
 
-    def __init__(self, learner_id: str):
+    def __init__(
+        self,
+        learner_id: str,
+        mode: Optional[str] = None,
+        compact_after: Optional[int] = None,
+        keep_history: Optional[bool] = None,
+    ):
         if not learner_id:
             raise ValueError("learner_id is required for Neo4jMemoryStore")
         self.learner_id = learner_id
         self._database = _get_database()
+        self.mode = mode or _get_storage_mode()
+        if self.mode not in STORAGE_MODES:
+            raise ValueError(f"Unsupported storage mode: {self.mode}")
+        self.compact_after = DEFAULT_COMPACT_AFTER if compact_after is None else compact_after
+        self.keep_history = DEFAULT_KEEP_HISTORY if keep_history is None else keep_history
+        # Set by load() when the stored layout differs from ours (a JSON blob in
+        # bullet mode, bullet nodes in log mode); the next save_delta must then
+        # write every bullet once.
+        self.needs_full_sync = False
+        self._prefetched: Any = _NOT_PREFETCHED  # set by load_many()
+        # Revision of AceMemoryState last read or written through this store;
+        # every write bumps m.revision, so a matching probe means no change.
+        self.version: Optional[int] = None
+
+    @property
+    def supports_delta(self) -> bool:
+        """Whether ACEMemory should call ``save_delta`` instead of ``save``."""
+        return self.mode in ("bullets", "log")
 
     def load(self) -> Optional[Dict[str, Any]]:
         """Load the stored memory JSON for this learner, if it exists."""
+        if self._prefetched is not _NOT_PREFETCHED:
+            data, self._prefetched = self._prefetched, _NOT_PREFETCHED
+            return data
         driver = _get_driver()
         try:
             with driver.session(database=self._database) as session:
-                record = session.run(
-                    """
-                    MATCH (u:User {id: $userId})
-                    MERGE (u)-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
-                    ON CREATE SET
-                        m.id = coalesce($memoryId, randomUUID()),
-                        m.memory_json = $emptyPayload,
-                        m.access_clock = 0,
-                        m.created_at = datetime(),
-                        m.updated_at = datetime()
-                    RETURN m.memory_json AS memory_json,
-                           m.access_clock AS access_clock
-                    """,
-                    {
-                        "userId": self.learner_id,
-                        "memoryId": None,
-                        "emptyPayload": json.dumps(
-                            {"bullets": [], "access_clock": 0}, ensure_ascii=False
-                        ),
-                    },
-                ).single()
-                if not record:
-                    return None
-                raw = record.get("memory_json")
-                if not raw:
-                    return None
-                try:
-                    data = json.loads(raw)
-                except json.JSONDecodeError:
-                    print(
-                        f"[ACE Memory] Warning: Failed to decode stored memory for learner={self.learner_id}",
-                        flush=True,
-                    )
-                    return None
-                access_clock = record.get("access_clock")
-                if access_clock is not None:
-                    try:
-                        access_clock = int(access_clock)
-                    except (TypeError, ValueError):
-                        pass
-                if access_clock is not None and "access_clock" not in data:
-                    data["access_clock"] = access_clock
-                return data
+                records = session.execute_read(_read_memory_records, [self.learner_id])
         except Neo4jError as exc:
             print(
                 f"[ACE Memory] Warning: Neo4j load failed for learner={self.learner_id}: {exc}",
                 flush=True,
             )
             return None
+        return self._decode_record(records.get(self.learner_id))
+
+    @classmethod
+    def load_many(
+        cls, learner_ids: List[str], mode: Optional[str] = None
+    ) -> Dict[str, "Neo4jMemoryStore"]:
+        """
+        Read several learners' memory in one read transaction (warmup).
 
-    def save(self, data: Dict[str, Any]) -> None:
-        """Persist the given memory snapshot for this learner."""
+        Returns one store per learner id; each answers its next ``load()``
+        from this batch instead of querying Neo4j again.
+        """
+        stores = {learner_id: cls(learner_id, mode=mode) for learner_id in dict.fromkeys(learner_ids)}
+        if not stores:
+            return stores
         driver = _get_driver()
-        payload = json.dumps(data, ensure_ascii=False)
-        access_clock = int(data.get("access_clock", 0))
+        try:
+            with driver.session(database=_get_database()) as session:
+                records = session.execute_read(_read_memory_records, list(stores))
+        except Neo4jError as exc:
+            print(f"[ACE Memory] Warning: Neo4j batch load failed: {exc}", flush=True)
+            return stores
+        for learner_id, store in stores.items():
+            store._prefetched = store._decode_record(records.get(learner_id))
+        return stores
+
+    def current_version(self) -> Optional[int]:
+        """
+        Cheap probe for the stored revision (0 when nothing is stored yet).
+
+        Returns None when the probe fails, so callers fall back to a reload.
+        """
+        driver = _get_driver()
+
+        def _read(tx):
+            record = tx.run(
+                """
+                MATCH (:User {id: $userId})-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
+                RETURN coalesce(m.revision, 0) AS revision
+                """,
+                {"userId": self.learner_id},
+            ).single()
+            return record["revision"] if record else 0
+
         try:
             with driver.session(database=self._database) as session:
-                session.run(
-                    """
-                    MERGE (u:User {id: $userId})
-                    ON CREATE SET u.created_at = datetime()
-                    MERGE (u)-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
-                    ON CREATE SET
-                        m.id = randomUUID(),
-                        m.created_at = datetime()
-                    SET m.memory_json = $memory_json,
-                        m.access_clock = $access_clock,
-                        m.updated_at = datetime()
-                    """,
-                    {
-                        "userId": self.learner_id,
-                        "memory_json": payload,
-                        "access_clock": access_clock,
-                    },
+                return session.execute_read(_read)
+        except Neo4jError as exc:
+            print(
+                f"[ACE Memory] Warning: Neo4j version probe failed for learner={self.learner_id}: {exc}",
+                flush=True,
+            )
+            return None
+
+    def _decode_record(self, record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not record:
+            # Nothing stored yet; the first save creates the memory node.
+            self.needs_full_sync = False
+            self.version = 0
+            return None
+        self.version = record.get("revision", 0)
+        stored_mode = record.get("storage_mode") or "snapshot"
+        if self.mode == "bullets":
+            self.needs_full_sync = stored_mode != "bullets"
+        else:
+            # Log mode appends on top of memory_json, which only the
+            # bullet layout leaves empty.
+            self.needs_full_sync = self.mode == "log" and stored_mode == "bullets"
+        if stored_mode == "bullets":
+            data = {"bullets": self._decode_bullets(record.get("bullets") or [])}
+        else:
+            raw = record.get("memory_json")
+            if not raw:
+                return None
+            try:
+                data = json.loads(raw)
+            except json.JSONDecodeError:
+                print(
+                    f"[ACE Memory] Warning: Failed to decode stored memory for learner={self.learner_id}",
+                    flush=True,
                 )
+                return None
+            if stored_mode == "log":
+                entries = decode_log_entries(record.get("deltas") or [], self.learner_id)
+                data = replay_delta_log(data, entries)
+                data.pop("access_clock", None)  # m.access_clock tracks the latest entry
+        access_clock = record.get("access_clock")
+        if access_clock is not None:
+            try:
+                access_clock = int(access_clock)
+            except (TypeError, ValueError):
+                pass
+        if access_clock is not None and "access_clock" not in data:
+            data["access_clock"] = access_clock
+        return data
+
+    def _decode_bullets(self, rows: List[str]) -> List[Dict[str, Any]]:
+        bullets = []
+        for raw in rows:
+            try:
+                bullets.append(json.loads(raw))
+            except (TypeError, json.JSONDecodeError):
+                print(
+                    f"[ACE Memory] Warning: Skipping undecodable bullet for learner={self.learner_id}",
+                    flush=True,
+                )
+        return bullets
+
+    def save(self, data: Dict[str, Any], expected_version: Optional[int] = None) -> bool:
+        """
+        Persist the given memory snapshot for this learner.
+
+        Returns False when the write failed so the caller keeps its pending
+        changes. With ``expected_version`` the write only happens if the
+        stored revision still matches; otherwise MemoryConflictError is raised.
+        """
+        driver = _get_driver()
+        params = {
+            "userId": self.learner_id,
+            "memory_json": json.dumps(data, ensure_ascii=False),
+            "access_clock": int(data.get("access_clock", 0)),
+            "expectedVersion": expected_version,
+        }
+
+        def _write(tx):
+            record = tx.run(
+                """
+                MERGE (u:User {id: $userId})
+                ON CREATE SET u.created_at = datetime()
+                MERGE (u)-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
+                ON CREATE SET
+                    m.id = randomUUID(),
+                    m.created_at = datetime()
+                """
+                + _CAS_GUARD
+                + """
+                SET m.memory_json = $memory_json,
+                    m.access_clock = $access_clock,
+                    m.storage_mode = 'snapshot',
+                    m.snapshot_seq = coalesce(m.log_seq, 0),
+                    m.revision = coalesce(m.revision, 0) + 1,
+                    m.updated_at = datetime()
+                RETURN m.revision AS revision
+                """,
+                params,
+            ).single()
+            if record is None:
+                raise self._conflict(expected_version)
+            return record["revision"]
+
+        try:
+            with driver.session(database=self._database) as session:
+                self.version = session.execute_write(_write)
         except Neo4jError as exc:
             print(
                 f"[ACE Memory] Warning: Neo4j save failed for learner={self.learner_id}: {exc}",
                 flush=True,
             )
+            return False
+        return True
+
+    def _conflict(self, expected_version: Optional[int]) -> MemoryConflictError:
+        return MemoryConflictError(
+            f"stored memory for learner={self.learner_id} is newer than revision {expected_version}"
+        )
+
+    def save_delta(self, changes: Dict[str, Any], expected_version: Optional[int] = None) -> bool:
+        """
+        Persist only what changed since the last save, in one transaction.
+
+        ``changes`` holds ``upserts`` (bullet dicts in playbook order),
+        ``removed`` (bullet ids) and ``access_clock``. After a full sync every
+        bullet node not listed in ``upserts`` is deleted as well. Returns
+        False when the write failed so the caller keeps its pending changes;
+        raises MemoryConflictError when ``expected_version`` is stale.
+        """
+        if self.mode == "log":
+            return self._save_log_entry(changes, expected_version)
+        driver = _get_driver()
+        full_sync = self.needs_full_sync
+        upserts = [
+            {"id": bullet["id"], "data": json.dumps(bullet, ensure_ascii=False)}
+            for bullet in changes.get("upserts", [])
+        ]
+        params = {
+            "userId": self.learner_id,
+            "access_clock": int(changes.get("access_clock", 0)),
+            "upserts": upserts,
+            "removed": list(changes.get("removed", [])),
+            "keep": [row["id"] for row in upserts],
+            "expectedVersion": expected_version,
+        }
+
+        def _write(tx):
+            record = tx.run(
+                """
+                MERGE (u:User {id: $userId})
+                ON CREATE SET u.created_at = datetime()
+                MERGE (u)-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
+                ON CREATE SET
+                    m.id = randomUUID(),
+                    m.created_at = datetime()
+                """
+                + _CAS_GUARD
+                + """
+                SET m.access_clock = $access_clock,
+                    m.storage_mode = 'bullets',
+                    m.memory_json = null,
+                    m.revision = coalesce(m.revision, 0) + 1,
+                    m.updated_at = datetime()
+                FOREACH (row IN $upserts |
+                    MERGE (m)-[:HAS_BULLET]->(b:AceBullet {id: row.id})
+                    ON CREATE SET
+                        b.seq = coalesce(m.bullet_seq, 0),
+                        m.bullet_seq = coalesce(m.bullet_seq, 0) + 1
+                    SET b.data = row.data,
+                        b.updated_at = datetime()
+                )
+                RETURN m.revision AS revision
+                """,
+                params,
+            ).single()
+            if record is None:
+                raise self._conflict(expected_version)
+            revision = record["revision"]
+            if full_sync:
+                stale_filter = "NOT b.id IN $keep"
+            elif params["removed"]:
+                stale_filter = "b.id IN $removed"
+            else:
+                return revision
+            tx.run(
+                f"""
+                MATCH (:User {{id: $userId}})-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
+                      -[:HAS_BULLET]->(b:AceBullet)
+                WHERE {stale_filter}
+                DETACH DELETE b
+                """,
+                params,
+            ).consume()
+            return revision
+
+        try:
+            with driver.session(database=self._database) as session:
+                self.version = session.execute_write(_write)
+        except Neo4jError as exc:
+            print(
+                f"[ACE Memory] Warning: Neo4j delta save failed for learner={self.learner_id}: {exc}",
+                flush=True,
+            )
+            return False
+        self.needs_full_sync = False
+        return True
+
+    def _save_log_entry(self, changes: Dict[str, Any], expected_version: Optional[int]) -> bool:
+        """Append one ``AceMemoryDelta`` entry, compacting when enough are pending."""
+        if self.needs_full_sync:
+            return self._save_log_snapshot(changes, expected_version)
+        entry = make_log_entry(changes)
+        if entry is None:
+            return True
+        driver = _get_driver()
+
+        def _append(tx):
+            record = tx.run(
+                """
+                MERGE (u:User {id: $userId})
+                ON CREATE SET u.created_at = datetime()
+                MERGE (u)-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
+                ON CREATE SET
+                    m.id = randomUUID(),
+                    m.memory_json = $emptyPayload,
+                    m.created_at = datetime()
+                """
+                + _CAS_GUARD
+                + """
+                SET m.log_seq = coalesce(m.log_seq, 0) + 1,
+                    m.access_clock = $access_clock,
+                    m.storage_mode = 'log',
+                    m.revision = coalesce(m.revision, 0) + 1,
+                    m.updated_at = datetime()
+                CREATE (m)-[:HAS_DELTA]->(d:AceMemoryDelta {
+                    seq: m.log_seq,
+                    payload: $payload,
+                    created_at: datetime()
+                })
+                RETURN m.log_seq - coalesce(m.snapshot_seq, 0) AS pending,
+                       m.revision AS revision
+                """,
+                {
+                    "userId": self.learner_id,
+                    "access_clock": entry["access_clock"],
+                    "payload": json.dumps(entry, ensure_ascii=False),
+                    "emptyPayload": json.dumps({"bullets": [], "access_clock": 0}, ensure_ascii=False),
+                    "expectedVersion": expected_version,
+                },
+            ).single()
+            if record is None:
+                raise self._conflict(expected_version)
+            return record["pending"], record["revision"]
+
+        try:
+            with driver.session(database=self._database) as session:
+                pending, self.version = session.execute_write(_append)
+                if self.compact_after and pending >= self.compact_after:
+                    session.execute_write(self._compact_log)
+        except Neo4jError as exc:
+            print(
+                f"[ACE Memory] Warning: Neo4j delta log append failed for learner={self.learner_id}: {exc}",
+                flush=True,
+            )
+            return False
+        return True
+
+    def _save_log_snapshot(self, changes: Dict[str, Any], expected_version: Optional[int]) -> bool:
+        """Switch a bullet-node layout to log mode by writing one full snapshot."""
+        driver = _get_driver()
+        access_clock = int(changes.get("access_clock", 0))
+        payload = json.dumps(
+            {"bullets": changes.get("upserts", []), "access_clock": access_clock},
+            ensure_ascii=False,
+        )
+
+        def _write(tx):
+            record = tx.run(
+                """
+                MERGE (u:User {id: $userId})
+                ON CREATE SET u.created_at = datetime()
+                MERGE (u)-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
+                ON CREATE SET
+                    m.id = randomUUID(),
+                    m.created_at = datetime()
+                """
+                + _CAS_GUARD
+                + """
+                SET m.memory_json = $memory_json,
+                    m.access_clock = $access_clock,
+                    m.storage_mode = 'log',
+                    m.snapshot_seq = coalesce(m.log_seq, 0),
+                    m.revision = coalesce(m.revision, 0) + 1,
+                    m.updated_at = datetime()
+                WITH m
+                OPTIONAL MATCH (m)-[:HAS_BULLET]->(b:AceBullet)
+                DETACH DELETE b
+                WITH DISTINCT m
+                RETURN m.revision AS revision
+                """,
+                {
+                    "userId": self.learner_id,
+                    "memory_json": payload,
+                    "access_clock": access_clock,
+                    "expectedVersion": expected_version,
+                },
+            ).single()
+            if record is None:
+                raise self._conflict(expected_version)
+            return record["revision"]
+
+        try:
+            with driver.session(database=self._database) as session:
+                self.version = session.execute_write(_write)
+        except Neo4jError as exc:
+            print(
+                f"[ACE Memory] Warning: Neo4j delta log snapshot failed for learner={self.learner_id}: {exc}",
+                flush=True,
+            )
+            return False
+        self.needs_full_sync = False
+        return True
+
+    def compact(self) -> None:
+        """Fold every pending delta log entry into ``memory_json`` now."""
+        driver = _get_driver()
+        try:
+            with driver.session(database=self._database) as session:
+                session.execute_write(self._compact_log)
+        except Neo4jError as exc:
+            print(
+                f"[ACE Memory] Warning: Neo4j delta log compaction failed for learner={self.learner_id}: {exc}",
+                flush=True,
+            )
+
+    def _compact_log(self, tx) -> None:
+        record = tx.run(
+            """
+            MATCH (:User {id: $userId})-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
+            MATCH (m)-[:HAS_DELTA]->(d:AceMemoryDelta)
+            WHERE d.seq > coalesce(m.snapshot_seq, 0)
+            WITH m, d ORDER BY d.seq
+            RETURN m.memory_json AS memory_json,
+                   collect(d.payload) AS deltas,
+                   max(d.seq) AS last_seq
+            """,
+            {"userId": self.learner_id},
+        ).single()
+        if not record or not record["deltas"]:
+            return
+        try:
+            snapshot = json.loads(record["memory_json"]) if record["memory_json"] else None
+        except json.JSONDecodeError:
+            print(
+                f"[ACE Memory] Warning: Skipping compaction, stored snapshot undecodable for learner={self.learner_id}",
+                flush=True,
+            )
+            return
+        entries = decode_log_entries(record["deltas"], self.learner_id)
+        data = replay_delta_log(snapshot, entries)
+        # Entries appended after our read have a higher seq and stay pending.
+        tx.run(
+            """
+            MATCH (:User {id: $userId})-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
+            SET m.memory_json = $memory_json,
+                m.snapshot_seq = $last_seq,
+                m.updated_at = datetime()
+            """,
+            {
+                "userId": self.learner_id,
+                "memory_json": json.dumps(data, ensure_ascii=False),
+                "last_seq": record["last_seq"],
+            },
+        ).consume()
+        if not self.keep_history:
+            tx.run(
+                """
+                MATCH (:User {id: $userId})-[:HAS_ACE_MEMORY]->(m:AceMemoryState)
+                      -[:HAS_DELTA]->(d:AceMemoryDelta)
+                WHERE d.seq <= $last_seq
+                DETACH DELETE d
+                """,
+                {"userId": self.learner_id, "last_seq": record["last_seq"]},
+            ).consume()
+        print(
+            f"[ACE Memory] Compacted {len(entries)} delta log entries for learner={self.learner_id}",
+            flush=True,
+        )
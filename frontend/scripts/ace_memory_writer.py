@@ -0,0 +1,167 @@
+"""
+Write-behind persistence for ACE memory.
+
+With ``ACE_MEMORY_WRITE_BEHIND=1`` ``ACEMemory.apply_delta`` only mutates the
+in-process playbook and queues the learner here. A single background thread
+waits ``ACE_MEMORY_WRITE_BEHIND_DELAY_MS`` after the first queued delta, so
+several deltas for the same learner are coalesced into one storage write
+(one snapshot, or one delta covering every touched bullet).
+
+Durability hooks:
+- ``on_enqueue(memory, delta)`` runs synchronously before ``apply_delta``
+  returns; journal the delta there if losing the queue on a crash matters.
+- ``on_persisted(memory)`` / ``on_error(memory, exc)`` report the outcome of
+  each background write. Failed writes stay queued and are retried after
+  ``retry_delay`` seconds.
+- ``flush()`` writes everything now; it is registered with ``atexit`` and
+  called by the resident runner on shutdown.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_WRITE_BEHIND_DELAY = float(os.getenv("ACE_MEMORY_WRITE_BEHIND_DELAY_MS", "250")) / 1000.0
+DEFAULT_RETRY_DELAY = float(os.getenv("ACE_MEMORY_WRITE_BEHIND_RETRY_MS", "5000")) / 1000.0
+
+_WRITER: Optional["WriteBehindWriter"] = None
+_WRITER_LOCK = threading.Lock()
+
+
+def write_behind_enabled() -> bool:
+    return os.getenv("ACE_MEMORY_WRITE_BEHIND", "0").strip().lower() in ("1", "true", "yes")
+
+
+def get_write_behind() -> "WriteBehindWriter":
+    """Process-wide writer shared by every learner's ACEMemory."""
+    global _WRITER
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            _WRITER = WriteBehindWriter()
+        return _WRITER
+
+
+def flush_write_behind() -> bool:
+    """Flush the shared writer if one was started; True when nothing is left queued."""
+    writer = _WRITER
+    return writer.flush() if writer is not None else True
+
+
+class WriteBehindWriter:
+    """Background thread that coalesces queued ACEMemory saves per learner."""
+
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        retry_delay: Optional[float] = None,
+        on_enqueue: Optional[Callable[[Any, Any], None]] = None,
+        on_persisted: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Any, Exception], None]] = None,
+    ):
+        self.delay = DEFAULT_WRITE_BEHIND_DELAY if delay is None else delay
+        self.retry_delay = DEFAULT_RETRY_DELAY if retry_delay is None else retry_delay
+        self.on_enqueue = on_enqueue
+        self.on_persisted = on_persisted
+        self.on_error = on_error
+        self._due: Dict[Any, float] = {}  # memory -> monotonic time its write is due
+        self._inflight: set = set()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        atexit.register(self.flush)
+
+    def schedule(self, memory: Any, delta: Any = None) -> None:
+        """Queue ``memory`` for a save; repeated calls before it runs coalesce."""
+        if self.on_enqueue is not None:
+            self.on_enqueue(memory, delta)
+        with self._cond:
+            self._due.setdefault(memory, time.monotonic() + self.delay)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._due) + len(self._inflight)
+
+    def flush(self, memory: Any = None) -> bool:
+        """
+        Persist queued saves now, in the calling thread.
+
+        Flushes one learner's memory, or every queued one when ``memory`` is
+        None. Waits for a write already in flight. Returns False if any write
+        failed (it stays queued for retry).
+        """
+        with self._cond:
+            while (memory in self._inflight) if memory is not None else self._inflight:
+                self._cond.wait()
+            if memory is None:
+                targets = list(self._due)
+                self._due.clear()
+            else:
+                self._due.pop(memory, None)
+                targets = [memory]
+            self._inflight.update(targets)
+        failed: List[Any] = []
+        try:
+            for target in targets:
+                if not self._persist(target):
+                    failed.append(target)
+        finally:
+            self._finish(targets, failed)
+        return not failed
+
+    def _ensure_thread(self) -> None:
+        # A forked worker inherits the queue but not the thread.
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="ace-memory-write-behind", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._due:
+                    self._cond.wait()
+                now = time.monotonic()
+                batch = [memory for memory, due in self._due.items() if due <= now]
+                if not batch:
+                    self._cond.wait(min(self._due.values()) - now)
+                    continue
+                for memory in batch:
+                    del self._due[memory]
+                self._inflight.update(batch)
+            failed = [memory for memory in batch if not self._persist(memory)]
+            self._finish(batch, failed)
+
+    def _finish(self, batch: List[Any], failed: List[Any]) -> None:
+        with self._cond:
+            self._inflight.difference_update(batch)
+            retry_at = time.monotonic() + self.retry_delay
+            requeued = False
+            for memory in failed:
+                if memory.has_pending_save():
+                    self._due.setdefault(memory, retry_at)
+                    requeued = True
+            if requeued:
+                self._ensure_thread()
+            self._cond.notify_all()
+
+    def _persist(self, memory: Any) -> bool:
+        learner = getattr(getattr(memory, "_storage", None), "learner_id", "unknown")
+        try:
+            saved = memory._persist_pending()
+        except Exception as exc:
+            print(f"[ACE Memory] ERROR: Write-behind save failed for learner={learner}: {exc}", flush=True)
+            if self.on_error is not None:
+                self.on_error(memory, exc)
+            return False
+        if not saved:
+            return False  # the store refused the write; changes stay pending
+        if self.on_persisted is not None:
+            self.on_persisted(memory)
+        return True
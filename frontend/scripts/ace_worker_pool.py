@@ -0,0 +1,282 @@
+"""
+Pre-forked pool of resident ACE workers with per-learner affinity.
+
+The supervisor speaks the same newline-delimited JSON protocol as
+``run_ace_agent.py --serve`` but fans requests out to N worker processes.
+Workers are forked from a ``forkserver`` that has already imported the
+heavy LangGraph / LangChain / Neo4j stack, so each fork starts warm.
+
+Requests are routed by a stable hash of ``scratch.learner_id``. A learner's
+``ACEMemory`` therefore lives in exactly one worker's ``_ACE_CACHE`` and two
+workers never write the same ``AceMemoryState`` node concurrently. Each slot
+handles its requests in order; recycling a worker waits for the old process
+to exit before the replacement takes over the slot. ``{"command": ...}``
+lines go to every worker and are answered once with all their responses.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+# Modules imported once in the forkserver before any worker is forked
+_PRELOAD_MODULES = ["run_ace_agent", "ace_worker_pool"]
+_SHUTDOWN_TIMEOUT = 30.0
+
+
+def _log(message: str) -> None:
+    sys.stderr.write(f"[ACE Pool] {message}\n")
+    sys.stderr.flush()
+
+
+def _worker_main(conn, slot: int) -> None:
+    """Entry point for a pooled worker: answer requests from ``conn`` until told to stop."""
+    from run_ace_agent import (
+        _drain_background_learning,
+        _flush_memory_writes,
+        _handle_request,
+        _warm_storage,
+        build_ace_graph,
+    )
+
+    # Keep stray prints off the supervisor's protocol stream
+    sys.stdout = sys.stderr
+    app = build_ace_graph(use_checkpointer=False)
+    _warm_storage()
+    _log(f"Worker {slot} ready | pid={os.getpid()}")
+
+    try:
+        while True:
+            try:
+                payload = conn.recv()
+            except (EOFError, OSError):
+                break
+            if payload is None:
+                break
+            conn.send(_handle_request(app, payload))
+    finally:
+        # Forked workers leave through os._exit, so atexit hooks never run;
+        # finish queued learning and memory saves before the slot moves on.
+        _drain_background_learning()
+        _flush_memory_writes()
+        conn.close()
+
+
+def _learner_key(payload: Any) -> str:
+    if not isinstance(payload, dict):
+        return ""
+    scratch = payload.get("scratch") or {}
+    learner_id = scratch.get("learner_id") if isinstance(scratch, dict) else None
+    return str(learner_id or "")
+
+
+class _WorkerSlot:
+    """One affinity slot: a request queue, a dispatcher thread and the current worker process."""
+
+    def __init__(self, pool: "AceWorkerPool", index: int):
+        self.pool = pool
+        self.index = index
+        self.queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.process = None
+        self.conn = None
+        self.served = 0
+        self.thread = threading.Thread(
+            target=self._run, name=f"ace-slot-{index}", daemon=True
+        )
+
+    def start(self) -> None:
+        self._spawn()
+        self.thread.start()
+
+    def _spawn(self) -> None:
+        parent_conn, child_conn = self.pool.ctx.Pipe()
+        process = self.pool.ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.index),
+            name=f"ace-worker-{self.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.process = process
+        self.conn = parent_conn
+        self.served = 0
+
+    def _stop(self) -> None:
+        """Ask the current worker to exit and wait for it so no two processes share the slot."""
+        if self.conn is not None:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        if self.process is not None:
+            self.process.join(_SHUTDOWN_TIMEOUT)
+            if self.process.is_alive():
+                _log(f"Worker {self.index} did not exit; terminating pid={self.process.pid}")
+                self.process.terminate()
+                self.process.join()
+        if self.conn is not None:
+            self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def _recycle(self, reason: str) -> None:
+        old_pid = self.process.pid if self.process is not None else None
+        self._stop()
+        self._spawn()
+        _log(f"Recycled worker {self.index} ({reason}) | old_pid={old_pid} new_pid={self.process.pid}")
+
+    def _run(self) -> None:
+        max_requests = self.pool.max_requests
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self._stop()
+                return
+            payload, callback = item
+            if max_requests and self.served >= max_requests:
+                self._recycle(f"served {self.served} requests")
+            try:
+                self.conn.send(payload)
+                response = self.conn.recv()
+            except (EOFError, OSError) as exc:
+                response = {"error": f"ACE worker {self.index} exited unexpectedly: {exc}"}
+                if isinstance(payload, dict) and payload.get("id") is not None:
+                    response["id"] = payload["id"]
+                self._recycle("crashed")
+            else:
+                self.served += 1
+            try:
+                callback(response)
+            finally:
+                self.pool._release()
+
+
+class AceWorkerPool:
+    """Supervisor for N pooled ACE workers routed by learner id."""
+
+    def __init__(
+        self,
+        num_workers: int,
+        max_requests: int = 0,
+        max_concurrency: Optional[int] = None,
+        start_method: Optional[str] = None,
+    ):
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.num_workers = num_workers
+        self.max_requests = max(0, int(max_requests or 0))
+        self.max_concurrency = max_concurrency or num_workers * 4
+        self._slots_available = threading.BoundedSemaphore(self.max_concurrency)
+
+        method = start_method or (
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        self.ctx = multiprocessing.get_context(method)
+        if method == "forkserver":
+            self.ctx.set_forkserver_preload(_PRELOAD_MODULES)
+        self.slots = [_WorkerSlot(self, idx) for idx in range(num_workers)]
+
+    def start(self) -> None:
+        for slot in self.slots:
+            slot.start()
+        _log(
+            f"Started {self.num_workers} workers | max_requests={self.max_requests or 'unlimited'} "
+            f"| max_concurrency={self.max_concurrency}"
+        )
+
+    def slot_for(self, payload: Any) -> int:
+        """Stable learner→slot mapping (crc32 so it survives supervisor restarts)."""
+        return zlib.crc32(_learner_key(payload).encode("utf-8")) % self.num_workers
+
+    def submit(self, payload: Dict[str, Any], callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Queue a request; blocks while ``max_concurrency`` requests are already pending."""
+        self._slots_available.acquire()
+        self.slots[self.slot_for(payload)].queue.put((payload, callback))
+
+    def broadcast(self, payload: Dict[str, Any], callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Queue ``payload`` on every slot; ``callback`` gets one reply listing each worker's response."""
+        responses: list = [None] * self.num_workers
+        remaining = [self.num_workers]
+        lock = threading.Lock()
+
+        def collect(index: int, response: Dict[str, Any]) -> None:
+            response.pop("id", None)
+            with lock:
+                responses[index] = response
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            merged: Dict[str, Any] = {"workers": responses}
+            if payload.get("id") is not None:
+                merged["id"] = payload["id"]
+            callback(merged)
+
+        for slot in self.slots:
+            self._slots_available.acquire()
+            slot.queue.put((payload, lambda response, index=slot.index: collect(index, response)))
+
+    def _release(self) -> None:
+        self._slots_available.release()
+
+    def shutdown(self) -> None:
+        """Drain every slot's queue, then stop the workers."""
+        for slot in self.slots:
+            slot.queue.put(None)
+        for slot in self.slots:
+            slot.thread.join()
+
+
+def serve_pool(
+    num_workers: int,
+    max_requests: int = 0,
+    max_concurrency: Optional[int] = None,
+    stdin=None,
+    stdout=None,
+) -> int:
+    """Run the pool supervisor over newline-delimited JSON on stdin/stdout."""
+    stdin = stdin or sys.stdin
+    original_stdout = sys.stdout
+    protocol_out = stdout or original_stdout
+    sys.stdout = sys.stderr
+    write_lock = threading.Lock()
+
+    def emit(obj: Dict[str, Any]) -> None:
+        with write_lock:
+            json.dump(obj, protocol_out, ensure_ascii=False)
+            protocol_out.write("\n")
+            protocol_out.flush()
+
+    pool = AceWorkerPool(num_workers, max_requests=max_requests, max_concurrency=max_concurrency)
+    try:
+        pool.start()
+        emit({"ready": True, "pid": os.getpid(), "workers": num_workers})
+
+        for raw in stdin:
+            if not raw.strip():
+                continue
+            try:
+                payload = json.loads(raw)
+            except json.JSONDecodeError as exc:
+                emit({"error": f"Invalid JSON payload: {exc}"})
+                continue
+            if isinstance(payload, dict) and "command" in payload:
+                pool.broadcast(payload, emit)
+            else:
+                pool.submit(payload, emit)
+
+        _log("stdin closed; draining workers")
+        pool.shutdown()
+        return 0
+    finally:
+        sys.stdout = original_stdout
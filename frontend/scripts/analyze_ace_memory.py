@@ -282,7 +282,7 @@ def cleanup_memory(learner_id: str, similarity: float = 0.9, dry_run: bool = Fal
         for other in bullets_sorted[idx + 1 :]:
             if other.id in visited:
                 continue
-            score = memory._text_similarity(keep.content, other.content)
+            score = memory._token_similarity(keep.tokens(), other.tokens())
             if score >= similarity:
                 cluster.append(other)
                 visited.add(other.id)
@@ -297,8 +297,7 @@ def cleanup_memory(learner_id: str, similarity: float = 0.9, dry_run: bool = Fal
             memory._merge_bullet_into(keep, dup)
             memory._touch_bullet(keep)
             for tag in dup.tags:
-                if dup.id in memory.categories.get(tag, []):
-                    memory.categories[tag].remove(dup.id)
+                memory.categories.get(tag, set()).discard(dup.id)
             memory._unregister_bullet(dup.id)
             memory.bullets.pop(dup.id, None)
             merges += 1
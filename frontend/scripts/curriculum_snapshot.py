@@ -0,0 +1,253 @@
+"""
+In-process snapshot of the curriculum subgraph for the ``curriculum_lookup`` tool.
+
+Chapter, Unit, Section, Example, Definition, Problem and Activity nodes only
+change when the textbook is re-imported, so they are read from Neo4j once
+(one read transaction over the shared driver) into a list of entries with a
+title index and a keyword index. Lookups are then dictionary reads with no
+network round trip and no LLM call.
+
+- The snapshot is loaded on the first lookup.
+- ``refresh_curriculum_snapshot()`` reloads it now. The resident runner
+  exposes it as ``{"command": "refresh_curriculum"}``.
+- ``invalidate_neo4j_cache()`` with any curriculum label (or with no labels)
+  drops the snapshot too, and the next lookup reloads it.
+- ``ACE_CURRICULUM_SNAPSHOT=0`` removes the tool.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from neo4j_qa_cache import CURRICULUM_LABELS, get_neo4j_qa_cache, normalize_question
+
+# Display order; also the order entries are loaded and tie-broken in
+CURRICULUM_TYPES: Tuple[str, ...] = ("Chapter", "Unit", "Section", "Example", "Definition", "Problem", "Activity")
+MAX_FIELD_CHARS = int(os.getenv("ACE_CURRICULUM_MAX_FIELD_CHARS", "1500"))
+
+_TITLE_FIELDS = {
+    "Chapter": "name",
+    "Unit": "name",
+    "Section": "title",
+    "Example": "title",
+    "Definition": "term",
+    "Problem": "instructions",
+    "Activity": "prompt",
+}
+
+_UNDER_UNIT = (
+    "MATCH (u:Unit)-[:CONTAINS]->(n:{label}) OPTIONAL MATCH (c:Chapter)-[:HAS_UNIT]->(u) "
+    "RETURN properties(n) AS props, c.name AS chapter, u.name AS unit, null AS section "
+    "ORDER BY c.order, u.order, n.order"
+)
+_LOAD_QUERIES: Tuple[Tuple[str, str], ...] = (
+    ("Chapter", "MATCH (n:Chapter) RETURN properties(n) AS props, null AS chapter, null AS unit, null AS section ORDER BY n.order"),
+    (
+        "Unit",
+        "MATCH (n:Unit) OPTIONAL MATCH (c:Chapter)-[:HAS_UNIT]->(n) "
+        "RETURN properties(n) AS props, c.name AS chapter, null AS unit, null AS section ORDER BY c.order, n.order",
+    ),
+    ("Section", _UNDER_UNIT.format(label="Section")),
+    (
+        "Example",
+        "MATCH (s:Section)-[:CONTAINS]->(n:Example) OPTIONAL MATCH (u:Unit)-[:CONTAINS]->(s) "
+        "OPTIONAL MATCH (c:Chapter)-[:HAS_UNIT]->(u) "
+        "RETURN properties(n) AS props, c.name AS chapter, u.name AS unit, s.title AS section "
+        "ORDER BY c.order, u.order, s.order, n.order",
+    ),
+    ("Definition", _UNDER_UNIT.format(label="Definition")),
+    ("Problem", _UNDER_UNIT.format(label="Problem")),
+    ("Activity", _UNDER_UNIT.format(label="Activity")),
+)
+
+_STOPWORDS = frozenset(
+    "a an and are about does do explain find for from give how in is it list me of on or show "
+    "tell that the this to what which with".split()
+)
+
+_SNAPSHOT: Optional["CurriculumSnapshot"] = None
+_SNAPSHOT_LOCK = threading.Lock()
+_HOOKED_CACHE: Any = None
+
+
+def curriculum_snapshot_enabled() -> bool:
+    return os.getenv("ACE_CURRICULUM_SNAPSHOT", "1").strip().lower() not in ("0", "false", "no")
+
+
+def _terms(text: str) -> List[str]:
+    """Lower-cased words without stopwords; plural and -ing endings dropped."""
+    terms = []
+    for word in re.findall(r"[a-z0-9]+", (text or "").lower()):
+        if word in _STOPWORDS:
+            continue
+        for suffix in ("ing", "es", "s"):
+            if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+                word = word[: -len(suffix)]
+                break
+        terms.append(word)
+    return terms
+
+
+def _clip(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > MAX_FIELD_CHARS:
+        return value[:MAX_FIELD_CHARS] + "…"
+    return value
+
+
+@dataclass(frozen=True)
+class CurriculumEntry:
+    """One curriculum node with its place in the Chapter > Unit > Section tree."""
+    label: str
+    title: str
+    chapter: Optional[str]
+    unit: Optional[str]
+    section: Optional[str]
+    fields: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"type": self.label, "title": self.title}
+        for key in ("chapter", "unit", "section"):
+            if getattr(self, key):
+                out[key] = getattr(self, key)
+        out.update((k, _clip(v)) for k, v in self.fields.items())
+        return out
+
+
+class CurriculumSnapshot:
+    """Curriculum entries with a normalized-title index and a keyword index."""
+
+    def __init__(self, entries: Sequence[CurriculumEntry], loaded_at: Optional[float] = None):
+        self.entries: Tuple[CurriculumEntry, ...] = tuple(entries)
+        self.loaded_at = time.time() if loaded_at is None else loaded_at
+        self._by_title: Dict[str, List[int]] = {}
+        self._by_term: Dict[str, List[int]] = {}
+        self._title_terms: List[FrozenSet[str]] = []
+        for idx, entry in enumerate(self.entries):
+            self._by_title.setdefault(normalize_question(entry.title), []).append(idx)
+            title_terms = frozenset(_terms(entry.title))
+            self._title_terms.append(title_terms)
+            text = " ".join(str(v) for v in entry.fields.values() if isinstance(v, (str, list)))
+            for term in title_terms | frozenset(_terms(text)):
+                self._by_term.setdefault(term, []).append(idx)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Dict[str, Any]]]) -> "CurriculumSnapshot":
+        """Build from ``(label, {"props", "chapter", "unit", "section"})`` rows."""
+        entries = []
+        for label, record in records:
+            props = {k: v for k, v in (record.get("props") or {}).items() if v not in (None, "", [])}
+            title = props.pop(_TITLE_FIELDS.get(label, "title"), None) or (
+                f"{label} {props.get('number', props.get('order', ''))}"
+            )
+            entries.append(CurriculumEntry(
+                label=label,
+                title=str(title).strip(),
+                chapter=record.get("chapter"),
+                unit=record.get("unit"),
+                section=record.get("section"),
+                fields=props,
+            ))
+        return cls(entries)
+
+    def counts(self) -> Dict[str, int]:
+        return dict(Counter(entry.label for entry in self.entries))
+
+    def search(
+        self,
+        query: str = "",
+        types: Optional[Iterable[str]] = None,
+        limit: int = 5,
+    ) -> List[CurriculumEntry]:
+        """
+        Entries matching ``query``, best first: an exact title beats title
+        words, which beat words in the content. An empty query lists the
+        entries of ``types`` in curriculum order.
+        """
+        wanted = frozenset(types) if types else None
+        limit = max(1, int(limit))
+        if not (query or "").strip():
+            listed = (e for e in self.entries if wanted is None or e.label in wanted)
+            return [entry for entry, _ in zip(listed, range(limit))]
+
+        scores: Counter = Counter()
+        for idx in self._by_title.get(normalize_question(query), ()):
+            scores[idx] += 100
+        for term in set(_terms(query)):
+            for idx in self._by_term.get(term, ()):
+                scores[idx] += 3 if term in self._title_terms[idx] else 1
+        ranked = sorted(
+            (idx for idx in scores if wanted is None or self.entries[idx].label in wanted),
+            key=lambda idx: (-scores[idx], idx),
+        )
+        return [self.entries[idx] for idx in ranked[:limit]]
+
+
+def _read_curriculum(tx) -> List[Tuple[str, Dict[str, Any]]]:
+    records = []
+    for label, cypher in _LOAD_QUERIES:
+        records.extend((label, record.data()) for record in tx.run(cypher))
+    return records
+
+
+def load_curriculum_snapshot() -> CurriculumSnapshot:
+    """Read the whole curriculum subgraph in one read transaction."""
+    from ace_memory_store import _get_database, _get_driver
+
+    start = time.perf_counter()
+    with _get_driver().session(database=_get_database()) as session:
+        records = session.execute_read(_read_curriculum)
+    snapshot = CurriculumSnapshot.from_records(records)
+    print(
+        f"[Curriculum] Loaded {len(snapshot)} entries in {(time.perf_counter() - start) * 1000:.0f} ms "
+        f"| {snapshot.counts()}",
+        flush=True,
+    )
+    return snapshot
+
+
+def _on_cache_invalidated(labels: Optional[FrozenSet[str]]) -> None:
+    """neo4j_qa_cache hook: a curriculum write makes the snapshot stale."""
+    global _SNAPSHOT
+    if labels is None or labels & CURRICULUM_LABELS:
+        with _SNAPSHOT_LOCK:
+            if _SNAPSHOT is not None:
+                print("[Curriculum] Curriculum labels invalidated; snapshot will reload", flush=True)
+            _SNAPSHOT = None
+
+
+def _follow_cache_invalidation() -> None:
+    global _HOOKED_CACHE
+    cache = get_neo4j_qa_cache()
+    if cache is not _HOOKED_CACHE:
+        cache.add_invalidation_hook(_on_cache_invalidated)
+        _HOOKED_CACHE = cache
+
+
+def get_curriculum_snapshot() -> CurriculumSnapshot:
+    """Process-wide snapshot, loaded on first use."""
+    global _SNAPSHOT
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOT is None:
+            _SNAPSHOT = load_curriculum_snapshot()
+        snapshot = _SNAPSHOT
+    _follow_cache_invalidation()
+    return snapshot
+
+
+def refresh_curriculum_snapshot() -> CurriculumSnapshot:
+    """Reload now; lookups keep using the old snapshot until the new one is ready."""
+    global _SNAPSHOT
+    snapshot = load_curriculum_snapshot()
+    with _SNAPSHOT_LOCK:
+        _SNAPSHOT = snapshot
+    _follow_cache_invalidation()
+    return snapshot
@@ -10,6 +10,7 @@ Integrates Agentic Context Engineering into the LangGraph workflow:
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph_utile import *
+from langgraph_utile import _react_tool_schemas
 from typing import Any, Dict, List, Optional
 from pathlib import Path
 import time
@@ -17,14 +18,27 @@ import os
 import re
 
 # Import ACE components
-from ace_memory import ACEMemory
+from ace_memory import ACEMemory, RETRIEVAL_CACHE_KEY
 from ace_components import ACEPipeline, ExecutionTrace
+from ace_learning_queue import LearningQueue, background_learning_enabled
+from ace_memory_log import FileDeltaLogStore
 from ace_memory_store import Neo4jMemoryStore
+from ace_memory_writer import get_write_behind, write_behind_enabled
 
 
 # Global ACE caches keyed by learner identifier
 _ACE_CACHE: Dict[str, Dict[str, Any]] = {}
 
+# Created on first use so forked workers each get their own threads
+_LEARNING_QUEUE: Optional[LearningQueue] = None
+
+# Bullets ranked once per turn; router, solver and curator slice this ranking
+ACE_TURN_RETRIEVAL_DEPTH = int(os.getenv("ACE_TURN_RETRIEVAL_DEPTH", "10"))
+
+
+def _turn_retrieval_cache(scratch: Dict[str, Any]) -> Dict[str, Any]:
+    return scratch.setdefault(RETRIEVAL_CACHE_KEY, {})
+
 
 def _extract_retrieval_facets(message: str, scratch: Dict[str, Any]) -> Dict[str, Any]:
     facets: Dict[str, Any] = {}
@@ -66,6 +80,52 @@ def _infer_topic(question: str) -> Optional[str]:
     return None
 
 
+def _use_file_backend() -> bool:
+    return os.getenv("ACE_MEMORY_BACKEND", "neo4j").strip().lower() == "file"
+
+
+def _create_storage(learner_id: str):
+    try:
+        if _use_file_backend():
+            # Local delta-log stand-in for development without Neo4j
+            return FileDeltaLogStore(learner_id)
+        return Neo4jMemoryStore(learner_id)
+    except Exception as exc:
+        raise RuntimeError(
+            f"[ACE Memory] CRITICAL: Neo4j storage initialization failed for learner={learner_id}. "
+            f"Error: {exc}. Please check Neo4j credentials and connection."
+        )
+
+
+def _new_memory(storage) -> ACEMemory:
+    return ACEMemory(
+        max_bullets=100,
+        dedup_threshold=0.85,
+        prune_threshold=0.3,
+        storage=storage,
+        write_behind=get_write_behind() if write_behind_enabled() else None,
+    )
+
+
+def preload_ace_memories(learner_ids: List[str]) -> int:
+    """
+    Warm ``_ACE_CACHE`` with the memory of several learners.
+
+    All playbooks are fetched in one Neo4j read transaction; learners that
+    are already cached are skipped. Returns the number of memories loaded.
+    """
+    pending = [lid for lid in dict.fromkeys(learner_ids) if lid and "memory" not in _ACE_CACHE.get(lid, {})]
+    if not pending:
+        return 0
+    if _use_file_backend():
+        stores = {lid: _create_storage(lid) for lid in pending}
+    else:
+        stores = Neo4jMemoryStore.load_many(pending)
+    for learner_id, storage in stores.items():
+        _ACE_CACHE.setdefault(learner_id, {})["memory"] = _new_memory(storage)
+    return len(stores)
+
+
 def get_ace_system(learner_id: Optional[str] = None):
     """Get or create the ACE system for a specific learner."""
     key = learner_id or "global"
@@ -86,20 +146,7 @@ def get_ace_system(learner_id: Optional[str] = None):
         if not learner_id:
             raise ValueError("[ACE Memory] Error: learner_id is required for memory storage")
 
-        try:
-            storage = Neo4jMemoryStore(learner_id)
-        except Exception as exc:
-            raise RuntimeError(
-                f"[ACE Memory] CRITICAL: Neo4j storage initialization failed for learner={learner_id}. "
-                f"Error: {exc}. Please check Neo4j credentials and connection."
-            )
-
-        memory = ACEMemory(
-            max_bullets=100,
-            dedup_threshold=0.85,
-            prune_threshold=0.3,
-            storage=storage,
-        )
+        memory = _new_memory(_create_storage(learner_id))
         entry["memory"] = memory
 
     pipeline = entry.get("pipeline")
@@ -121,6 +168,8 @@ def get_ace_system(learner_id: Optional[str] = None):
 
 def router_node(state: GraphState) -> GraphState:
     """Router with ACE memory retrieval"""
+    # A new turn starts with an empty retrieval cache
+    state.setdefault("scratch", {})[RETRIEVAL_CACHE_KEY] = {}
     if state.get("mode"):
         return state
 
@@ -148,9 +197,11 @@ def router_node(state: GraphState) -> GraphState:
     scratch["ace_retrieval_facets"] = retrieval_facets
     state["scratch"] = scratch
 
-    relevant_bullets = memory.retrieve_relevant_bullets(
+    relevant_bullets = memory.retrieve_for_turn(
+        _turn_retrieval_cache(scratch),
         user_text,
         top_k=5,
+        depth=ACE_TURN_RETRIEVAL_DEPTH,
         learner_id=learner_id,
         topic=topic,
         facets=retrieval_facets,
@@ -188,8 +239,7 @@ def planner_node(state: GraphState) -> GraphState:
         scratch.setdefault("temperature", 0.2)
     elif mode == "react":
         scratch.setdefault("max_turns", 8)
-        tool_schemas = [_calculator_schema(), _google_search_schema(), _neo4j_retrieveqa_schema()]
-        scratch["tool_names"] = [t["function"]["name"] for t in tool_schemas]
+        scratch["tool_names"] = [t["function"]["name"] for t in _react_tool_schemas()]
         scratch.setdefault("temperature", 0.2)
     elif mode == "cot":
         scratch.setdefault("k", 1)
@@ -234,9 +284,11 @@ def solver_node_with_ace(state: GraphState) -> GraphState:
 
     # Enrich messages with ACE context if enabled
     if scratch.get("use_ace_context", True):
-        retrieved_bullets = memory.retrieve_relevant_bullets(
+        retrieved_bullets = memory.retrieve_for_turn(
+            _turn_retrieval_cache(scratch),
             question,
             top_k=10,
+            depth=ACE_TURN_RETRIEVAL_DEPTH,
             learner_id=learner_id,
             topic=topic,
             facets=facets,
@@ -318,6 +370,37 @@ def critic_node(state: GraphState) -> GraphState:
     return state
 
 
+def _learn_from_trace(learner_id: Optional[str], trace: ExecutionTrace, apply_update: bool = True):
+    """Run the Reflector/Curator pipeline on one turn's trace."""
+    _, pipeline = get_ace_system(learner_id)
+    return pipeline.process_execution(trace, apply_update=apply_update)
+
+
+def _learn_from_traces(items: List[tuple]):
+    """Run several queued traces through one batched Reflector call."""
+    for apply_update in dict.fromkeys(flag for _, _, flag in items):
+        group = [(lid, trace) for lid, trace, flag in items if flag == apply_update]
+        lead = next((lid for lid, _ in group if lid), None)
+        _, pipeline = get_ace_system(lead)
+        pipeline.process_executions(
+            [trace for _, trace in group],
+            apply_update=apply_update,
+            pipeline_for=lambda learner_id: get_ace_system(learner_id)[1],
+        )
+
+
+def _learning_queue() -> LearningQueue:
+    global _LEARNING_QUEUE
+    if _LEARNING_QUEUE is None:
+        _LEARNING_QUEUE = LearningQueue(_learn_from_trace, batch_handler=_learn_from_traces)
+    return _LEARNING_QUEUE
+
+
+def drain_learning_queue(timeout: Optional[float] = None) -> bool:
+    """Wait for background ACE learning to finish (no-op in inline mode)."""
+    return _LEARNING_QUEUE.drain(timeout) if _LEARNING_QUEUE is not None else True
+
+
 def ace_learning_node(state: GraphState) -> GraphState:
     """
     ACE Learning Node: Applies the ACE pipeline to learn from execution.
@@ -326,6 +409,9 @@ def ace_learning_node(state: GraphState) -> GraphState:
     1. Reflector analyzes the execution trace
     2. Curator creates delta updates
     3. Memory is updated with new insights
+
+    With ACE_LEARNING_MODE=background the trace is queued instead and the
+    graph finishes right away.
     """
     try:
         # Extract execution information
@@ -356,18 +442,21 @@ def ace_learning_node(state: GraphState) -> GraphState:
             trace_messages=result.get("trace", messages),  # ReAct mode has trace
             metadata={
                 "mode": mode,
-                "scratch": scratch,
+                # Background learning outlives this state; keep a stable copy
+                "scratch": dict(scratch),
             }
         )
         
-        # Get ACE pipeline
-        _, pipeline = get_ace_system(learner_id)
-        
         # Process execution through ACE pipeline
         # Only apply if we want online learning (can be controlled via config)
         apply_update = scratch.get("ace_online_learning", True)
         
-        delta = pipeline.process_execution(trace, apply_update=apply_update)
+        if background_learning_enabled():
+            queued = _learning_queue().submit(learner_id, trace, apply_update)
+            state.setdefault("scratch", {})["ace_learning"] = "queued" if queued else "inline"
+            delta = None
+        else:
+            delta = _learn_from_trace(learner_id, trace, apply_update)
         
         if delta:
             state.setdefault("scratch", {})["ace_delta"] = {
@@ -381,10 +470,12 @@ def ace_learning_node(state: GraphState) -> GraphState:
         import traceback
         traceback.print_exc()
     
+    # The turn is over; keep the ranking out of the response scratch
+    state.get("scratch", {}).pop(RETRIEVAL_CACHE_KEY, None)
     return state
 
 
-def build_ace_graph() -> any:
+def build_ace_graph(use_checkpointer: bool = True) -> any:
     """Build LangGraph with ACE integration"""
     graph = StateGraph(GraphState)
     
@@ -403,7 +494,7 @@ def build_ace_graph() -> any:
     graph.add_edge("critic", "ace_learning")  # Learn after getting result
     graph.add_edge("ace_learning", END)
     
-    checkpointer = MemorySaver()
+    checkpointer = MemorySaver() if use_checkpointer else None
     app = graph.compile(checkpointer=checkpointer)
     return app
 
@@ -4,24 +4,22 @@ import json
 import time
 import os
 import asyncio, sys
+import threading
 from datetime import datetime
 from pathlib import Path
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
 import requests
-from mcp import ClientSession
-from mcp.client.stdio import stdio_client, StdioServerParameters
-from mcp.client.streamable_http import streamablehttp_client
-from mcp.client.session import ClientSession  # newer import path
-from langchain_community.tools.tavily_search.tool import TavilySearchResults
-from langchain_community.graphs import Neo4jGraph
-from langchain_community.chains.graph_qa.cypher import GraphCypherQAChain
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+# Tool backends (Tavily, Neo4jGraph, GraphCypherQAChain, Gemini via LangChain)
+# are imported inside the functions that use them so CoT/ToT turns never pay
+# for loading them.
 
 # Add project root to path to import prompts
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
@@ -29,6 +27,9 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from prompts.neo4j_prompts import CYPHER_PROMPT, QA_PROMPT
+from neo4j_qa_cache import _WRITE_CLAUSE, get_neo4j_qa_cache, neo4j_qa_cache_enabled, normalize_question
+from neo4j_cypher_templates import match_cypher_template, neo4j_templates_enabled
+from curriculum_snapshot import CURRICULUM_TYPES, curriculum_snapshot_enabled, get_curriculum_snapshot
 from prompts.reasoning_prompts import COT_PROMPT, TOT_EXPAND_TEMPLATE, TOT_VALUE_TEMPLATE, REACT_SYSTEM
 
 from dotenv import load_dotenv
@@ -202,6 +203,64 @@ class GraphState(TypedDict):
     scratch: Dict[str, Any]
     result: Dict[str, Any]
 
+# ===================== Gemini HTTP Session =====================
+
+# One pooled client per process, shared by every LLM instance and thread
+LLM_POOL_SIZE = int(os.getenv("ACE_LLM_POOL_SIZE", "16"))
+LLM_KEEPALIVE_S = float(os.getenv("ACE_LLM_KEEPALIVE_S", "60"))
+LLM_HTTP2 = os.getenv("ACE_LLM_HTTP2", "auto").strip().lower()  # auto | 1 | 0
+# Concurrent Gemini requests per solver call (ToT expansions/values, CoT samples)
+LLM_MAX_CONCURRENCY = int(os.getenv("ACE_LLM_MAX_CONCURRENCY", "8"))
+# Threads for the tool calls of one ReAct turn
+TOOL_MAX_WORKERS = int(os.getenv("ACE_TOOL_MAX_WORKERS", "4"))
+
+_HTTP_SESSION: Any = None
+_HTTP_SESSION_PID: Optional[int] = None
+_HTTP_SESSION_LOCK = threading.Lock()
+
+
+def _new_http_session() -> Any:
+    """
+    HTTP/2 ``httpx.Client`` when ``httpx`` and ``h2`` are installed, otherwise
+    a ``requests.Session`` with a keep-alive pool of ``LLM_POOL_SIZE``.
+    """
+    if LLM_HTTP2 not in ("0", "false", "no"):
+        try:
+            import h2  # noqa: F401  (enables httpx's HTTP/2 support)
+            import httpx
+        except ImportError:
+            if LLM_HTTP2 in ("1", "true", "yes"):
+                print("[LLM] ACE_LLM_HTTP2 requested but httpx[http2] is not installed; using HTTP/1.1", file=sys.stderr)
+        else:
+            return httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=LLM_POOL_SIZE,
+                    max_keepalive_connections=LLM_POOL_SIZE,
+                    keepalive_expiry=LLM_KEEPALIVE_S,
+                ),
+            )
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=LLM_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # No cookies: the session stays read-only state shared across threads
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def get_http_session() -> Any:
+    """Process-wide pooled HTTP client; a forked worker builds its own."""
+    global _HTTP_SESSION, _HTTP_SESSION_PID
+    pid = os.getpid()
+    with _HTTP_SESSION_LOCK:
+        if _HTTP_SESSION is None or _HTTP_SESSION_PID != pid:
+            _HTTP_SESSION = _new_http_session()
+            _HTTP_SESSION_PID = pid
+        return _HTTP_SESSION
+
+
 class LLM:
     def __init__(self, model: str = "gemini-2.5-flash", temperature: float = 0.2):
         self.api_key = os.getenv("GEMINI_API_KEY")
@@ -315,7 +374,7 @@ class LLM:
                 if system_instruction:
                     body["systemInstruction"] = system_instruction
 
-                resp = requests.post(
+                resp = get_http_session().post(
                     self.endpoint,
                     params={"key": self.api_key},
                     json=body,
@@ -372,6 +431,10 @@ class LLM:
 
         raise RuntimeError(f"Gemini call failed after retries: {last_err}")
 
+    async def achat(self, messages: List[Dict[str, Any]], **kwargs: Any) -> Dict[str, Any]:
+        """``chat`` as a coroutine; the request runs on a worker thread over the pooled session."""
+        return await asyncio.to_thread(self.chat, messages, **kwargs)
+
 # Prompts are now imported from prompts/reasoning_prompts.py
 
 ######tools
@@ -471,7 +534,9 @@ def _calculator_schema() -> dict:
     }
 
 def _deep_research_run(args: Dict[str, Any]) -> str:
-    if TavilySearchResults is None:
+    try:
+        from langchain_community.tools.tavily_search.tool import TavilySearchResults
+    except ImportError:
         return "DeepResearch error: langchain_community or tavily-python not installed."
     query = args.get("query") or ""
     if not query:
@@ -596,7 +661,14 @@ def _google_search_schema() -> dict:
     }
 
 # ---- Neo4j Retrieve+QA tool ----
-_NEO4J_CHAIN = None  # lazy singleton
+# One Neo4jGraph per process; QA chains are registered per configuration
+NEO4J_SCHEMA_TTL_S = float(os.getenv("ACE_NEO4J_SCHEMA_TTL_S", "3600"))
+NEO4J_MAX_ROWS = int(os.getenv("ACE_NEO4J_MAX_ROWS", "100"))
+_NEO4J_GRAPH = None
+_NEO4J_SCHEMA: Optional[str] = None
+_NEO4J_SCHEMA_AT = 0.0
+_NEO4J_CHAINS: Dict[Tuple[Any, ...], Any] = {}
+_NEO4J_LOCK = threading.RLock()
 
 def _neo4j_retrieveqa_schema() -> dict:
     return {
@@ -655,16 +727,7 @@ def _extract_cypher_query(text: str) -> str:
     
     return text.strip()
 
-def _build_neo4j_chain(top_k: int = 10):
-    """
-    Build Neo4j GraphCypherQAChain with two-step pipeline:
-    Step 1: Generate Cypher query using CYPHER_PROMPT
-    Step 2: Answer question using QA_PROMPT based on retrieved context
-    """
-    global _NEO4J_CHAIN
-    if _NEO4J_CHAIN is not None:
-        return _NEO4J_CHAIN
-
+def _neo4j_connection() -> Tuple[str, str, str, Optional[str]]:
     # Support both NEXT_PUBLIC_ (for Next.js) and regular env vars (for Python backend)
     # Try regular vars first, then fall back to NEXT_PUBLIC_ vars
     uri = (os.getenv("NEO4J_URI") or 
@@ -678,8 +741,80 @@ def _build_neo4j_chain(top_k: int = 10):
            "password")
     # NEO4J_DATABASE: Optional database name for Neo4j 4.0+. None = default database
     db = os.getenv("NEO4J_DATABASE", None)
+    return uri, user, pwd, db
+
 
-    graph = Neo4jGraph(url=uri, username=user, password=pwd, database=db)
+def _neo4j_graph():
+    """Process-wide Neo4jGraph shared by every QA chain."""
+    global _NEO4J_GRAPH
+    with _NEO4J_LOCK:
+        if _NEO4J_GRAPH is None:
+            from langchain_community.graphs import Neo4jGraph
+
+            uri, user, pwd, db = _neo4j_connection()
+            # The schema is fetched by _neo4j_schema(), not by the constructor
+            _NEO4J_GRAPH = Neo4jGraph(url=uri, username=user, password=pwd, database=db, refresh_schema=False)
+        return _NEO4J_GRAPH
+
+
+def _neo4j_schema() -> str:
+    """
+    Schema string for the Cypher prompt, fetched once and refreshed when it
+    is older than NEO4J_SCHEMA_TTL_S. A changed schema drops the registered
+    chains and the question/Cypher cache built against the old one.
+    """
+    global _NEO4J_SCHEMA, _NEO4J_SCHEMA_AT
+    with _NEO4J_LOCK:
+        if _NEO4J_SCHEMA is not None and time.monotonic() - _NEO4J_SCHEMA_AT < NEO4J_SCHEMA_TTL_S:
+            return _NEO4J_SCHEMA
+        from langchain_community.chains.graph_qa.cypher import construct_schema
+
+        graph = _neo4j_graph()
+        try:
+            graph.refresh_schema()
+        except Exception as exc:
+            if _NEO4J_SCHEMA is None:
+                raise
+            print(f"[Neo4j] Schema refresh failed, keeping the cached schema: {exc}", flush=True)
+            _NEO4J_SCHEMA_AT = time.monotonic()
+            return _NEO4J_SCHEMA
+        schema = construct_schema(graph.get_structured_schema, [], [])
+        if _NEO4J_SCHEMA is not None and schema != _NEO4J_SCHEMA:
+            print("[Neo4j] Schema changed; rebuilding QA chains", flush=True)
+            _NEO4J_CHAINS.clear()
+            get_neo4j_qa_cache().clear()
+        _NEO4J_SCHEMA, _NEO4J_SCHEMA_AT = schema, time.monotonic()
+        return _NEO4J_SCHEMA
+
+
+def _build_neo4j_chain(
+    model: Optional[str] = None,
+    cypher_temperature: float = 0.0,
+    qa_temperature: float = 0.2,
+):
+    """
+    Get the GraphCypherQAChain registered for this configuration, building it
+    on first use. Chains share one Neo4jGraph and one fetched schema:
+    Step 1: Generate Cypher query using CYPHER_PROMPT
+    Step 2: Answer question using QA_PROMPT based on retrieved context
+    """
+    model = model or os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+    key = (model, cypher_temperature, qa_temperature)
+    chain = _NEO4J_CHAINS.get(key)
+    if chain is not None:
+        return chain
+    # Parallel tool calls in one ReAct turn may both get here first
+    with _NEO4J_LOCK:
+        _neo4j_schema()  # from_llm reads the graph's structured schema
+        if key not in _NEO4J_CHAINS:
+            _NEO4J_CHAINS[key] = _new_neo4j_chain(model, cypher_temperature, qa_temperature)
+        return _NEO4J_CHAINS[key]
+
+
+def _new_neo4j_chain(model: str, cypher_temperature: float, qa_temperature: float):
+    from langchain_community.chains.graph_qa.cypher import GraphCypherQAChain
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from langchain_core.prompts import PromptTemplate
 
     # Create PromptTemplate objects from the prompt strings
     # CYPHER_PROMPT expects {schema} and {question} variables
@@ -694,38 +829,124 @@ def _build_neo4j_chain(top_k: int = 10):
         template=QA_PROMPT
     )
 
-    gemini_model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
     gemini_api_key = os.getenv("GEMINI_API_KEY")
     if not gemini_api_key:
         raise RuntimeError("GEMINI_API_KEY not configured for Neo4j tool usage.")
 
     # Use Gemini for both Cypher generation and QA, mirroring the primary agent
     cypher_llm = ChatGoogleGenerativeAI(
-        model=gemini_model,
+        model=model,
         google_api_key=gemini_api_key,
-        temperature=0.0,
+        temperature=cypher_temperature,
     )
 
     qa_llm = ChatGoogleGenerativeAI(
-        model=gemini_model,
+        model=model,
         google_api_key=gemini_api_key,
-        temperature=0.2,
+        temperature=qa_temperature,
     )
 
-    # Build the two-step pipeline chain
-    _NEO4J_CHAIN = GraphCypherQAChain.from_llm(
-        llm=cypher_llm,
+    # Build the two-step pipeline chain; row limits are applied per call in
+    # the Cypher itself, so top_k here is only the upper bound
+    return GraphCypherQAChain.from_llm(
+        cypher_llm=cypher_llm,
         qa_llm=qa_llm,
-        graph=graph,
+        graph=_neo4j_graph(),
         cypher_prompt=cypher_prompt_template,
         qa_prompt=qa_prompt_template,
         return_intermediate_steps=True,
-        top_k=top_k,
+        top_k=NEO4J_MAX_ROWS,
         verbose=True,  # Enable verbose to debug Cypher generation
         allow_dangerous_requests=True,  # Acknowledge that LLM can generate Cypher queries
         validate_cypher=True,  # Validate Cypher syntax before execution
     )
-    return _NEO4J_CHAIN
+
+
+def _generate_cypher(chain: Any, question: str) -> str:
+    """Step 1 of the chain: question -> validated Cypher (one LLM call)."""
+    out = chain.cypher_generation_chain.invoke({"question": question, "schema": _neo4j_schema()})
+    if isinstance(out, dict):
+        out = out.get(getattr(chain.cypher_generation_chain, "output_key", "text"), "")
+    cypher = _extract_cypher_query(str(out))
+    if cypher and chain.cypher_query_corrector:
+        cypher = chain.cypher_query_corrector(cypher)
+    return cypher
+
+
+_TRAILING_LIMIT = re.compile(r"\bLIMIT\s+(\d+)\s*;?\s*$", re.IGNORECASE)
+
+
+def _row_limit(top_k: int) -> int:
+    return max(1, min(int(top_k), NEO4J_MAX_ROWS))
+
+
+def _limit_cypher(cypher: str, limit: int) -> str:
+    """
+    Cap the rows a read query returns: tighten its final LIMIT or append one.
+
+    Write statements and UNION queries are returned unchanged: a LIMIT makes
+    a write without RETURN invalid, and on a UNION it only binds the last
+    branch. Their rows are still sliced after the query.
+    """
+    cypher = (cypher or "").strip().rstrip(";").strip()
+    if not cypher or _WRITE_CLAUSE.search(cypher) or re.search(r"\bUNION\b", cypher, re.IGNORECASE):
+        return cypher
+    limit = _row_limit(limit)
+    match = _TRAILING_LIMIT.search(cypher)
+    if match:
+        return f"{cypher[:match.start(1)]}{min(int(match.group(1)), limit)}"
+    if re.search(r"\bLIMIT\s+\S+\s*$", cypher, re.IGNORECASE):
+        return cypher  # parameterised LIMIT; rows are still sliced after the query
+    return f"{cypher} LIMIT {limit}"
+
+
+def _qa_answer(chain: Any, question: str, context: List[Any]) -> str:
+    """Step 2 of the chain: answer from rows we already have."""
+    result = chain.qa_chain.invoke({"question": question, "context": context})
+    if isinstance(result, dict):
+        return result.get(getattr(chain.qa_chain, "output_key", "text"), "")
+    return str(result)
+
+
+def _answer_with_cypher(
+    chain: Any,
+    cache: Any,
+    question: str,
+    cypher: str,
+    top_k: int,
+    generated: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    require_rows: bool = False,
+) -> Optional[Tuple[str, List[Any]]]:
+    """
+    Run (or reuse) the limited query's rows and answer from them.
+
+    ``generated`` is the unlimited Cypher the LLM just wrote for this
+    question; it is remembered once its query has found rows. With
+    ``require_rows`` an empty result returns None instead of an answer.
+    """
+    key = normalize_question(question)
+    entry = cache.get_rows(cypher, params) if cache is not None and cypher else None
+    if entry is None:
+        rows = _neo4j_graph().query(cypher, params or {})[:top_k] if cypher else []
+        if require_rows and not rows:
+            return None
+        # Empty results may come from a bad query; only remember ones that found rows
+        entry = cache.put_rows(cypher, rows, params) if cache is not None and rows else None
+        if entry is None:
+            return _qa_answer(chain, question, rows), rows
+        if generated:
+            cache.put_cypher(question, generated)
+        else:
+            print(f"[Neo4j Cache] Cypher hit, rows fetched | question={key[:80]}", flush=True)
+    answer = entry.answers.get(key)
+    if answer is None:
+        answer = _qa_answer(chain, question, entry.rows)
+        entry.answers[key] = answer
+    else:
+        print(f"[Neo4j Cache] Full hit | question={key[:80]}", flush=True)
+    return answer, entry.rows
+
 
 def _neo4j_retrieveqa_run(args: Dict[str, Any]) -> str:
     """
@@ -733,6 +954,12 @@ def _neo4j_retrieveqa_run(args: Dict[str, Any]) -> str:
     1. Generate Cypher query from natural language question
     2. Execute query and answer based on retrieved context
     
+    ``top_k`` is applied as a LIMIT in the executed Cypher. Questions that
+    match a ``neo4j_cypher_templates`` intent skip step 1 and run the
+    template's precompiled Cypher; if it finds no rows the chain takes over.
+    Repeated questions are served from ``neo4j_qa_cache``: cached Cypher
+    skips step 1, cached rows skip the Neo4j query and the QA call.
+    
     Returns JSON with answer, generated_cypher, and optionally context.
     """
     question = (args or {}).get("question", "").strip()
@@ -740,41 +967,36 @@ def _neo4j_retrieveqa_run(args: Dict[str, Any]) -> str:
         return "Neo4jRetrieveQA error: missing 'question'."
     top_k = int((args or {}).get("top_k", 10))
     include_context = bool((args or {}).get("include_context", True))
+    cache = get_neo4j_qa_cache() if neo4j_qa_cache_enabled() else None
+    cypher = ""
 
     try:
-        # Build and invoke the two-step chain
-        chain = _build_neo4j_chain(top_k=top_k)
-        res = chain.invoke({"query": question})
-        
-        # Extract results
-        answer = res.get("result", "")
-        interm = res.get("intermediate_steps", []) or []
-        
-        # GraphCypherQAChain intermediate_steps is a list containing:
-        # - dict with "query": the generated Cypher statement
-        # - "context": the raw data retrieved from Neo4j
-        # The structure can vary, so we handle both dict and list formats
-        cypher = ""
-        context = []
-        
-        if isinstance(interm, list) and len(interm) > 0:
-            # intermediate_steps is typically a list of dicts or a dict
-            if isinstance(interm[0], dict):
-                cypher = interm[0].get("query", "")
-                context = interm[0].get("context", [])
-            else:
-                # Sometimes it's a flat list: [query_string, context_list]
-                cypher = str(interm[0]) if len(interm) > 0 else ""
-                context = interm[1] if len(interm) > 1 else []
-        elif isinstance(interm, dict):
-            cypher = interm.get("query", "")
-            context = interm.get("context", [])
+        chain = _build_neo4j_chain()
+        answered = None
+        template = match_cypher_template(question, _row_limit(top_k)) if neo4j_templates_enabled() else None
+        if template is not None:
+            cypher = template.cypher
+            answered = _answer_with_cypher(
+                chain, cache, question, cypher, top_k, params=template.params, require_rows=True
+            )
+            if answered is None:
+                print(f"[Neo4j] Template {template.name} found no rows; generating Cypher", flush=True)
+                template = None
+        if answered is None:
+            cached = cache.get_cypher(question) if cache is not None else None
+            generated = None if cached else _generate_cypher(chain, question)
+            cypher = _limit_cypher(cached or generated, top_k)
+            answered = _answer_with_cypher(chain, cache, question, cypher, top_k, generated)
+        answer, context = answered
 
         payload = {
             "answer": answer,
             "generated_cypher": cypher,
             "top_k": top_k,
         }
+        if template is not None:
+            payload["template"] = template.name
+            payload["cypher_params"] = template.params
         if include_context:
             payload["context"] = context
         
@@ -785,20 +1007,65 @@ def _neo4j_retrieveqa_run(args: Dict[str, Any]) -> str:
             
     except Exception as e:
         error_msg = f"Neo4jRetrieveQA error: {str(e)}"
-        # Try to extract the generated Cypher from intermediate steps if available
-        try:
-            interm = res.get("intermediate_steps", []) if 'res' in locals() else []
-            if interm:
-                if isinstance(interm, list) and len(interm) > 0:
-                    if isinstance(interm[0], dict):
-                        bad_cypher = interm[0].get("query", "")
-                    else:
-                        bad_cypher = str(interm[0])
-                    error_msg += f" | Generated Cypher: {bad_cypher}"
-        except Exception:
-            pass
+        if cypher:
+            error_msg += f" | Generated Cypher: {cypher}"
         return json.dumps({"error": error_msg, "question": question})
 
+# ---- Curriculum lookup tool ----
+def _curriculum_lookup_schema() -> dict:
+    return {
+        "type": "function",
+        "function": {
+            "name": "curriculum_lookup",
+            "description": (
+                "Look up textbook content (chapters, units, sections, examples, definitions, problems, "
+                "activities) in an in-memory copy of the curriculum. Much faster than neo4j_retrieveqa; "
+                "use it first for textbook questions and neo4j_retrieveqa for users, XP, quizzes or "
+                "when it finds nothing."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Title or keywords to search for. Leave empty to list entries of `types` in order."},
+                    "types": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": list(CURRICULUM_TYPES)},
+                        "description": "Only return these kinds of content.",
+                    },
+                    "limit": {"type": "integer", "default": 5, "description": "Maximum number of entries to return."},
+                },
+                "required": [],
+            },
+        },
+    }
+
+def _curriculum_lookup_run(args: Dict[str, Any]) -> str:
+    """Search the curriculum snapshot; loads it from Neo4j on first use."""
+    args = args or {}
+    query = str(args.get("query") or "").strip()
+    types = [t for t in (args.get("types") or []) if t in CURRICULUM_TYPES]
+    limit = max(1, min(int(args.get("limit", 5)), NEO4J_MAX_ROWS))
+    if not query and not types:
+        return "CurriculumLookup error: provide a 'query' or 'types'."
+    try:
+        snapshot = get_curriculum_snapshot()
+    except Exception as e:
+        return json.dumps({"error": f"CurriculumLookup error: {str(e)}", "query": query})
+    results = [entry.to_dict() for entry in snapshot.search(query, types, limit)]
+    payload: Dict[str, Any] = {"query": query, "results": results}
+    if not results:
+        payload["note"] = "No matching curriculum content; try neo4j_retrieveqa."
+    return json.dumps(payload, default=str)
+
+
+def _react_tool_schemas() -> List[dict]:
+    """Tools offered to Gemini in ReAct mode."""
+    schemas = [_calculator_schema(), _google_search_schema()]
+    if curriculum_snapshot_enabled():
+        schemas.append(_curriculum_lookup_schema())
+    schemas.append(_neo4j_retrieveqa_schema())
+    return schemas
+
 ############
 def _extract_final(text: str) -> Optional[str]:
     m = re.search(r"<final>(.*?)</final>", text, flags=re.DOTALL | re.IGNORECASE)
@@ -816,14 +1083,48 @@ def _finalize_answer(text: str) -> str:
     lines = [ln.strip() for ln in stripped.splitlines() if ln.strip()]
     return lines[-1] if lines else stripped
 
+def _run_coroutine(coro):
+    """Run ``coro`` from sync code, also when called inside a running event loop."""
+    async def _main():
+        # achat() runs on the default executor; size it to the connection pool
+        # rather than the CPU count so every semaphore slot gets a thread
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(LLM_POOL_SIZE, thread_name_prefix="llm")
+        )
+        return await coro
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_main())
+    with ThreadPoolExecutor(1) as pool:
+        return pool.submit(asyncio.run, _main()).result()
+
+
+async def _gather_limited(semaphore: asyncio.Semaphore, coros: List[Any]) -> List[Any]:
+    """``asyncio.gather`` with at most ``semaphore`` coroutines in flight; keeps input order."""
+    async def _limited(coro):
+        async with semaphore:
+            return await coro
+    return await asyncio.gather(*(_limited(coro) for coro in coros))
+
+
+def _solver_semaphore(params: Dict[str, Any]) -> asyncio.Semaphore:
+    return asyncio.Semaphore(max(1, int(params.get("max_concurrency", LLM_MAX_CONCURRENCY))))
+
+
 def solve_cot(state: GraphState) -> Dict[str, Any]:
+    return _run_coroutine(asolve_cot(state))
+
+
+async def asolve_cot(state: GraphState) -> Dict[str, Any]:
     params = state["scratch"]
     k = int(params.get("k", 1))
     temp = float(params.get("temperature", 0.2 if k == 1 else 0.7))
     llm = LLM(temperature=temp)
     base_msgs = [{"role": "system", "content": COT_PROMPT}] + state["messages"]
     if k == 1:
-        resp = llm.chat(base_msgs)
+        resp = await llm.achat(base_msgs)
         text = resp["choices"][0]["message"]["content"]
         for thought in re.findall(r"<scratchpad>(.*?)</scratchpad>", text, flags=re.DOTALL):
             print("[ACE Thought][CoT]", thought.strip(), flush=True)
@@ -831,8 +1132,12 @@ def solve_cot(state: GraphState) -> Dict[str, Any]:
         return {"answer": _finalize_answer(cleaned), "raw": text}
     answers: List[str] = []
     raws: List[str] = []
-    for _ in range(k):
-        resp = llm.chat(base_msgs, temperature=temp)
+    # Self-consistency samples are independent; request them together
+    samples = await _gather_limited(
+        _solver_semaphore(params),
+        [llm.achat(base_msgs, temperature=temp) for _ in range(k)],
+    )
+    for resp in samples:
         text = resp["choices"][0]["message"]["content"]
         for thought in re.findall(r"<scratchpad>(.*?)</scratchpad>", text, flags=re.DOTALL):
             print("[ACE Thought][CoT]", thought.strip(), flush=True)
@@ -847,63 +1152,90 @@ def solve_cot(state: GraphState) -> Dict[str, Any]:
     chosen = next(a for a in answers if norm(a) == best_norm)
     return {"answer": chosen, "raw_samples": raws}
 
+
+async def _tot_expand(llm: LLM, user: str, scratchpad: str, breadth: int, temp: float) -> List[str]:
+    sys_prompt = (
+        "You are exploring solution trees. Expand concise next-steps. "
+        "Do not jump to the final answer yet."
+    )
+    expand_prompt = TOT_EXPAND_TEMPLATE.format(k=breadth)
+    msgs = [
+        {"role": "system", "content": sys_prompt},
+        {"role": "user", "content": user},
+        {
+            "role": "assistant",
+            "content": f"<partial>{scratchpad}</partial>\n{expand_prompt}",
+        },
+    ]
+    exp = await llm.achat(msgs, temperature=max(0.7, temp))
+    text = exp["choices"][0]["message"]["content"] or ""
+    next_thoughts: List[str] = []
+    try:
+        j = json.loads(text)
+        if isinstance(j, dict) and isinstance(j.get("thoughts"), list):
+            next_thoughts = [str(t) for t in j["thoughts"]][:breadth]
+    except Exception:
+        pass
+    if not next_thoughts:
+        next_thoughts = [
+            ln.strip(" -•\t")
+            for ln in text.splitlines()
+            if ln.strip().startswith(("-", "1.", "2.", "3.", "•"))
+        ][:breadth]
+        if not next_thoughts:
+            next_thoughts = [text.strip().split("\n")[0]]
+    return next_thoughts
+
+
+async def _tot_value(llm: LLM, user: str, new_pad: str) -> Tuple[str, float]:
+    val_msgs = [
+        {"role": "system", "content": "You are a strict evaluator."},
+        {"role": "user", "content": user},
+        {"role": "assistant", "content": f"<partial>{new_pad}</partial>\n{TOT_VALUE_TEMPLATE}"},
+    ]
+    val = await llm.achat(val_msgs, temperature=0.0)
+    score_text = val["choices"][0]["message"]["content"] or "5"
+    try:
+        score = float(re.findall(r"-?\d+(?:\.\d+)?", score_text)[0])
+    except Exception:
+        score = 5.0
+    return score_text, score
+
+
 def solve_tot(state: GraphState) -> Dict[str, Any]:
+    return _run_coroutine(asolve_tot(state))
+
+
+async def asolve_tot(state: GraphState) -> Dict[str, Any]:
+    """
+    Tree of Thought search. Each depth level sends its beam expansions
+    together, then every candidate's value call together, so a search costs
+    about ``depth * 2`` round trips instead of one per request.
+    """
     params = state["scratch"]
     breadth = int(params.get("breadth", 3))
     depth = int(params.get("depth", 2))
     temp = float(params.get("temperature", 0.2))
     llm = LLM(temperature=temp)
+    semaphore = _solver_semaphore(params)
     user = next((m["content"] for m in state["messages"] if m["role"] == "user"), "")
     beam: List[Tuple[str, float]] = [("", 0.0)]
     for d in range(depth):
-        candidates: List[Tuple[str, float]] = []
-        for scratchpad, _ in beam:
-            sys = (
-                "You are exploring solution trees. Expand concise next-steps. "
-                "Do not jump to the final answer yet."
-            )
-            expand_prompt = TOT_EXPAND_TEMPLATE.format(k=breadth)
-            msgs = [
-                {"role": "system", "content": sys},
-                {"role": "user", "content": user},
-                {
-                    "role": "assistant",
-                    "content": f"<partial>{scratchpad}</partial>\n{expand_prompt}",
-                },
-            ]
-            exp = llm.chat(msgs, temperature=max(0.7, temp))
-            text = exp["choices"][0]["message"]["content"] or ""
-            next_thoughts: List[str] = []
-            try:
-                j = json.loads(text)
-                if isinstance(j, dict) and isinstance(j.get("thoughts"), list):
-                    next_thoughts = [str(t) for t in j["thoughts"]][:breadth]
-            except Exception:
-                pass
-            if not next_thoughts:
-                next_thoughts = [
-                    ln.strip(" -•\t")
-                    for ln in text.splitlines()
-                    if ln.strip().startswith(("-", "1.", "2.", "3.", "•"))
-                ][:breadth]
-                if not next_thoughts:
-                    next_thoughts = [text.strip().split("\n")[0]]
+        expansions = await _gather_limited(
+            semaphore,
+            [_tot_expand(llm, user, scratchpad, breadth, temp) for scratchpad, _ in beam],
+        )
+        new_pads: List[str] = []
+        for (scratchpad, _), next_thoughts in zip(beam, expansions):
             for thought in next_thoughts:
                 new_pad = (scratchpad + "\n" if scratchpad else "") + f"Thought: {thought}"
                 print("[ACE Thought][ToT Expand]", new_pad.strip(), flush=True)
-                val_msgs = [
-                    {"role": "system", "content": "You are a strict evaluator."},
-                    {"role": "user", "content": user},
-                    {"role": "assistant", "content": f"<partial>{new_pad}</partial>\n{TOT_VALUE_TEMPLATE}"},
-                ]
-                val = llm.chat(val_msgs, temperature=0.0)
-                score_text = val["choices"][0]["message"]["content"] or "5"
-                try:
-                    score = float(re.findall(r"-?\d+(?:\.\d+)?", score_text)[0])
-                except Exception:
-                    score = 5.0
-                print(f"[ACE Thought][ToT Score] {score_text.strip()} -> {score}", flush=True)
-                candidates.append((new_pad, score))
+                new_pads.append(new_pad)
+        scores = await _gather_limited(semaphore, [_tot_value(llm, user, pad) for pad in new_pads])
+        candidates: List[Tuple[str, float]] = []
+        for new_pad, (score_text, score) in zip(new_pads, scores):
+            print(f"[ACE Thought][ToT Score] {score_text.strip()} -> {score}", flush=True)
+            candidates.append((new_pad, score))
         candidates.sort(key=lambda x: x[1], reverse=True)
         beam = candidates[:breadth] if candidates else beam
     best_pad = beam[0][0]
@@ -913,7 +1245,7 @@ def solve_tot(state: GraphState) -> Dict[str, Any]:
         {"role": "user", "content": user},
         {"role": "assistant", "content": f"<scratchpad>{best_pad}</scratchpad>\nNow conclude."},
     ]
-    fin = llm.chat(final_msgs, temperature=0.0)
+    fin = await llm.achat(final_msgs, temperature=0.0)
     text = fin["choices"][0]["message"]["content"]
     for thought in re.findall(r"<scratchpad>(.*?)</scratchpad>", text, flags=re.DOTALL):
         print("[ACE Thought][ToT Final]", thought.strip(), flush=True)
@@ -921,12 +1253,49 @@ def solve_tot(state: GraphState) -> Dict[str, Any]:
     return {"answer": _finalize_answer(text), "scratchpad": best_pad}
 
 
+def _run_tool_call(tc: Dict[str, Any]) -> Any:
+    name = tc["function"]["name"]
+    args = tc["function"].get("arguments")
+    try:
+        parsed = json.loads(args) if isinstance(args, str) else (args or {})
+    except Exception:
+        parsed = {}
+
+    ##### Route to appropriate tool
+    if name == "calculator":
+        return _calculator_run(parsed)
+    elif name == "google_search":
+        return _google_search_run(parsed)
+    elif name == "deep_research":
+        return _deep_research_run(parsed)
+    elif name == "neo4j_retrieveqa":
+        return _neo4j_retrieveqa_run(parsed)
+    elif name == "curriculum_lookup":
+        return _curriculum_lookup_run(parsed)
+    return f"Unknown tool: {name}"
+
+
+def _run_tool_calls(tool_calls: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Run one turn's tool calls, in parallel when there are several.
+
+    Calls within a turn are independent, so network-bound tools (search,
+    Neo4j QA) overlap instead of adding up. Outputs are returned in call
+    order.
+    """
+    workers = min(TOOL_MAX_WORKERS, len(tool_calls))
+    if workers <= 1:
+        return [_run_tool_call(tc) for tc in tool_calls]
+    with ThreadPoolExecutor(workers, thread_name_prefix="ace-tool") as pool:
+        return list(pool.map(_run_tool_call, tool_calls))
+
+
 def solve_react(state: GraphState) -> Dict[str, Any]:
     params = state["scratch"]
     max_turns = int(params.get("max_turns", 8))  # Increased from 6 to 8
     temp = float(params.get("temperature", 0.2))
-    # Build tool schemas dynamically: calculator + google-search + neo4j
-    tool_schemas = [_calculator_schema(), _google_search_schema(), _neo4j_retrieveqa_schema()]
+    # Build tool schemas dynamically: calculator + google-search + curriculum + neo4j
+    tool_schemas = _react_tool_schemas()
     llm = LLM(temperature=temp)
     messages = [{"role": "system", "content": REACT_SYSTEM}] + state["messages"]
 
@@ -955,28 +1324,10 @@ def solve_react(state: GraphState) -> Dict[str, Any]:
             assistant_msg["tool_calls"] = tool_calls
         messages.append(assistant_msg)
 
-        # Process tool calls if any
+        # Process tool calls if any; results keep the order Gemini asked for them
         if tool_calls:
-            for tc in tool_calls:
+            for tc, out in zip(tool_calls, _run_tool_calls(tool_calls)):
                 name = tc["function"]["name"]
-                args = tc["function"].get("arguments")
-                try:
-                    parsed = json.loads(args) if isinstance(args, str) else (args or {})
-                except Exception:
-                    parsed = {}
-
-                ##### Route to appropriate tool
-                if name == "calculator":
-                    out = _calculator_run(parsed)
-                elif name == "google_search":
-                    out = _google_search_run(parsed)
-                elif name == "deep_research":
-                    out = _deep_research_run(parsed)
-                elif name == "neo4j_retrieveqa":
-                    out = _neo4j_retrieveqa_run(parsed)
-                else:
-                    out = f"Unknown tool: {name}"
-
                 messages.append(
                     {
                         "role": "tool",
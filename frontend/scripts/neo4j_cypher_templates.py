@@ -0,0 +1,221 @@
+"""
+Precompiled Cypher for the ``neo4j_retrieveqa`` questions we see most often.
+
+Each template pairs question patterns with a parameterised Cypher statement
+taken from the examples in ``prompts/neo4j_prompts.CYPHER_PROMPT``. A
+recognised question is answered with that statement and its parameters, so
+it skips the Cypher-generation LLM call, and Neo4j reuses one query plan
+because the statement text never changes. Unrecognised questions go to the
+QA chain as before.
+
+- Patterns are matched against the whole normalized question, so questions
+  with extra conditions ("... in chapter 2 after March") fall through.
+- Names and keywords are matched case-insensitively with CONTAINS. A
+  template that finds no rows falls back to the chain as well.
+- ``ACE_NEO4J_TEMPLATES=0`` disables the fast path.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from neo4j_qa_cache import normalize_question
+
+ParamBuilder = Callable[[Dict[str, str], int], Dict[str, Any]]
+
+# Optional request phrasing in front of the subject ("can you list all the ...")
+_ASK = (
+    r"(?:(?:can you |could you |please )?"
+    r"(?:list|show|give|tell|find|get|display|what are|which are|what|which)"
+    r"(?: me)?(?: all| every)?(?: of)?(?: the)? )?"
+)
+_XP = r"(?:xp|experience(?: points)?)"
+_PEOPLE = r"(?:users|students|learners|players)"
+# A captured name containing these carries extra conditions the template ignores
+_CLAUSE = re.compile(r"\b(?:that|which|who|where|when|were|was|is|are|has|have|after|before|since|created|added)\b")
+
+
+def neo4j_templates_enabled() -> bool:
+    return os.getenv("ACE_NEO4J_TEMPLATES", "1").strip().lower() not in ("0", "false", "no")
+
+
+def _text(value: Optional[str]) -> str:
+    """The captured name without quotes, or "" (no match) if it holds a clause."""
+    text = (value or "").strip().strip("'\"“”‘’").strip()
+    return "" if _CLAUSE.search(text) else text
+
+
+def _stem(keyword: str) -> str:
+    """'borrowing' -> 'borrow', 'place values' -> 'place value' for CONTAINS search."""
+    for suffix in ("ing", "es", "s"):
+        if keyword.endswith(suffix) and len(keyword) - len(suffix) >= 4:
+            return keyword[: -len(suffix)]
+    return keyword
+
+
+def _rows(groups: Dict[str, str], limit: int) -> Dict[str, Any]:
+    return {"limit": limit}
+
+
+def _top_n(groups: Dict[str, str], limit: int) -> Dict[str, Any]:
+    """"Which user has the highest XP" wants one row, "top 5 users" five."""
+    n = 1 if groups.get("one") else int(groups.get("n") or limit)
+    return {"limit": max(1, min(n, limit))}
+
+
+def _named(param: str) -> ParamBuilder:
+    def build(groups: Dict[str, str], limit: int) -> Dict[str, Any]:
+        return {param: _text(groups.get(param)), "limit": limit}
+    return build
+
+
+def _keyword(groups: Dict[str, str], limit: int) -> Dict[str, Any]:
+    return {"keyword": _stem(_text(groups.get("keyword"))), "limit": limit}
+
+
+@dataclass(frozen=True)
+class CypherTemplate:
+    name: str
+    patterns: Tuple[str, ...]
+    cypher: str
+    params: ParamBuilder = _rows
+    compiled: Tuple["re.Pattern[str]", ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "compiled", tuple(re.compile(p) for p in self.patterns))
+
+    def match(self, normalized: str, limit: int) -> Optional["TemplateMatch"]:
+        for pattern in self.compiled:
+            m = pattern.fullmatch(normalized)
+            if m is None:
+                continue
+            params = self.params({k: v for k, v in m.groupdict().items() if v}, limit)
+            if all(v not in ("", None) for v in params.values()):
+                return TemplateMatch(self.name, self.cypher, params)
+        return None
+
+
+@dataclass(frozen=True)
+class TemplateMatch:
+    name: str
+    cypher: str
+    params: Dict[str, Any]
+
+
+TEMPLATES: List[CypherTemplate] = [
+    CypherTemplate(
+        name="chapter_units",
+        patterns=(
+            rf"{_ASK}chapters?(?: and| with)(?: all)?(?: their| the)? units?(?: are there)?",
+            rf"{_ASK}units? (?:in|of|for) (?:each|every|all)(?: the)? chapters?",
+            rf"{_ASK}chapters?(?: are there)?(?: in the (?:curriculum|textbook|course|book))?",
+        ),
+        cypher=(
+            "MATCH (c:Chapter)-[:HAS_UNIT]->(u:Unit) "
+            "RETURN c.name AS chapter_name, c.order AS chapter_order, u.name AS unit_name, u.order AS unit_order "
+            "ORDER BY c.order, u.order LIMIT $limit"
+        ),
+    ),
+    CypherTemplate(
+        name="unit_sections",
+        patterns=(
+            rf"{_ASK}sections? (?:are )?(?:in|of|for|inside) (?:the )?unit (?P<unit>.+)",
+            rf"{_ASK}sections? (?:are )?(?:in|of|for|inside) (?:the )?(?P<unit>.+?) unit",
+            rf"{_ASK}sections? (?:does|do) (?:the )?unit (?P<unit>.+?) (?:have|contain)",
+        ),
+        cypher=(
+            "MATCH (u:Unit)-[:CONTAINS]->(s:Section) WHERE toLower(u.name) CONTAINS toLower($unit) "
+            "RETURN u.name AS unit_name, s.title AS section_title, s.order AS section_order, s.keyPoints AS key_points "
+            "ORDER BY u.order, s.order LIMIT $limit"
+        ),
+        params=_named("unit"),
+    ),
+    CypherTemplate(
+        name="section_examples",
+        patterns=(
+            rf"{_ASK}examples? (?:are )?(?:in|from|of|for|inside) (?:the )?section (?P<section>.+)",
+            rf"{_ASK}examples? (?:are )?(?:in|from|of|for|inside) (?:the )?(?P<section>.+?) section",
+        ),
+        cypher=(
+            "MATCH (s:Section)-[:CONTAINS]->(e:Example) WHERE toLower(s.title) CONTAINS toLower($section) "
+            "RETURN s.title AS section_title, e.title AS example_title, e.problem AS problem, "
+            "e.solution AS solution, e.explanation AS explanation "
+            "ORDER BY s.order, e.order LIMIT $limit"
+        ),
+        params=_named("section"),
+    ),
+    CypherTemplate(
+        name="example_search",
+        patterns=(
+            # No " in ...": a chapter, unit or section scope is a condition
+            # this unscoped search would ignore, so the chain handles it
+            r"(?:explain|show|find|give|get|what is|what's)(?: me)? (?:the |an |a )?examples? "
+            r"(?:about|on|for|with|titled|called|of) (?P<keyword>(?:(?! in ).)+)",
+        ),
+        cypher=(
+            "MATCH (s:Section)-[:CONTAINS]->(e:Example) "
+            "WHERE toLower(e.title) CONTAINS $keyword OR toLower(e.problem) CONTAINS $keyword "
+            "OR toLower(e.explanation) CONTAINS $keyword OR toLower(e.solution) CONTAINS $keyword "
+            "RETURN s.title AS section_title, e.title AS example_title, e.problem AS problem, "
+            "e.solution AS solution, e.explanation AS explanation "
+            "ORDER BY s.order, e.order LIMIT $limit"
+        ),
+        params=_keyword,
+    ),
+    CypherTemplate(
+        name="xp_leaderboard",
+        patterns=(
+            rf"(?P<one>(?:which|what) (?:user|student|learner|player|person) has|who has) the (?:highest|most) {_XP}",
+            rf"{_ASK}(?:the )?top (?:(?P<n>\d+) )?{_PEOPLE}(?: by| with the (?:highest|most))? {_XP}",
+            rf"{_ASK}(?:the )?{_XP} (?:leaderboard|ranking|rankings)",
+            rf"{_ASK}(?:the )?leaderboard",
+        ),
+        cypher=(
+            "MATCH (u:User) WHERE u.xp IS NOT NULL "
+            "RETURN u.name AS name, u.xp AS xp, u.level AS level "
+            "ORDER BY u.xp DESC LIMIT $limit"
+        ),
+        params=_top_n,
+    ),
+    CypherTemplate(
+        name="quiz_xp",
+        patterns=(
+            rf"{_ASK}{_PEOPLE} (?:who|that) (?:have )?completed quizz?es(?: and their (?:total )?{_XP}(?: earned)?)?",
+            rf"{_ASK}(?:the )?(?:total )?{_XP} earned (?:from|in|on) quizz?es(?: by (?:each )?(?:user|{_PEOPLE}))?",
+            rf"(?P<one>who) (?:has )?earned the most {_XP} (?:from|in|on) quizz?es",
+        ),
+        cypher=(
+            "MATCH (u:User)-[:COMPLETED]->(qs:QuizSession) "
+            "RETURN u.name AS user_name, count(qs) AS quizzes_completed, sum(qs.xpEarned) AS total_xp_earned "
+            "ORDER BY total_xp_earned DESC LIMIT $limit"
+        ),
+        params=_top_n,
+    ),
+    CypherTemplate(
+        name="quiz_progress",
+        patterns=(
+            rf"{_ASK}(?:the )?quiz progress(?: (?:of|for) (?:all |each |every )?(?:user|{_PEOPLE}))?",
+            rf"{_ASK}(?:user|{_PEOPLE})(?:'|’)? quiz progress",
+        ),
+        cypher=(
+            "MATCH (u:User)-[:HAS_QUIZ_PROGRESS]->(qp:QuizProgress) "
+            "RETURN u.name AS user_name, qp.totalQuizzes AS total_quizzes, qp.bestStreak AS best_streak, "
+            "qp.totalXPFromQuiz AS total_xp_from_quiz, qp.commonCompleted AS common_completed, "
+            "qp.rareCompleted AS rare_completed, qp.legendaryCompleted AS legendary_completed "
+            "ORDER BY qp.totalXPFromQuiz DESC LIMIT $limit"
+        ),
+    ),
+]
+
+
+def match_cypher_template(question: str, limit: int) -> Optional[TemplateMatch]:
+    """The first template recognising ``question``, with ``$limit`` set to ``limit``."""
+    normalized = normalize_question(question)
+    for template in TEMPLATES:
+        found = template.match(normalized, limit)
+        if found is not None:
+            return found
+    return None
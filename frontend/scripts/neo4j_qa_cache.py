@@ -0,0 +1,208 @@
+"""
+Two-level cache for the ``neo4j_retrieveqa`` tool.
+
+Level 1 maps a normalized question to the Cypher the chain generated for it,
+so a repeated question skips the Cypher-generation LLM call. Level 2 maps
+Cypher text plus parameters to the rows Neo4j returned, together with the QA
+answers already written from those rows, so a repeat also skips the database
+and the QA LLM call until the entry expires.
+
+- Rows that only read curriculum labels (Chapter, Unit, Section, ...) live
+  for ``ACE_NEO4J_CURRICULUM_TTL_S`` (default 15 min); anything else, such as
+  XP leaderboards or quiz progress, for ``ACE_NEO4J_ROWS_TTL_S`` (default 60 s).
+- Generated Cypher lives for ``ACE_NEO4J_CYPHER_TTL_S`` (default 1 day).
+  Questions whose Cypher returned no rows, and write queries, are not cached.
+- ``invalidate(labels)`` drops cached rows that read any of ``labels`` (all
+  rows when None). Hooks added with ``add_invalidation_hook`` run afterwards
+  so caches derived from the same data can follow.
+
+Invalidation is manual only. The curriculum, users, XP and quizzes are
+written by the Next.js routes and the ``setup-*.js`` scripts in other
+processes, so nothing here sees those writes; the TTLs bound how long a
+cached answer can lag behind them. Call ``invalidate_neo4j_cache`` from
+anything in this process that writes those labels.
+- ``ACE_NEO4J_QA_CACHE=0`` disables both levels.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+DEFAULT_CYPHER_TTL = float(os.getenv("ACE_NEO4J_CYPHER_TTL_S", "86400"))
+DEFAULT_ROWS_TTL = float(os.getenv("ACE_NEO4J_ROWS_TTL_S", "60"))
+DEFAULT_CURRICULUM_TTL = float(os.getenv("ACE_NEO4J_CURRICULUM_TTL_S", "900"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("ACE_NEO4J_CACHE_MAX_ENTRIES", "512"))
+
+# Textbook content; only changes when the curriculum is re-imported
+CURRICULUM_LABELS: FrozenSet[str] = frozenset(
+    {"Chapter", "Unit", "Section", "Example", "Definition", "Problem", "Activity"}
+)
+
+# Node labels in patterns such as ``(c:Chapter)`` or ``(:Unit)``
+_NODE_LABEL = re.compile(r"\(\s*[A-Za-z_0-9]*\s*:\s*`?([A-Za-z_][A-Za-z0-9_]*)`?")
+_WRITE_CLAUSE = re.compile(r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|LOAD\s+CSV)\b", re.IGNORECASE)
+
+_CACHE: Optional["Neo4jQACache"] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def neo4j_qa_cache_enabled() -> bool:
+    return os.getenv("ACE_NEO4J_QA_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def get_neo4j_qa_cache() -> "Neo4jQACache":
+    """Process-wide cache shared by every ``neo4j_retrieveqa`` call."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = Neo4jQACache()
+        return _CACHE
+
+
+def invalidate_neo4j_cache(labels: Optional[Iterable[str]] = None) -> int:
+    """Drop cached rows reading ``labels`` (all rows when None); returns the count."""
+    cache = _CACHE
+    return cache.invalidate(labels) if cache is not None else 0
+
+
+def normalize_question(question: str) -> str:
+    """Case, whitespace and trailing punctuation do not change the question."""
+    return re.sub(r"\s+", " ", (question or "").strip().lower()).rstrip(" ?.!")
+
+
+def cypher_labels(cypher: str) -> FrozenSet[str]:
+    return frozenset(_NODE_LABEL.findall(cypher or ""))
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire after a per-entry TTL."""
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def put(self, key: Any, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop_where(self, predicate: Callable[[Any, Any], bool]) -> int:
+        with self._lock:
+            doomed = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+            for key in doomed:
+                del self._entries[key]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@dataclass
+class CachedRows:
+    """Rows returned for one Cypher statement, plus answers written from them."""
+    rows: List[Any]
+    labels: FrozenSet[str]
+    answers: Dict[str, str] = field(default_factory=dict)  # normalized question -> answer
+
+
+class Neo4jQACache:
+    """Question -> Cypher and Cypher + parameters -> rows caches."""
+
+    def __init__(
+        self,
+        cypher_ttl: Optional[float] = None,
+        rows_ttl: Optional[float] = None,
+        curriculum_ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.cypher_ttl = DEFAULT_CYPHER_TTL if cypher_ttl is None else cypher_ttl
+        self.rows_ttl = DEFAULT_ROWS_TTL if rows_ttl is None else rows_ttl
+        self.curriculum_ttl = DEFAULT_CURRICULUM_TTL if curriculum_ttl is None else curriculum_ttl
+        size = DEFAULT_MAX_ENTRIES if max_entries is None else max_entries
+        self.cypher = TTLCache(size, clock)
+        self.rows = TTLCache(size, clock)
+        self._hooks: List[Callable[[Optional[FrozenSet[str]]], None]] = []
+
+    # ---- level 1: question -> Cypher ----
+
+    def get_cypher(self, question: str) -> Optional[str]:
+        return self.cypher.get(normalize_question(question))
+
+    def put_cypher(self, question: str, cypher: str) -> None:
+        if cypher and not _WRITE_CLAUSE.search(cypher):
+            self.cypher.put(normalize_question(question), cypher, self.cypher_ttl)
+
+    # ---- level 2: Cypher + parameters -> rows ----
+
+    @staticmethod
+    def rows_key(cypher: str, params: Optional[Dict[str, Any]] = None) -> str:
+        return f"{cypher.strip()}\n{json.dumps(params or {}, sort_keys=True, default=str)}"
+
+    def get_rows(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> Optional[CachedRows]:
+        return self.rows.get(self.rows_key(cypher, params))
+
+    def put_rows(
+        self,
+        cypher: str,
+        rows: List[Any],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[CachedRows]:
+        """Cache ``rows`` for a read query; returns the entry, or None if not cacheable."""
+        if not cypher or _WRITE_CLAUSE.search(cypher):
+            return None
+        labels = cypher_labels(cypher)
+        ttl = self.curriculum_ttl if labels and labels <= CURRICULUM_LABELS else self.rows_ttl
+        entry = CachedRows(rows=list(rows), labels=labels)
+        self.rows.put(self.rows_key(cypher, params), entry, ttl)
+        return entry
+
+    # ---- invalidation ----
+
+    def add_invalidation_hook(self, hook: Callable[[Optional[FrozenSet[str]]], None]) -> None:
+        """``hook(labels)`` runs after every ``invalidate``; labels is None for a full flush."""
+        self._hooks.append(hook)
+
+    def invalidate(self, labels: Optional[Iterable[str]] = None) -> int:
+        """Drop cached rows that read any of ``labels`` (every row when None)."""
+        targets = frozenset(labels) if labels is not None else None
+        if targets is None:
+            dropped = self.rows.pop_where(lambda key, entry: True)
+        else:
+            # Unlabelled patterns such as MATCH (n) may read anything
+            dropped = self.rows.pop_where(lambda key, entry: not entry.labels or bool(entry.labels & targets))
+        for hook in list(self._hooks):
+            hook(targets)
+        return dropped
+
+    def clear(self) -> None:
+        """Forget generated Cypher as well, e.g. after a schema change."""
+        self.cypher.clear()
+        self.invalidate()
@@ -11,11 +11,21 @@ Reads a JSON payload from stdin with the following structure:
 
 Writes a JSON response to stdout with the agent's answer, mode,
 and any scratch metadata (including ACE delta stats).
+
+With ``--serve`` the runner stays resident instead: it reads one payload
+per line (optionally tagged with an ``"id"``), answers each with one JSON
+line carrying the same ``id``, and exits when stdin closes. Adding
+``--workers N`` puts a supervisor in front of N such workers (see
+``ace_worker_pool.py``). A line of the form ``{"command": "..."}`` runs a
+maintenance command (see ``RUNNER_COMMANDS``) instead of the agent.
 """
 
 from __future__ import annotations
 
+import argparse
 import json
+import os
+import subprocess
 import sys
 import time
 from pathlib import Path
@@ -32,6 +42,13 @@ if str(SCRIPT_DIR) not in sys.path:
 from langgraph_agent_ace import build_ace_graph  # noqa: E402
 from langgraph_utile import _extract_final  # noqa: E402
 
+# Packages that only the ReAct tool path needs; they must stay out of the
+# entry point's import graph so CoT/ToT cold starts stay cheap.
+DEFERRED_IMPORTS = ("mcp", "langchain_community", "langchain_google_genai", "tavily")
+# Resident-mode maintenance commands; a worker pool sends them to every worker
+RUNNER_COMMANDS = ("refresh_curriculum",)
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)")
+
 
 def _clean_answer(answer: Optional[str]) -> Optional[str]:
     if not answer:
@@ -106,10 +123,18 @@ def _preview(text: Any, limit: int = 120) -> str:
     return f"{text[:limit]}… [len={length}]"
 
 
-def main() -> int:
-    """Execute the ACE agent and emit the response as JSON."""
-    payload = _load_payload()
-    _log("Received payload from Next.js route")
+def _emit(obj: dict, stream=None) -> None:
+    """Write a single JSON document followed by a newline and flush."""
+    stream = stream or sys.stdout
+    json.dump(obj, stream, ensure_ascii=False)
+    stream.write("\n")
+    stream.flush()
+
+
+def _invoke(app: Any, payload: dict) -> dict:
+    """Run one request payload through the compiled graph and build the response."""
+    if not isinstance(payload, dict):
+        raise ValueError("Payload must be a JSON object")
 
     messages = _ensure_messages(payload.get("messages"))
     mode = payload.get("mode") or ""
@@ -130,7 +155,6 @@ def main() -> int:
     for idx, msg in enumerate(truncated_msgs, 1):
         _log(f"  msg[{idx}] {msg}")
 
-    app = build_ace_graph()
     config = {"configurable": {"thread_id": thread_id}}
 
     state = {
@@ -170,14 +194,263 @@ def main() -> int:
             f"updates={ace_delta.get('num_updates', 0)} "
             f"removals={ace_delta.get('num_removals', 0)}"
         )
+    return response
+
+
+def _warm_storage() -> None:
+    """
+    Open the shared Neo4j driver up front so the first request skips the handshake.
+
+    Learners listed in ``ACE_WARM_LEARNERS`` (comma-separated) also get their
+    memory preloaded, in one batched read.
+    """
+    try:
+        from ace_memory_store import _get_driver
+
+        _get_driver()
+    except Exception as exc:  # pragma: no cover - credentials are optional at boot
+        _log(f"Neo4j driver warmup skipped: {exc}")
+
+    learners = [lid.strip() for lid in os.getenv("ACE_WARM_LEARNERS", "").split(",") if lid.strip()]
+    if not learners:
+        return
+    try:
+        from langgraph_agent_ace import preload_ace_memories
+
+        _log(f"Preloaded ACE memory for {preload_ace_memories(learners)} learner(s)")
+    except Exception as exc:  # pragma: no cover - warmup is best effort
+        _log(f"ACE memory warmup skipped: {exc}")
+
+
+def _drain_background_learning() -> None:
+    """Let queued background ACE learning finish before the process exits."""
+    agent = sys.modules.get("langgraph_agent_ace")
+    if agent is None:
+        return
+    try:
+        agent.drain_learning_queue()
+    except Exception as exc:  # pragma: no cover - shutdown is best effort
+        _log(f"Background ACE learning drain failed: {exc}")
+
+
+def _flush_memory_writes() -> None:
+    """Persist ACE memory saves still queued by the write-behind writer."""
+    if "ace_memory_writer" not in sys.modules:
+        return  # write-behind never used in this process
+    try:
+        if not sys.modules["ace_memory_writer"].flush_write_behind():
+            _log("Some ACE memory saves could not be flushed on shutdown")
+    except Exception as exc:  # pragma: no cover - shutdown is best effort
+        _log(f"ACE memory flush failed: {exc}")
+
+
+def _run_command(command: Any) -> dict:
+    """Run one of ``RUNNER_COMMANDS`` in this process."""
+    if command == "refresh_curriculum":
+        from curriculum_snapshot import refresh_curriculum_snapshot
+
+        snapshot = refresh_curriculum_snapshot()
+        _log(f"Curriculum snapshot refreshed | entries={len(snapshot)}")
+        return {"command": command, "entries": len(snapshot), "counts": snapshot.counts()}
+    raise ValueError(f"Unknown command {command!r}; expected one of {', '.join(RUNNER_COMMANDS)}")
+
 
-    json.dump(response, sys.stdout, ensure_ascii=False)
-    sys.stdout.write("\n")
-    sys.stdout.flush()
+def _handle_request(app: Any, payload: Any) -> dict:
+    """Answer one resident-mode request, echoing its ``id`` and trapping errors."""
+    request_id = payload.get("id") if isinstance(payload, dict) else None
+    try:
+        if isinstance(payload, dict) and "command" in payload:
+            response = _run_command(payload["command"])
+        else:
+            response = _invoke(app, payload)
+    except Exception as exc:
+        _log(f"Request failed | id={request_id} | error={exc}")
+        response = {"error": str(exc)}
+    if request_id is not None:
+        response["id"] = request_id
+    return response
+
+
+def _handle_line(app: Any, raw: str) -> dict:
+    """Decode one newline-delimited request and answer it."""
+    try:
+        payload = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        _log(f"Request failed | id=None | error=Invalid JSON payload: {exc}")
+        return {"error": f"Invalid JSON payload: {exc}"}
+    return _handle_request(app, payload)
+
+
+def main() -> int:
+    """Execute the ACE agent and emit the response as JSON."""
+    payload = _load_payload()
+    _log("Received payload from Next.js route")
+
+    original_stdout = sys.stdout
+    # Background learning threads print while the graph runs and after it
+    # returns; only the answer line may reach stdout.
+    sys.stdout = sys.stderr
+    try:
+        app = build_ace_graph()
+        response = _invoke(app, payload)
+    except Exception:
+        sys.stdout = original_stdout  # the structured error goes to the caller
+        raise
+    # The caller settles on this line; background learning and queued memory
+    # saves finish afterwards, logging to stderr.
+    _emit(response, original_stdout)
+    _drain_background_learning()
+    _flush_memory_writes()
     return 0
 
 
+def serve(stdin=None, stdout=None) -> int:
+    """
+    Resident worker mode.
+
+    Builds the graph once and then answers newline-delimited JSON requests
+    from stdin until EOF, writing exactly one JSON line per request to stdout.
+    Requests may carry an ``id`` which is echoed back so callers can pipeline.
+    The compiled graph, ``_ACE_CACHE`` and the Neo4j driver stay warm between
+    requests.
+    """
+    stdin = stdin or sys.stdin
+    original_stdout = sys.stdout
+    protocol_out = stdout or original_stdout
+    # Anything printed outside the protocol (warnings, stray prints) must not
+    # corrupt the response stream, so route plain stdout to stderr.
+    sys.stdout = sys.stderr
+    try:
+        # The caller resends the full history on every turn, so a checkpointer
+        # would only accumulate dead threads in a long-lived process.
+        app = build_ace_graph(use_checkpointer=False)
+        _warm_storage()
+        _log(f"Resident worker ready | pid={os.getpid()}")
+        _emit({"ready": True, "pid": os.getpid()}, protocol_out)
+
+        served = 0
+        for raw in stdin:
+            if not raw.strip():
+                continue
+            _emit(_handle_line(app, raw), protocol_out)
+            served += 1
+
+        _log(f"stdin closed; resident worker exiting after {served} requests")
+        return 0
+    finally:
+        _drain_background_learning()
+        _flush_memory_writes()
+        sys.stdout = original_stdout
+
+
+def import_time_report(top: int = 15) -> dict:
+    """
+    Measure a cold ``import run_ace_agent`` with ``python -X importtime``.
+
+    Runs in a fresh interpreter so modules already loaded here do not skew
+    the numbers. Returns the total import time, the slowest modules by
+    cumulative time, and any ``DEFERRED_IMPORTS`` that were loaded anyway.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import run_ace_agent"],
+        cwd=str(SCRIPT_DIR),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing run_ace_agent failed:\n{proc.stderr[-2000:]}")
+
+    total_us = 0
+    cumulative: list = []
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cum_us, indent, name = match.groups()
+        cumulative.append((name, int(cum_us)))
+        loaded.add(name.split(".")[0])
+        if name == "run_ace_agent" and len(indent) == 1:
+            total_us = int(cum_us)
+
+    cumulative.sort(key=lambda item: item[1], reverse=True)
+    return {
+        "total_ms": total_us / 1000.0,
+        "slowest": [(name, us / 1000.0) for name, us in cumulative[:top]],
+        "deferred_loaded": sorted(pkg for pkg in DEFERRED_IMPORTS if pkg in loaded),
+    }
+
+
+def _run_import_report(budget_ms: float, top: int) -> int:
+    report = import_time_report(top=top)
+    print(f"run_ace_agent import time: {report['total_ms']:.1f} ms")
+    for name, ms in report["slowest"]:
+        print(f"  {ms:9.1f} ms  {name}")
+    status = 0
+    if report["deferred_loaded"]:
+        print(f"FAIL: deferred packages imported at startup: {', '.join(report['deferred_loaded'])}")
+        status = 1
+    if budget_ms and report["total_ms"] > budget_ms:
+        print(f"FAIL: import time {report['total_ms']:.1f} ms exceeds budget {budget_ms:.0f} ms")
+        status = 1
+    return status
+
+
+def _parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the ACE LangGraph agent")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Stay resident and answer newline-delimited JSON requests on stdin",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("ACE_WORKERS", "1")),
+        help="With --serve, pre-fork this many workers routed by learner_id",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=int(os.getenv("ACE_WORKER_MAX_REQUESTS", "0")),
+        help="Recycle a pooled worker after this many requests (0 = never)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=int(os.getenv("ACE_MAX_CONCURRENCY", "0")),
+        help="Cap on queued plus in-flight pooled requests (0 = 4 per worker)",
+    )
+    parser.add_argument(
+        "--import-report",
+        action="store_true",
+        help="Print a -X importtime startup report and exit non-zero past the budget",
+    )
+    parser.add_argument(
+        "--import-budget-ms",
+        type=float,
+        default=float(os.getenv("ACE_IMPORT_BUDGET_MS", "0")),
+        help="Import-time budget for --import-report in milliseconds (0 = report only)",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = _parse_args()
+    if args.import_report:
+        raise SystemExit(_run_import_report(args.import_budget_ms, top=15))
+    if args.serve and args.workers > 1:
+        from ace_worker_pool import serve_pool
+
+        raise SystemExit(
+            serve_pool(
+                num_workers=args.workers,
+                max_requests=args.max_requests,
+                max_concurrency=args.max_concurrency or None,
+            )
+        )
+    if args.serve:
+        raise SystemExit(serve())
     try:
         raise SystemExit(main())
     except Exception as exc:  # pragma: no cover - surfaced to caller
@@ -53,6 +53,66 @@ Output your response as a JSON object:
 
 Output ONLY valid JSON, nothing else."""
 
+REFLECTOR_BATCH_TRACE = """### Trace {index}
+#### Execution Trace
+{trace}
+
+#### Question
+{question}
+
+#### Ground Truth Answer (if available)
+{ground_truth}
+
+#### Model's Answer
+{model_answer}
+
+#### Execution Success
+{success}"""
+
+REFLECTOR_BATCH_PROMPT = """You are the Reflector in an Agentic Context Engineering system.
+
+Your role is to analyze each of the {count} execution traces below and extract concrete, actionable lessons that can help improve future performance.
+
+The traces are independent (they may come from different learners). Reflect on each trace separately and never mix lessons between traces.
+
+## Execution Traces
+{traces}
+
+## Instructions
+For EACH trace, extract specific lessons:
+
+1. **Successful Strategies**: What specific approaches, tools, or reasoning patterns worked well?
+2. **Failure Modes**: What specific mistakes or pitfalls occurred? What should be avoided?
+3. **Domain Insights**: What domain-specific knowledge or concepts were crucial?
+4. **Tool Usage Patterns**: How should tools be used effectively?
+
+For EACH lesson:
+- Be SPECIFIC and CONCRETE (not vague generalizations)
+- Include EXAMPLES or CONTEXT when possible
+- Make it ACTIONABLE (something that can guide future attempts)
+- Keep it FOCUSED on one insight
+
+Output your response as a JSON object with one entry per trace, using the trace numbers above:
+{{
+  "traces": [
+    {{
+      "index": 1,
+      "lessons": [
+        {{
+          "content": "Specific lesson content here",
+          "type": "success" or "failure" or "domain" or "tool",
+          "tags": ["tag1", "tag2"]
+        }},
+        ...
+      ],
+      "reflection": "Brief overall reflection on what was learned from this trace"
+    }},
+    ...
+  ]
+}}
+
+Output ONLY valid JSON, nothing else."""
+
 CURATOR_PROMPT = """You are the Curator in an Agentic Context Engineering system.
 
 Your role is to synthesize lessons from the Reflector into structured bullet updates for the evolving playbook.
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Top-k selection benchmark for ACE memory.
+
+Compares the previous full sorts with the partial selection now used by
+``ACEMemory.retrieve_relevant_bullets`` (top_k 5/10) and
+``ACEMemory._prune_bullets`` (keep ``max_bullets``) on synthetic playbooks
+of 1k and 10k bullets. Runs offline; no Neo4j or Gemini needed.
+
+Usage:
+    python3 benchmark_memory_topk.py [--sizes 1000 10000] [--repeat 20]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import numpy as np  # noqa: E402
+
+from ace_memory import ACEMemory  # noqa: E402
+from test_memory_indexes import InMemoryStore  # noqa: E402
+
+WORDS = (
+    "find the common denominator first add numerators then simplify fraction learner "
+    "prefers visual diagram step check answer carry ones tens borrow subtract multiply"
+).split()
+
+
+def _build_memory(size: int, seed: int = 0) -> ACEMemory:
+    rng = random.Random(seed)
+    bullets = []
+    for idx in range(size):
+        memory_type = rng.choice(["semantic", "episodic", "procedural"])
+        bullets.append(
+            {
+                "content": f"{' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))} #{idx}",
+                "helpful_count": rng.randint(0, 6),
+                "harmful_count": rng.randint(0, 2),
+                "memory_type": memory_type,
+                "tags": [memory_type],
+                f"{memory_type}_access_index": rng.randint(1, size),
+            }
+        )
+    store = InMemoryStore()
+    store.data = {"bullets": bullets, "access_clock": size}
+    with contextlib.redirect_stdout(io.StringIO()):
+        memory = ACEMemory(max_bullets=size * 2, storage=store)
+    return memory
+
+
+def _time(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench(size: int, repeat: int):
+    memory = _build_memory(size)
+    cols = memory._columns
+    rows = np.arange(cols.size, dtype=np.intp)
+    rng = np.random.default_rng(size)
+    combined = np.round(rng.random(cols.size), 3)  # coarse scores so ties occur
+    order = cols.rank[rows]
+    bullets = list(cols.bullets)
+    keep = size * 9 // 10
+
+    def retrieval_sort():
+        scored = list(zip(combined.tolist(), bullets))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [b for _, b in scored[:10]]
+
+    def retrieval_topk():
+        return [bullets[i] for i in memory._top_k_order([combined, order], 10)]
+
+    def prune_sort():
+        ranked = sorted(
+            memory.bullets.values(),
+            key=lambda b: (memory._compute_score(b), b.helpful_count),
+            reverse=True,
+        )
+        return {b.id for b in ranked[:keep]}
+
+    def prune_topk():
+        scores = memory._column_scores(rows)
+        kept = memory._top_k_order([scores, cols.helpful[rows], order], keep)
+        return {bullets[i].id for i in kept}
+
+    assert [b.id for b in retrieval_sort()] == [b.id for b in retrieval_topk()]
+    assert prune_sort() == prune_topk()
+
+    for label, slow, fast in (
+        ("retrieve top_k=10", retrieval_sort, retrieval_topk),
+        (f"prune keep={keep}", prune_sort, prune_topk),
+    ):
+        slow_ms = _time(slow, repeat)
+        fast_ms = _time(fast, repeat)
+        print(
+            f"{size:>6} bullets | {label:<22} | full sort {slow_ms:8.2f} ms | "
+            f"partial {fast_ms:8.2f} ms | {slow_ms / max(fast_ms, 1e-9):5.1f}x"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ACE memory top-k selection")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print("🏁 ACE memory top-k selection benchmark")
+    for size in args.sizes:
+        bench(size, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Background ACE learning queue tests.
+
+Drives LearningQueue with a stub handler (no Gemini or Neo4j needed) and
+checks bounded concurrency, per-learner serialization, backpressure and
+drain(). Also checks that the ACEMemory reads the Curator makes on a queue
+thread wait for the memory lock, so a concurrent reload cannot swap the
+indexes out from under them.
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from ace_learning_queue import LearningQueue  # noqa: E402
+from ace_memory import ACEMemory, Bullet, DeltaUpdate  # noqa: E402
+from ace_memory_log import FileDeltaLogStore  # noqa: E402
+
+
+class RecordingHandler:
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak_total = 0
+        self.overlap_same_learner = False
+        self.done = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, learner_id, trace, apply_update):
+        self.gate.wait()
+        with self.lock:
+            self.active[learner_id] = self.active.get(learner_id, 0) + 1
+            self.overlap_same_learner |= self.active[learner_id] > 1
+            self.peak_total = max(self.peak_total, sum(self.active.values()))
+        time.sleep(self.delay)
+        with self.lock:
+            self.active[learner_id] -= 1
+            self.done.append((learner_id, trace))
+
+
+def test_bounded_concurrency_and_drain():
+    handler = RecordingHandler()
+    queue = LearningQueue(handler, max_workers=3, max_pending=50)
+    start = time.perf_counter()
+    for idx in range(12):
+        assert queue.submit(f"learner-{idx % 4}", idx), "submit fell back to inline with room in the queue"
+    submit_ms = (time.perf_counter() - start) * 1000
+    assert queue.drain(timeout=10), "drain timed out"
+    assert len(handler.done) == 12 and queue.pending == 0, "not every trace was processed"
+    assert handler.peak_total <= 3, f"ran {handler.peak_total} handlers at once with 3 workers"
+    assert not handler.overlap_same_learner, "two traces for one learner ran concurrently"
+    assert submit_ms < 12 * handler.delay * 1000, "submit waited for the handler"
+    print(f"✅ learning queue: 12 traces queued in {submit_ms:.1f} ms, <= 3 concurrent, drained")
+
+
+def test_backpressure_learns_inline_when_full():
+    handler = RecordingHandler(delay=0)
+    handler.gate.clear()  # hold the workers so the queue fills up
+    queue = LearningQueue(handler, max_workers=1, max_pending=2, submit_timeout=0.05)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        queued = [queue.submit("learner-a", idx) for idx in range(2)]
+        release = threading.Timer(0.2, handler.gate.set)
+        release.start()
+        inline = queue.submit("learner-b", 99)
+        assert queue.drain(timeout=5), "drain timed out"
+    assert queued == [True, True], "first traces should be queued"
+    assert inline is False and ("learner-b", 99) in handler.done, "full queue did not fall back to inline learning"
+    assert "Queue full" in out.getvalue(), "backpressure was not logged"
+    print("✅ learning queue: full queue blocks, then learns inline instead of dropping")
+
+
+def test_curator_reads_wait_for_memory_lock():
+    with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(io.StringIO()):
+        memory = ACEMemory(storage=FileDeltaLogStore("learner-a", root=root))
+        memory.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content="draw a number line first")]))
+        reads = {
+            "find_similar_bullet": lambda: memory.find_similar_bullet("draw a number line first"),
+            "format_context": lambda: memory.format_context("number line"),
+        }
+        for name, read in reads.items():
+            finished = threading.Event()
+            thread = threading.Thread(target=lambda: (read(), finished.set()))
+            with memory._lock:  # as held by reload_from_storage on another thread
+                thread.start()
+                blocked = not finished.wait(0.1)
+            thread.join(timeout=5)
+            assert blocked, f"{name} ran while another thread held the memory lock"
+            assert finished.is_set(), f"{name} did not finish after the lock was released"
+    print("✅ find_similar_bullet / format_context wait for the memory lock")
+
+
+def main():
+    tests = [
+        ("Bounded concurrency", test_bounded_concurrency_and_drain),
+        ("Backpressure", test_backpressure_learns_inline_when_full),
+        ("Curator reads under memory lock", test_curator_reads_wait_for_memory_lock),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} ACE learning queue test(s) failed")
+        return 1
+    print("🎉 ALL ACE LEARNING QUEUE TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+ACE memory index tests.
+
+Runs entirely in-process against an in-memory storage adapter (no Neo4j or
+Gemini needed) and checks that the indexed lookups in ACEMemory return the
+same results as the reference full scans.
+"""
+
+import copy
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from ace_memory import DEFAULT_MEMORY_STRENGTH, ACEMemory, Bullet, DeltaUpdate  # noqa: E402
+from ace_memory_log import FileDeltaLogStore  # noqa: E402
+
+VOCAB = [
+    "find", "the", "common", "denominator", "first", "add", "numerators", "then",
+    "simplify", "fraction", "learner", "prefers", "visual", "diagram", "step",
+    "check", "answer", "carry", "ones", "tens", "borrow", "subtract", "multiply",
+    "equivalent", "scale", "both", "parts", "same", "number", "explain",
+]
+LEARNERS = [None, "learner-a", "learner-b"]
+TAGS = ["visual", "diagram", "step_by_step", "common_denominator", "add_denominators"]
+TOPICS = [None, "fractions", "fraction_addition"]
+
+
+class InMemoryStore:
+    """Storage adapter that keeps the last saved snapshot in a dict."""
+
+    learner_id = "test-learner"
+
+    def __init__(self):
+        self.data = None
+        self.saves = 0
+
+    def load(self):
+        return self.data
+
+    def save(self, data):
+        self.data = data
+        self.saves += 1
+        return True
+
+
+class InMemoryDeltaStore:
+    """Bullet-per-record adapter mirroring Neo4jMemoryStore's ``bullets`` mode."""
+
+    learner_id = "test-learner"
+    supports_delta = True
+
+    def __init__(self, legacy=None):
+        self.records = {}  # bullet id -> (seq, bullet dict)
+        self.access_clock = 0
+        self.next_seq = 0
+        self.legacy = legacy
+        self.needs_full_sync = False
+        self.written = []  # upsert count per save
+
+    def load(self):
+        if self.legacy is not None:
+            self.needs_full_sync = True
+            return self.legacy
+        ordered = sorted(self.records.values(), key=lambda item: item[0])
+        return {"bullets": [copy.deepcopy(b) for _, b in ordered], "access_clock": self.access_clock}
+
+    def save_delta(self, changes):
+        if self.needs_full_sync:
+            keep = {b["id"] for b in changes["upserts"]}
+            self.records = {bid: rec for bid, rec in self.records.items() if bid in keep}
+        for bullet in changes["upserts"]:
+            seq = self.records[bullet["id"]][0] if bullet["id"] in self.records else self.next_seq
+            self.next_seq = max(self.next_seq, seq + 1)
+            self.records[bullet["id"]] = (seq, copy.deepcopy(bullet))
+        for bullet_id in changes["removed"]:
+            self.records.pop(bullet_id, None)
+        self.access_clock = changes["access_clock"]
+        self.written.append(len(changes["upserts"]))
+        self.legacy = None
+        self.needs_full_sync = False
+        return True
+
+
+def _sentence(rng, low=3, high=12):
+    return " ".join(rng.choice(VOCAB) for _ in range(rng.randint(low, high)))
+
+
+def _build_memory(rng, count, **kwargs):
+    memory = ACEMemory(max_bullets=10_000, storage=InMemoryStore(), **kwargs)
+    delta = DeltaUpdate()
+    for _ in range(count):
+        delta.new_bullets.append(
+            Bullet(
+                id="",
+                content=_sentence(rng),
+                helpful_count=rng.randint(0, 5),
+                learner_id=rng.choice(LEARNERS),
+                topic=rng.choice(TOPICS),
+                memory_type=rng.choice(["semantic", "episodic", "procedural"]),
+                tags=rng.sample(TAGS, rng.randint(0, 2)),
+            )
+        )
+    # Bypass dedup so the playbook keeps its near-duplicates for the lookup checks
+    for bullet in delta.new_bullets:
+        memory._merge_or_add_bullet(bullet)
+    return memory
+
+
+def test_find_similar_bullet_matches_linear_scan():
+    rng = random.Random(7)
+    memory = _build_memory(rng, 300)
+    checked = 0
+    for _ in range(400):
+        if rng.random() < 0.5:
+            query = rng.choice(list(memory.bullets.values())).content
+            words = query.split()
+            if len(words) > 3 and rng.random() < 0.5:
+                words[rng.randrange(len(words))] = rng.choice(VOCAB)
+            query = " ".join(words)
+        else:
+            query = _sentence(rng, 1, 8)
+        kwargs = {
+            "learner_id": rng.choice(LEARNERS),
+            "topic": rng.choice(TOPICS),
+            "threshold": rng.choice([0.0, 0.3, 0.5, 0.9, 1.0]),
+            "return_score": True,
+        }
+        fast = memory.find_similar_bullet(query, **kwargs)
+        slow = memory._find_similar_bullet_linear(query, **kwargs)
+        assert (fast[0] and fast[0].id, fast[1]) == (slow[0] and slow[0].id, slow[1]), (
+            f"Mismatch for {query!r} {kwargs}: {fast} vs {slow}"
+        )
+        checked += 1
+    print(f"✅ find_similar_bullet: {checked} indexed lookups match the linear scan")
+
+
+def test_token_index_tracks_removals():
+    rng = random.Random(11)
+    memory = _build_memory(rng, 60)
+    doomed = set(list(memory.bullets)[::3])
+    memory.apply_delta(DeltaUpdate(remove_bullets=doomed))
+    indexed = {bid for ids in memory.token_index.values() for bid in ids}
+    assert indexed == set(memory.bullets), "token index out of sync with bullets"
+    assert set(memory._bullet_tokens) == set(memory.bullets), "token cache out of sync"
+    hashed = {bid for ids in memory.hash_index.values() for bid in ids}
+    assert hashed == set(memory.bullets), "hash index out of sync with bullets"
+    assert memory._bullet_hash == {bid: b.content_hash for bid, b in memory.bullets.items()}, (
+        "reverse hash map out of sync"
+    )
+    tagged = {(tag, bid) for tag, ids in memory.categories.items() for bid in ids}
+    expected = {(tag, bid) for bid, b in memory.bullets.items() for tag in b.tags}
+    assert tagged == expected, "category index out of sync with bullet tags"
+    print("✅ indexes: removals, dedup and pruning keep token/hash/category indexes in sync")
+
+
+def test_bullet_tokens_cached_per_content_hash():
+    memory = _build_memory(random.Random(5), 40)
+    bullet = next(iter(memory.bullets.values()))
+    tokens = bullet.tokens()
+    assert bullet.tokens() is tokens, "token set recomputed for unchanged content"
+    assert memory._bullet_tokens[bullet.id] is tokens, "index did not reuse the bullet's token set"
+
+    bullet.content = "Check The Answer twice"
+    assert bullet.tokens() is tokens, "cache should follow content_hash, not raw content"
+    memory._finalize_bullet(bullet)
+    assert bullet.tokens() == frozenset({"check", "the", "answer", "twice"}), "stale tokens after rehash"
+
+    for other in memory.bullets.values():
+        assert memory._token_similarity(bullet.tokens(), other.tokens()) == memory._text_similarity(
+            bullet.content, other.content
+        ), "token-set similarity differs from _text_similarity"
+    print("✅ Bullet.tokens: cached per content hash and scored like _text_similarity")
+
+
+def _reference_retrieve(memory, query, top_k=10, tags=None, min_score=0.0,
+                        learner_id=None, topic=None, memory_types=None, facets=None):
+    """Per-bullet retrieval loop (the pre-vectorized algorithm) used as the oracle."""
+    facets = facets or {}
+    if tags:
+        candidate_ids = set()
+        for tag in tags:
+            candidate_ids.update(memory.categories.get(tag, []))
+        candidates = [memory.bullets[bid] for bid in candidate_ids if bid in memory.bullets]
+        # Set iteration order is not stable across copies; ties use playbook order
+        candidates.sort(key=lambda b: memory._bullet_rank[b.id])
+    else:
+        candidates = list(memory.bullets.values())
+    if memory_types:
+        allowed = {mt.lower() for mt in memory_types}
+        candidates = [b for b in candidates if (b.memory_type or "semantic") in allowed]
+    if learner_id:
+        candidates = [b for b in candidates if not b.learner_id or b.learner_id == learner_id]
+    if topic:
+        candidates = [b for b in candidates if not b.topic or b.topic == topic]
+    score_cache = {b.id: memory._compute_score(b) for b in candidates}
+    candidates = [b for b in candidates if score_cache[b.id] >= min_score]
+    if not candidates:
+        return []
+
+    persona = facets.get("persona_request")
+    fractions = facets.get("fractions")
+    terms = [query] if query else []
+    if persona:
+        terms.append(str(persona))
+    if fractions:
+        terms.extend(fractions)
+    if facets.get("next_step_flag"):
+        terms.append("next step")
+    query_text = " ".join(t for t in terms if t).strip()
+    memory_weight = {"procedural": 1.0, "episodic": 0.7, "semantic": 0.4}
+
+    scored = []
+    for bullet in candidates:
+        bullet_tags = {t.lower() for t in bullet.tags}
+        bonus = 0.0
+        if facets.get("needs_visual") and (
+            "visual" in bullet_tags or "diagram" in bullet_tags or "picture" in bullet.content.lower()
+        ):
+            bonus += 0.2
+        if persona and persona in bullet_tags:
+            bonus += 0.1
+        if fractions and any(frac in bullet.content for frac in fractions):
+            bonus += 0.05
+        for misconception in facets.get("misconceptions", []):
+            if misconception in bullet_tags or misconception in bullet.content.lower():
+                bonus += 0.2
+        combined = (
+            0.25 * memory._text_similarity(query_text, bullet.content) +
+            0.55 * (score_cache[bullet.id] / max(DEFAULT_MEMORY_STRENGTH, 1.0)) +
+            0.2 * memory_weight.get((bullet.memory_type or "semantic").lower(), 0.3) +
+            bonus
+        )
+        scored.append((combined, bullet))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    top = [bullet for _, bullet in scored[:top_k]]
+    memory._touch_bullets(top)
+    return top
+
+
+def test_vectorized_retrieval_matches_reference():
+    rng = random.Random(31)
+    fast = _build_memory(rng, 400)
+    slow = copy.deepcopy(fast)
+    for step in range(300):
+        kwargs = {
+            "top_k": rng.choice([1, 5, 10, 50, 1000]),
+            "learner_id": rng.choice(LEARNERS),
+            "topic": rng.choice(TOPICS),
+            "min_score": rng.choice([0.0, 0.0, 50.0, 99.0]),
+        }
+        if rng.random() < 0.3:
+            kwargs["tags"] = rng.sample(TAGS, 2)
+        if rng.random() < 0.3:
+            kwargs["memory_types"] = rng.sample(["semantic", "episodic", "procedural"], 2)
+        if rng.random() < 0.6:
+            kwargs["facets"] = {
+                "needs_visual": rng.random() < 0.5,
+                "persona_request": rng.choice([None, "visual", "diagram"]),
+                "fractions": rng.choice([[], ["1/2"], ["both", "parts"]]),
+                "misconceptions": rng.sample(TAGS + ["carry"], rng.randint(0, 2)),
+                "next_step_flag": rng.random() < 0.3,
+            }
+        query = rng.choice(["", _sentence(rng, 1, 6)])
+        got = [b.id for b in fast.retrieve_relevant_bullets(query, **kwargs)]
+        want = [b.id for b in _reference_retrieve(slow, query, **kwargs)]
+        assert got == want, f"step {step}: {kwargs} -> {got[:5]} vs {want[:5]}"
+        if step % 25 == 0:
+            # Learning events move strengths, counts and the access clock between queries
+            ids = rng.sample(list(fast.bullets), 5)
+            delta = DeltaUpdate(update_bullets={bid: {"helpful": 1} for bid in ids[:3]},
+                                remove_bullets={ids[4]},
+                                new_bullets=[Bullet(id="", content=_sentence(rng), tags=["visual"])])
+            fast.apply_delta(copy.deepcopy(delta))
+            slow.apply_delta(copy.deepcopy(delta))
+    assert fast.access_clock == slow.access_clock, "access clocks diverged"
+    print("✅ retrieve_relevant_bullets: vectorized ranking matches the per-bullet loop")
+
+
+def test_prune_keeps_same_window_as_full_sort():
+    rng = random.Random(41)
+    for keep in (1, 50, 199):
+        base = _build_memory(rng, 240)
+        for bid in rng.sample(list(base.bullets), 60):
+            base.apply_delta(DeltaUpdate(update_bullets={bid: {"helpful": rng.randint(1, 3)}}))
+        base.max_bullets = keep
+        fast, slow = copy.deepcopy(base), copy.deepcopy(base)
+        ranked = sorted(
+            slow.bullets.values(),
+            key=lambda b: (slow._compute_score(b), b.helpful_count),
+            reverse=True,
+        )
+        want = {b.id for b in ranked[:keep]}
+        fast._prune_bullets()
+        assert set(fast.bullets) == want, f"prune window differs at max_bullets={keep}"
+        assert fast._columns.size == len(fast.bullets), "score columns out of sync after prune"
+    print("✅ _prune_bullets: partial selection keeps the same bullets as the full sort")
+
+
+def test_turn_retrieval_cache_scores_once():
+    rng = random.Random(53)
+    memory = _build_memory(rng, 120)
+    reference = copy.deepcopy(memory)
+    facets = {"needs_visual": True, "fractions": ["1/2"]}
+    args = dict(learner_id="learner-a", topic="fractions", facets=facets)
+    query = "find the common denominator first"
+
+    cache = {}
+    clock = memory.access_clock
+    router = memory.retrieve_for_turn(cache, query, top_k=5, depth=10, **args)
+    solver = memory.retrieve_for_turn(cache, query, top_k=10, depth=10, **args)
+    curator = memory.retrieve_for_turn(cache, query, top_k=10, **args)
+    assert memory.access_clock == clock + 1, "turn should touch the playbook once"
+    expected = [b.id for b in reference.retrieve_relevant_bullets(query, top_k=10, **args)]
+    assert [b.id for b in solver] == expected, "cached ranking differs from a direct retrieval"
+    assert [b.id for b in router] == expected[:5], "router slice is not the head of the ranking"
+    assert [b.id for b in curator] == expected, "curator did not reuse the turn ranking"
+
+    memory.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content="draw a visual diagram of 1/2")]))
+    memory.retrieve_for_turn(cache, query, top_k=10, **args)
+    assert len(cache) == 2, "memory_version change should key a fresh ranking"
+    print("✅ retrieve_for_turn: router/solver/curator share one ranking per turn")
+
+
+def test_delta_persistence_matches_snapshot():
+    rng = random.Random(61)
+    seed = _build_memory(rng, 150)
+    legacy = {"bullets": [b.to_dict() for b in seed.bullets.values()], "access_clock": seed.access_clock}
+    store = InMemoryDeltaStore(legacy=legacy)
+    memory = ACEMemory(max_bullets=140, storage=store)
+    for step in range(40):
+        memory.retrieve_relevant_bullets(_sentence(rng, 2, 6), top_k=5)
+        ids = list(memory.bullets)
+        memory.apply_delta(
+            DeltaUpdate(
+                new_bullets=[Bullet(id="", content=_sentence(rng), learner_id=rng.choice(LEARNERS))],
+                update_bullets={rng.choice(ids): {"helpful": 1}},
+                remove_bullets={rng.choice(ids)} if step % 3 == 0 else set(),
+            )
+        )
+        stored = store.load()
+        assert stored["bullets"] == [b.to_dict() for b in memory.bullets.values()], (
+            f"step {step}: stored bullets diverged from the in-memory playbook"
+        )
+        assert stored["access_clock"] == memory.access_clock, f"step {step}: access_clock not persisted"
+        if step == 0:
+            assert store.written == [len(memory.bullets)], "legacy snapshot was not migrated in full"
+    assert max(store.written[1:]) < 20, f"delta saves rewrote too much: {store.written}"
+    reloaded = ACEMemory(max_bullets=140, storage=store)
+    assert list(reloaded.bullets) == list(memory.bullets), "reload changed playbook order"
+    print(f"✅ delta persistence: {len(store.written)} saves, <= {max(store.written[1:])} bullets each after migration")
+
+
+def test_delta_log_replay_and_compaction():
+    rng = random.Random(67)
+    seed = _build_memory(rng, 120)
+    with tempfile.TemporaryDirectory() as root:
+        store = FileDeltaLogStore("learner/log", root=root, compact_after=8)
+        store.save({"bullets": [b.to_dict() for b in seed.bullets.values()], "access_clock": seed.access_clock})
+        memory = ACEMemory(max_bullets=110, storage=store)
+        for step in range(30):
+            memory.retrieve_relevant_bullets(_sentence(rng, 2, 6), top_k=5)
+            ids = list(memory.bullets)
+            memory.apply_delta(
+                DeltaUpdate(
+                    new_bullets=[Bullet(id="", content=_sentence(rng), learner_id=rng.choice(LEARNERS))],
+                    update_bullets={rng.choice(ids): {"helpful": 1}},
+                    remove_bullets={rng.choice(ids)} if step % 4 == 0 else set(),
+                    metadata={"step": step},
+                )
+            )
+            replayed = FileDeltaLogStore("learner/log", root=root).load()
+            assert replayed["bullets"] == [b.to_dict() for b in memory.bullets.values()], (
+                f"step {step}: replayed log diverged from the in-memory playbook"
+            )
+            assert replayed["access_clock"] == memory.access_clock, f"step {step}: access_clock not replayed"
+        with open(store.log_path, encoding="utf-8") as fh:
+            pending = [json.loads(line) for line in fh]
+        with open(store.history_path, encoding="utf-8") as fh:
+            folded = [json.loads(line) for line in fh]
+        assert len(pending) < 8, f"log never compacted: {len(pending)} entries pending"
+        assert [e["seq"] for e in folded + pending] == list(range(1, 31)), "log entries lost or reordered"
+        assert folded[0]["delta"]["metadata"] == {"step": 0}, "delta summary missing from log entry"
+        reloaded = ACEMemory(max_bullets=110, storage=FileDeltaLogStore("learner/log", root=root))
+        assert list(reloaded.bullets) == list(memory.bullets), "reload changed playbook order"
+    print(f"✅ delta log: {len(folded)} entries compacted, {len(pending)} replayed on load")
+
+
+def _reference_dedup(memory):
+    """Full pairwise dedup scan (the pre-LSH algorithm) used as the oracle."""
+    bullets_list = list(memory.bullets.values())
+    to_remove = set()
+    for i in range(len(bullets_list)):
+        if bullets_list[i].id in to_remove:
+            continue
+        for j in range(i + 1, len(bullets_list)):
+            if bullets_list[j].id in to_remove:
+                continue
+            similarity = memory._text_similarity(bullets_list[i].content, bullets_list[j].content)
+            if similarity > memory.dedup_threshold:
+                keep, drop = memory._select_canonical_bullet(bullets_list[i], bullets_list[j])
+                memory._merge_bullet_into(keep, drop)
+                to_remove.add(drop.id)
+                if keep is bullets_list[j]:
+                    bullets_list[i], bullets_list[j] = bullets_list[j], bullets_list[i]
+    for bullet_id in to_remove:
+        bullet = memory.bullets.pop(bullet_id)
+        for tag in bullet.tags:
+            memory.categories[tag].discard(bullet_id)
+        memory._unregister_bullet(bullet_id)
+
+
+def _snapshot(memory):
+    return {
+        bid: (b.helpful_count, b.harmful_count, b.learner_id, b.topic, tuple(b.tags))
+        for bid, b in memory.bullets.items()
+    }
+
+
+def test_lsh_dedup_matches_pairwise_scan():
+    rng = random.Random(23)
+    merged = 0
+    # More, narrower bands keep LSH recall ~1 for the lower thresholds
+    for threshold, bands in ((0.6, 32), (0.75, 32), (0.85, 16)):
+        base = _build_memory(rng, 250, lsh_bands=bands)
+        # Seed near-duplicates: copies of existing bullets with one word changed
+        for bullet in rng.sample(list(base.bullets.values()), 80):
+            words = bullet.content.split() + [rng.choice(VOCAB)]
+            words[rng.randrange(len(words))] = rng.choice(VOCAB)
+            base._merge_or_add_bullet(
+                Bullet(id="", content=" ".join(words), helpful_count=rng.randint(0, 5))
+            )
+        base.dedup_threshold = threshold
+        fast, slow = copy.deepcopy(base), copy.deepcopy(base)
+        fast._deduplicate_bullets()
+        _reference_dedup(slow)
+        assert _snapshot(fast) == _snapshot(slow), f"LSH dedup diverged at threshold {threshold}"
+        merged += len(base.bullets) - len(fast.bullets)
+        indexed = {bid for ids in fast.lsh_buckets.values() for bid in ids}
+        assert indexed <= set(fast.bullets), "LSH index still holds removed bullets"
+        assert set(fast._bullet_bands) == set(fast.bullets), "LSH band cache out of sync"
+    assert merged, "test corpus produced no duplicates"
+    print(f"✅ LSH dedup: {merged} merges identical to the pairwise scan")
+
+
+def main():
+    tests = [
+        ("find_similar_bullet equivalence", test_find_similar_bullet_matches_linear_scan),
+        ("index maintenance", test_token_index_tracks_removals),
+        ("Bullet token cache", test_bullet_tokens_cached_per_content_hash),
+        ("LSH dedup equivalence", test_lsh_dedup_matches_pairwise_scan),
+        ("Vectorized retrieval equivalence", test_vectorized_retrieval_matches_reference),
+        ("Prune window equivalence", test_prune_keeps_same_window_as_full_sort),
+        ("Per-turn retrieval cache", test_turn_retrieval_cache_scores_once),
+        ("Delta persistence", test_delta_persistence_matches_snapshot),
+        ("Delta log replay and compaction", test_delta_log_replay_and_compaction),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} ACE memory index test(s) failed")
+        return 1
+    print("🎉 ALL ACE MEMORY INDEX TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Neo4jMemoryStore read-path tests.
+
+Swaps the shared Neo4j driver for a recording fake (no database needed) and
+checks that loads run as read transactions, that ``load_many`` serves each
+learner's next ``load()`` from a single batched read, that
+``reload_from_storage`` skips the fetch when the stored version is unchanged,
+and that a stale compare-and-set save reloads and re-applies its delta.
+
+The write paths run against the same fake: log mode must append
+``AceMemoryDelta`` entries and compact once ``compact_after`` are pending,
+and a bullets-mode full sync must delete the bullet nodes it did not write.
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import ace_memory_store  # noqa: E402
+from ace_memory import ACEMemory, Bullet, DeltaUpdate  # noqa: E402
+from ace_memory_log import FileDeltaLogStore  # noqa: E402
+from ace_memory_store import Neo4jMemoryStore  # noqa: E402
+
+
+class FakeRecord(dict):
+    def data(self):
+        return dict(self)
+
+
+class FakeTx:
+    def __init__(self, rows):
+        self.rows = rows
+        self.params = []
+
+    def run(self, query, params):
+        self.params.append(params)
+        return [FakeRecord(self.rows[uid]) for uid in params["userIds"] if uid in self.rows]
+
+
+class FakeResult(list):
+    def single(self):
+        return self[0] if self else None
+
+    def consume(self):
+        return None
+
+
+class FakeWriteTx:
+    """Records every write query and answers it from the driver's fake AceMemoryState."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, params):
+        driver = self.driver
+        driver.queries.append((query, params))
+        if "CREATE (m)-[:HAS_DELTA]" in query:
+            driver.revision += 1
+            driver.log.append(params["payload"])
+            pending = len(driver.log) - driver.snapshot_seq
+            return FakeResult([FakeRecord(pending=pending, revision=driver.revision)])
+        if "collect(d.payload) AS deltas" in query:
+            pending = driver.log[driver.snapshot_seq:]
+            return FakeResult([FakeRecord(memory_json=driver.memory_json, deltas=pending, last_seq=len(driver.log))])
+        if "m.snapshot_seq = $last_seq" in query:
+            driver.memory_json = params["memory_json"]
+            driver.snapshot_seq = params["last_seq"]
+        elif "RETURN m.revision AS revision" in query:
+            driver.revision += 1
+            if "memory_json" in params:
+                driver.memory_json = params["memory_json"]
+            return FakeResult([FakeRecord(revision=driver.revision)])
+        return FakeResult()
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_read(self, func, *args):
+        tx = FakeTx(self.driver.rows)
+        self.driver.calls.append(("read", args))
+        return func(tx, *args)
+
+    def execute_write(self, func, *args):
+        self.driver.calls.append(("write", args))
+        if not self.driver.writable:
+            raise AssertionError("load path opened a write transaction")
+        return func(FakeWriteTx(self.driver), *args)
+
+    def run(self, *args, **kwargs):
+        raise AssertionError("load path used an auto-commit query")
+
+
+class FakeDriver:
+    def __init__(self, rows, writable=False):
+        self.rows = rows
+        self.writable = writable
+        self.calls = []
+        # Fake AceMemoryState for write transactions
+        self.queries = []
+        self.revision = 0
+        self.memory_json = None
+        self.log = []
+        self.snapshot_seq = 0
+
+    def written(self, fragment):
+        """Parameters of every write query containing ``fragment``."""
+        return [params for query, params in self.queries if fragment in query]
+
+    def session(self, database=None):
+        return FakeSession(self)
+
+
+def _row(user_id, bullets, mode="snapshot"):
+    payload = json.dumps({"bullets": bullets, "access_clock": 3})
+    return {
+        "userId": user_id,
+        "revision": 4,
+        "memory_json": payload if mode != "bullets" else None,
+        "access_clock": 3,
+        "storage_mode": mode,
+        "bullets": [json.dumps(b) for b in bullets] if mode == "bullets" else [],
+        "deltas": [],
+    }
+
+
+def _with_driver(rows, writable=False):
+    driver = FakeDriver(rows, writable=writable)
+    original = ace_memory_store._DRIVER
+    ace_memory_store._DRIVER = driver
+    return driver, original
+
+
+def test_load_is_read_only():
+    bullets = [{"id": "b1", "content": "find the common denominator"}]
+    driver, original = _with_driver({"learner-a": _row("learner-a", bullets)})
+    try:
+        data = Neo4jMemoryStore("learner-a", mode="snapshot").load()
+        missing_store = Neo4jMemoryStore("learner-new", mode="bullets")
+        missing = missing_store.load()
+    finally:
+        ace_memory_store._DRIVER = original
+    assert data["bullets"] == bullets and data["access_clock"] == 3, f"unexpected payload {data}"
+    assert missing is None, "learner without memory should load as empty"
+    assert not missing_store.needs_full_sync, "fresh learner should not trigger a full sync"
+    assert [kind for kind, _ in driver.calls] == ["read", "read"], f"unexpected transactions {driver.calls}"
+    print("✅ load(): read transactions only, no node created for new learners")
+
+
+def test_load_many_batches_reads():
+    rows = {
+        "learner-a": _row("learner-a", [{"id": "a1", "content": "draw a diagram"}]),
+        "learner-b": _row("learner-b", [{"id": "b1", "content": "carry the tens"}], mode="bullets"),
+    }
+    driver, original = _with_driver(rows)
+    try:
+        stores = Neo4jMemoryStore.load_many(["learner-a", "learner-b", "learner-c", "learner-a"], mode="bullets")
+        loaded = {lid: store.load() for lid, store in stores.items()}
+        batch_calls = len(driver.calls)
+        stores["learner-a"].load()  # prefetched payload is used once
+    finally:
+        ace_memory_store._DRIVER = original
+    assert list(stores) == ["learner-a", "learner-b", "learner-c"], f"unexpected stores {list(stores)}"
+    assert batch_calls == 1, f"expected one batched read, saw {driver.calls}"
+    assert len(driver.calls) == 2, "second load() should query Neo4j again"
+    assert loaded["learner-a"]["bullets"][0]["id"] == "a1"
+    assert loaded["learner-b"]["bullets"][0]["id"] == "b1"
+    assert loaded["learner-c"] is None
+    assert stores["learner-a"].needs_full_sync and not stores["learner-b"].needs_full_sync, (
+        "full-sync flag not derived per learner"
+    )
+    print("✅ load_many(): one read transaction for 3 learners")
+
+
+class CountingStore(FileDeltaLogStore):
+    loads = 0
+
+    def load(self):
+        self.loads += 1
+        return super().load()
+
+
+def test_reload_skipped_when_version_unchanged():
+    with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(io.StringIO()):
+        store = CountingStore("learner-a", root=root)
+        memory = ACEMemory(storage=store)
+        memory.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content="draw a number line first")]))
+        memory.reload_from_storage()
+        skipped_loads = store.loads
+
+        other = ACEMemory(storage=FileDeltaLogStore("learner-a", root=root))
+        other.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content="carry the tens before adding")]))
+        memory.reload_from_storage()
+    assert skipped_loads == 1, f"reload after our own save refetched ({skipped_loads} loads)"
+    assert store.loads == 2, "reload missed a write from another process"
+    assert list(memory.bullets) == list(other.bullets), "reload did not pick up the other writer's bullet"
+    print("✅ reload_from_storage(): skipped while current, refetched after an external write")
+
+
+def test_conflicting_writers_keep_both_deltas():
+    with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(io.StringIO()) as out:
+        first = ACEMemory(storage=FileDeltaLogStore("learner-a", root=root))
+        second = ACEMemory(storage=FileDeltaLogStore("learner-a", root=root))
+        first.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content="draw a number line first")]))
+        second.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content="carry the tens before adding")]))
+        stored = FileDeltaLogStore("learner-a", root=root).load()
+    contents = sorted(b["content"] for b in stored["bullets"])
+    assert contents == ["carry the tens before adding", "draw a number line first"], (
+        f"last writer dropped a bullet: {contents}"
+    )
+    assert "Save conflict" in out.getvalue(), "stale save was not detected"
+    assert list(second.bullets) == [b["id"] for b in stored["bullets"]], "retrying writer diverged from storage"
+    print("✅ apply_delta(): stale save reloaded and re-applied, both deltas kept")
+
+
+def test_version_probe_reads_revision():
+    driver, original = _with_driver({"learner-a": _row("learner-a", [])})
+    try:
+        store = Neo4jMemoryStore("learner-a", mode="snapshot")
+        store.load()
+    finally:
+        ace_memory_store._DRIVER = original
+    assert store.version == 4, f"load() did not record the stored revision ({store.version})"
+    print("✅ load(): records the AceMemoryState revision for version probes")
+
+
+def _bullet(bullet_id, content):
+    return {"id": bullet_id, "content": content}
+
+
+def test_log_mode_appends_and_compacts():
+    driver, original = _with_driver({}, writable=True)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            store = Neo4jMemoryStore("learner-a", mode="log", compact_after=2, keep_history=False)
+            first = store.save_delta({"upserts": [_bullet("b1", "draw a number line")], "access_clock": 1})
+            compacted_early = driver.written("m.snapshot_seq = $last_seq")
+            second = store.save_delta({"upserts": [_bullet("b2", "carry the tens")], "access_clock": 2})
+            empty = store.save_delta({"upserts": [], "removed": [], "access_clock": 3})
+    finally:
+        ace_memory_store._DRIVER = original
+    assert first and second and empty, "log-mode save_delta reported a failure"
+    assert not driver.written("AceBullet"), "log mode wrote AceBullet nodes"
+    assert len(driver.written("CREATE (m)-[:HAS_DELTA]")) == 2, "expected one AceMemoryDelta per non-empty save"
+    assert not compacted_early, "compacted before compact_after entries were pending"
+    folded = json.loads(driver.memory_json)
+    assert [b["id"] for b in folded["bullets"]] == ["b1", "b2"] and folded["access_clock"] == 2, (
+        f"compaction folded the wrong state: {folded}"
+    )
+    assert driver.snapshot_seq == 2, "compaction did not advance snapshot_seq"
+    assert driver.written("DETACH DELETE d"), "keep_history=False kept compacted entries"
+    assert store.version == 2, f"store revision not updated ({store.version})"
+    print("✅ save_delta() in log mode: AceMemoryDelta appended, compacted at compact_after")
+
+
+def test_log_mode_switches_from_bullet_layout():
+    driver, original = _with_driver({}, writable=True)
+    try:
+        store = Neo4jMemoryStore("learner-a", mode="log")
+        store.needs_full_sync = True  # as after loading a bullet-node layout
+        saved = store.save_delta({"upserts": [_bullet("b1", "draw a number line")], "access_clock": 4})
+    finally:
+        ace_memory_store._DRIVER = original
+    (params,) = driver.written("DETACH DELETE b")
+    assert saved and not store.needs_full_sync, "full sync not recorded as done"
+    assert json.loads(params["memory_json"])["bullets"][0]["id"] == "b1", "snapshot missing the bullets"
+    assert not driver.written("CREATE (m)-[:HAS_DELTA]"), "full sync appended a delta instead of a snapshot"
+    print("✅ save_delta() in log mode: bullet layout replaced by one snapshot")
+
+
+def test_bullets_full_sync_deletes_stale_nodes():
+    driver, original = _with_driver({}, writable=True)
+    try:
+        store = Neo4jMemoryStore("learner-a", mode="bullets")
+        store.needs_full_sync = True
+        full = store.save_delta({"upserts": [_bullet("b1", "draw a number line")], "access_clock": 1})
+        removal = store.save_delta({"upserts": [], "removed": ["b1"], "access_clock": 2})
+        update = store.save_delta({"upserts": [_bullet("b2", "carry the tens")], "access_clock": 3})
+    finally:
+        ace_memory_store._DRIVER = original
+    assert full and removal and update and not store.needs_full_sync
+    deletes = [(q, p) for q, p in driver.queries if "DETACH DELETE b" in q]
+    assert len(deletes) == 2, f"expected deletes for the full sync and the removal, saw {len(deletes)}"
+    (sync_query, sync_params), (removal_query, removal_params) = deletes
+    assert "NOT b.id IN $keep" in sync_query and sync_params["keep"] == ["b1"], "full sync kept stale bullets"
+    assert "b.id IN $removed" in removal_query and removal_params["removed"] == ["b1"]
+    upserts = [p["upserts"] for p in driver.written("MERGE (m)-[:HAS_BULLET]")]
+    assert [[row["id"] for row in rows] for rows in upserts] == [["b1"], [], ["b2"]], f"upserts: {upserts}"
+    print("✅ save_delta() in bullets mode: full sync deletes stale nodes, later saves touch only the delta")
+
+
+def main():
+    tests = [
+        ("Read-only load", test_load_is_read_only),
+        ("Batched load_many", test_load_many_batches_reads),
+        ("Revision recorded on load", test_version_probe_reads_revision),
+        ("Conditional reload", test_reload_skipped_when_version_unchanged),
+        ("Compare-and-set retry", test_conflicting_writers_keep_both_deltas),
+        ("Log-mode append and compaction", test_log_mode_appends_and_compacts),
+        ("Log-mode full sync", test_log_mode_switches_from_bullet_layout),
+        ("Bullets-mode full sync", test_bullets_full_sync_deletes_stale_nodes),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} ACE memory store test(s) failed")
+        return 1
+    print("🎉 ALL ACE MEMORY STORE TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+ACE memory write-behind tests.
+
+Uses the file-backed delta log store in a temp directory (no Neo4j or Gemini
+needed) to check that queued saves are coalesced into one write, that the
+background thread persists them, and that failed writes stay queued. A
+snapshot-mode Neo4jMemoryStore on a fake driver checks that a Neo4jError
+during ``save`` is treated as a failed write too. Queued deltas must also
+stay unmodified, so a reload replays them as they were applied.
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from neo4j.exceptions import Neo4jError  # noqa: E402
+
+import ace_memory_store  # noqa: E402
+from ace_memory import ACEMemory, Bullet, DeltaUpdate  # noqa: E402
+from ace_memory_log import FileDeltaLogStore  # noqa: E402
+from ace_memory_store import Neo4jMemoryStore  # noqa: E402
+from ace_memory_writer import WriteBehindWriter  # noqa: E402
+
+LESSONS = [
+    "draw a number line first",
+    "carry the tens before adding",
+    "find the common denominator",
+    "check the answer by estimating",
+    "scale both parts of the fraction",
+]
+
+
+def _log_entries(store):
+    try:
+        with open(store.log_path, encoding="utf-8") as fh:
+            return [json.loads(line) for line in fh]
+    except FileNotFoundError:
+        return []
+
+
+class FlakyStore(FileDeltaLogStore):
+    fail = True
+
+    def save_delta(self, changes, expected_version=None):
+        if self.fail:
+            raise RuntimeError("storage offline")
+        return super().save_delta(changes, expected_version=expected_version)
+
+
+class _Result(list):
+    def single(self):
+        return self[0] if self else None
+
+
+class FlakyDriver:
+    """Neo4j driver fake with no stored memory whose writes fail while ``fail`` is set."""
+
+    def __init__(self):
+        self.fail = True
+        self.saved = []
+
+    def session(self, database=None):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, params=None):
+        if "memory_json" in (params or {}):
+            self.saved.append(json.loads(params["memory_json"]))
+            return _Result([{"revision": len(self.saved)}])
+        return _Result()
+
+    def execute_read(self, func, *args):
+        return func(self, *args)
+
+    def execute_write(self, func, *args):
+        if self.fail:
+            raise Neo4jError("database unavailable")
+        return func(self, *args)
+
+
+def test_queued_saves_coalesce_on_flush():
+    with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(io.StringIO()):
+        enqueued = []
+        writer = WriteBehindWriter(delay=60, on_enqueue=lambda memory, delta: enqueued.append(delta))
+        store = FileDeltaLogStore("learner-a", root=root)
+        memory = ACEMemory(storage=store, write_behind=writer)
+        for lesson in LESSONS:
+            memory.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content=lesson)]))
+        queued_entries = len(_log_entries(store))
+        assert writer.flush(), "flush reported a failed write"
+        entries = _log_entries(store)
+        stored = FileDeltaLogStore("learner-a", root=root).load()
+    assert queued_entries == 0, "apply_delta wrote before the write-behind delay"
+    assert len(enqueued) == len(LESSONS), "on_enqueue hook not called per delta"
+    assert len(entries) == 1 and entries[0]["delta"]["coalesced"] == len(LESSONS), (
+        f"expected one coalesced write, got {len(entries)}"
+    )
+    assert [b["id"] for b in stored["bullets"]] == list(memory.bullets), "flushed state diverged"
+    assert not memory.has_pending_save(), "flush left changes pending"
+    print(f"✅ write-behind: {len(LESSONS)} deltas coalesced into one write on flush")
+
+
+def test_background_thread_persists():
+    with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(io.StringIO()):
+        persisted = []
+        writer = WriteBehindWriter(delay=0.01, on_persisted=persisted.append)
+        memory = ACEMemory(storage=FileDeltaLogStore("learner-b", root=root), write_behind=writer)
+        memory.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content=LESSONS[0])]))
+        deadline = time.monotonic() + 5
+        while writer.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stored = FileDeltaLogStore("learner-b", root=root).load()
+    assert persisted == [memory], "on_persisted hook not called by the background thread"
+    assert [b["content"] for b in stored["bullets"]] == [LESSONS[0]], "background save missing"
+    print("✅ write-behind: background thread saved the queued delta")
+
+
+def test_failed_write_stays_queued():
+    with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(io.StringIO()):
+        errors = []
+        writer = WriteBehindWriter(delay=60, retry_delay=60, on_error=lambda memory, exc: errors.append(exc))
+        store = FlakyStore("learner-c", root=root)
+        memory = ACEMemory(storage=store, write_behind=writer)
+        memory.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content=LESSONS[1])]))
+        first = writer.flush()
+        still_queued = writer.pending()
+        store.fail = False
+        second = writer.flush()
+        stored = FileDeltaLogStore("learner-c", root=root).load()
+    assert not first and len(errors) == 1, "failed write not reported"
+    assert still_queued == 1, "failed write was dropped from the queue"
+    assert second and [b["content"] for b in stored["bullets"]] == [LESSONS[1]], "retry did not persist"
+    print("✅ write-behind: failed write reported, kept queued and retried")
+
+
+def test_failed_snapshot_save_stays_queued():
+    driver = FlakyDriver()
+    original = ace_memory_store._DRIVER
+    ace_memory_store._DRIVER = driver
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            persisted = []
+            writer = WriteBehindWriter(delay=60, retry_delay=60, on_persisted=persisted.append)
+            memory = ACEMemory(storage=Neo4jMemoryStore("learner-d", mode="snapshot"), write_behind=writer)
+            memory.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content=LESSONS[2])]))
+            first = writer.flush()
+            still_queued = writer.pending()
+            driver.fail = False
+            second = writer.flush()
+    finally:
+        ace_memory_store._DRIVER = original
+    assert not first and still_queued == 1, "Neo4jError in save() counted as persisted"
+    assert persisted == [memory], "on_persisted fired for the failed write or missed the retry"
+    assert second and [b["content"] for b in driver.saved[-1]["bullets"]] == [LESSONS[2]], "retry did not persist"
+    assert not memory.has_pending_save(), "retried write left changes pending"
+    print("✅ write-behind: snapshot save failing with Neo4jError kept queued and retried")
+
+
+def test_queued_delta_replays_unmodified():
+    with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(io.StringIO()):
+        writer = WriteBehindWriter(delay=60, retry_delay=60)
+        memory = ACEMemory(storage=FileDeltaLogStore("learner-e", root=root), write_behind=writer, save_retries=0)
+        memory.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content=LESSONS[3])]))
+        (bullet_id,) = memory.bullets
+        memory.apply_delta(DeltaUpdate(update_bullets={bullet_id: {"helpful": 1}}))
+
+        other = ACEMemory(storage=FileDeltaLogStore("learner-e", root=root))
+        other.apply_delta(DeltaUpdate(new_bullets=[Bullet(id="", content=LESSONS[4])]))
+        memory.reload_from_storage()  # replays both queued deltas on top of the other write
+        replayed = memory.bullets[bullet_id].helpful_count
+        writer.flush()
+    assert len(memory.bullets) == 2, f"reload lost a bullet: {list(memory.bullets)}"
+    assert replayed == 1, f"queued delta was mutated in place; replay counted helpful={replayed}"
+    print("✅ write-behind: queued deltas replay unmodified after a reload")
+
+
+def main():
+    tests = [
+        ("Coalesced flush", test_queued_saves_coalesce_on_flush),
+        ("Background save", test_background_thread_persists),
+        ("Failed write retry", test_failed_write_stays_queued),
+        ("Failed snapshot save retry", test_failed_snapshot_save_stays_queued),
+        ("Unmodified queued deltas", test_queued_delta_replays_unmodified),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} ACE memory write-behind test(s) failed")
+        return 1
+    print("🎉 ALL ACE MEMORY WRITE-BEHIND TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Batched ACE reflection tests.
+
+Drives ``Reflector.reflect_batch`` and ``ACEPipeline.process_executions``
+with a scripted LLM (no Gemini needed) and file-backed memories in a temp
+directory (no Neo4j needed). Checks that several traces share one Reflector
+call, that lessons are fanned back out to each learner's memory, and that the
+learning queue batches traces that pile up behind a busy worker.
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from ace_components import ACEPipeline, ExecutionTrace, Reflector  # noqa: E402
+from ace_learning_queue import LearningQueue  # noqa: E402
+from ace_memory import ACEMemory  # noqa: E402
+from ace_memory_log import FileDeltaLogStore  # noqa: E402
+
+
+class ScriptedLLM:
+    """Returns queued responses in order and records every prompt."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def chat(self, messages, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        content = self.responses.pop(0) if self.responses else "not json"
+        return {"choices": [{"message": {"content": content}}]}
+
+
+def _trace(learner_id, question):
+    return ExecutionTrace(
+        question=question,
+        model_answer="42",
+        success=True,
+        trace_messages=[{"role": "user", "content": question}],
+        metadata={"scratch": {"learner_id": learner_id, "topic": "addition"}},
+    )
+
+
+def _lesson(content):
+    return {"content": content, "type": "success", "tags": ["addition"]}
+
+
+def test_one_call_for_several_traces():
+    traces = [_trace(f"learner-{idx}", f"what is {idx} + {idx}?") for idx in range(3)]
+    response = json.dumps({"traces": [
+        {"index": 3, "lessons": [_lesson("lesson for trace three")]},
+        {"index": 1, "lessons": [_lesson("lesson for trace one")]},
+    ]})
+    llm = ScriptedLLM([response])
+    lessons = Reflector(llm).reflect_batch(traces, batch_size=4)
+    assert len(llm.prompts) == 1, f"expected one Reflector call, saw {len(llm.prompts)}"
+    assert all(trace.question in llm.prompts[0] for trace in traces), "a trace was left out of the prompt"
+    assert [[lesson["content"] for lesson in group] for group in lessons] == [
+        ["lesson for trace one"], [], ["lesson for trace three"],
+    ], f"lessons not matched to their traces: {lessons}"
+    print("✅ reflect_batch(): 3 traces in one call, lessons matched by index")
+
+
+def test_unparseable_batch_falls_back_per_trace():
+    traces = [_trace("learner-a", "what is 1 + 1?"), _trace("learner-b", "what is 2 + 2?")]
+    llm = ScriptedLLM([
+        "not json",
+        json.dumps({"traces": "still wrong"}),
+        json.dumps({"lessons": [_lesson("single lesson a")]}),
+        json.dumps({"lessons": [_lesson("single lesson b")]}),
+    ])
+    with contextlib.redirect_stdout(io.StringIO()):
+        lessons = Reflector(llm).reflect_batch(traces, max_refinement_rounds=2, batch_size=4)
+    assert [group[0]["content"] for group in lessons] == ["single lesson a", "single lesson b"], (
+        f"per-trace fallback returned {lessons}"
+    )
+    assert len(llm.prompts) == 4, f"expected 2 batch rounds and 2 single calls, saw {len(llm.prompts)}"
+    print("✅ reflect_batch(): invalid batch output reflected trace by trace")
+
+
+def test_process_executions_fans_out_per_learner():
+    with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(io.StringIO()):
+        response = json.dumps({"traces": [
+            {"index": 1, "lessons": [_lesson("count on from the larger addend")]},
+            {"index": 2, "lessons": [_lesson("line up the ones before adding")]},
+        ]})
+        llm = ScriptedLLM([response])
+        pipelines = {
+            lid: ACEPipeline(llm, ACEMemory(storage=FileDeltaLogStore(lid, root=root)))
+            for lid in ("learner-a", "learner-b")
+        }
+        deltas = pipelines["learner-a"].process_executions(
+            [_trace("learner-a", "what is 3 + 9?"), _trace("learner-b", "what is 14 + 5?")],
+            pipeline_for=pipelines.__getitem__,
+        )
+        stored = {lid: FileDeltaLogStore(lid, root=root).load() for lid in pipelines}
+    assert len(llm.prompts) == 1, "process_executions made more than one Reflector call"
+    assert all(delta is not None and delta.new_bullets for delta in deltas), "a trace produced no delta"
+    contents = {lid: [b["content"] for b in data["bullets"]] for lid, data in stored.items()}
+    assert any("larger addend" in c for c in contents["learner-a"]), f"learner-a missing its lesson: {contents}"
+    assert any("ones before adding" in c for c in contents["learner-b"]), f"learner-b missing its lesson: {contents}"
+    assert not any("ones before adding" in c for c in contents["learner-a"]), "lesson leaked to another learner"
+    print("✅ process_executions(): one Reflector call, lessons curated into each learner's memory")
+
+
+def test_queue_batches_backlog():
+    gate = threading.Event()
+    batches = []
+
+    def batch_handler(items):
+        gate.wait()
+        batches.append([trace for _, trace, _ in items])
+
+    queue = LearningQueue(lambda *args: None, max_workers=1, max_pending=20, batch_handler=batch_handler, max_batch=4)
+    for idx in range(7):
+        queue.submit(f"learner-{idx % 3}", idx)
+    gate.set()
+    assert queue.drain(timeout=5), "drain timed out"
+    flat = [trace for batch in batches for trace in batch]
+    assert sorted(flat) == list(range(7)), f"traces lost or duplicated: {batches}"
+    assert max(len(batch) for batch in batches) == 4, f"backlog was not batched: {batches}"
+    assert queue.pending == 0
+    print(f"✅ learning queue: 7 backlogged traces handled in {len(batches)} batches")
+
+
+def main():
+    tests = [
+        ("Batched reflection", test_one_call_for_several_traces),
+        ("Per-trace fallback", test_unparseable_batch_falls_back_per_trace),
+        ("Per-learner curation", test_process_executions_fans_out_per_learner),
+        ("Queue batching", test_queue_batches_backlog),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} ACE batched reflection test(s) failed")
+        return 1
+    print("🎉 ALL ACE BATCHED REFLECTION TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
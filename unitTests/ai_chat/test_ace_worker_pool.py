@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+ACE worker pool tests.
+
+Runs `AceWorkerPool` with a stub LangGraph app (no Gemini or Neo4j needed).
+Workers are forked from this process so they inherit the stub; the default
+forkserver start method and its preload list are checked separately. Fails
+when:
+- one learner's requests reach more than one live worker, or two learners
+  on different slots share a worker,
+- a slot is not respawned after `max_requests`,
+- a response comes back without its request id, or a command broadcast is
+  not answered once with every worker's reply,
+- the concurrency semaphore is not released after the pool drains,
+- a worker stops (recycled or at shutdown) without draining background
+  learning and then flushing its queued memory saves.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import ace_memory_writer  # noqa: E402
+import langgraph_agent_ace  # noqa: E402
+import ace_worker_pool  # noqa: E402
+import run_ace_agent  # noqa: E402
+from ace_worker_pool import AceWorkerPool  # noqa: E402
+
+MAX_REQUESTS = 3
+
+
+class StubApp:
+    """Answers every request with the pid of the worker that ran it."""
+
+    def invoke(self, state, config=None):
+        scratch = dict(state["scratch"], pid=os.getpid())
+        return {"result": {"answer": "stub answer"}, "mode": "cot", "scratch": scratch}
+
+
+@contextlib.contextmanager
+def _stub_graph():
+    names = ("build_ace_graph", "_warm_storage")
+    originals = [getattr(run_ace_agent, name) for name in names]
+    run_ace_agent.build_ace_graph = lambda use_checkpointer=True: StubApp()
+    run_ace_agent._warm_storage = lambda: None
+    try:
+        yield
+    finally:
+        for name, original in zip(names, originals):
+            setattr(run_ace_agent, name, original)
+
+
+@contextlib.contextmanager
+def _recorded_shutdown():
+    """Stub the learning drain and write-behind flush; yields a function listing ``(step, pid)``."""
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "shutdown.log")
+        originals = (langgraph_agent_ace.drain_learning_queue, ace_memory_writer.flush_write_behind)
+
+        def record(step):
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(f"{step} {os.getpid()}\n")
+            return True
+
+        def steps():
+            if not os.path.exists(path):
+                return []
+            with open(path, encoding="utf-8") as fh:
+                return [(step, int(pid)) for step, pid in (line.split() for line in fh)]
+
+        langgraph_agent_ace.drain_learning_queue = lambda timeout=None: record("drain")
+        ace_memory_writer.flush_write_behind = lambda: record("flush")
+        try:
+            yield steps
+        finally:
+            langgraph_agent_ace.drain_learning_queue, ace_memory_writer.flush_write_behind = originals
+
+
+def _request(request_id, learner_id):
+    return {
+        "id": request_id,
+        "messages": [{"role": "user", "content": "What is 7 + 5?"}],
+        "scratch": {"learner_id": learner_id},
+    }
+
+
+def _learners_on_distinct_slots(pool):
+    first = "learner-0"
+    for n in range(1, 100):
+        other = f"learner-{n}"
+        if pool.slot_for(_request(None, other)) != pool.slot_for(_request(None, first)):
+            return first, other
+    raise AssertionError("no two learner ids map to different slots")
+
+
+def _run_pool(requests, commands=()):
+    """Submit ``requests`` (and broadcast ``commands``); return responses by id once all arrive."""
+    responses = {}
+    lock = threading.Lock()
+    done = threading.Event()
+    expected = len(requests) + len(commands)
+
+    def collect(response):
+        with lock:
+            responses[response.get("id")] = response
+            if len(responses) == expected:
+                done.set()
+
+    with _stub_graph(), contextlib.redirect_stderr(io.StringIO()):
+        pool = AceWorkerPool(2, max_requests=MAX_REQUESTS, start_method="fork")
+        pool.start()
+        try:
+            for payload in requests:
+                pool.submit(payload, collect)
+            for payload in commands:
+                pool.broadcast(payload, collect)
+            finished = done.wait(60)
+        finally:
+            pool.shutdown()
+    assert finished, f"only {len(responses)} of {expected} responses arrived"
+    return pool, responses
+
+
+def test_default_start_method_preloads():
+    pool = AceWorkerPool(2)
+    assert pool.ctx.get_start_method() == "forkserver", f"start method {pool.ctx.get_start_method()}"
+    import multiprocessing.forkserver as forkserver
+
+    assert forkserver._forkserver._preload_modules == ace_worker_pool._PRELOAD_MODULES, (
+        "forkserver does not preload the ACE stack"
+    )
+    assert pool.slot_for(_request(None, "learner-x")) == zlib.crc32(b"learner-x") % 2, "slot is not crc32-based"
+    assert pool.slot_for({"messages": []}) == pool.slot_for(_request(None, None)), "anonymous requests split"
+    print("✅ AceWorkerPool: forkserver with preload by default, crc32 learner routing")
+
+
+def test_affinity_recycling_and_ids():
+    probe = AceWorkerPool(2, start_method="fork")
+    learner_a, learner_b = _learners_on_distinct_slots(probe)
+    requests = [_request(f"a{n}", learner_a) for n in range(2 * MAX_REQUESTS)]
+    requests += [_request(f"b{n}", learner_b) for n in range(2)]
+    pool, responses = _run_pool(requests)
+
+    for payload in requests:
+        response = responses.get(payload["id"])
+        assert response is not None, f"no response carrying id {payload['id']!r}"
+        assert "error" not in response, f"{payload['id']} failed: {response['error']}"
+    pids_a = [responses[f"a{n}"]["scratch"]["pid"] for n in range(2 * MAX_REQUESTS)]
+    pids_b = {responses[f"b{n}"]["scratch"]["pid"] for n in range(2)}
+    first, second = set(pids_a[:MAX_REQUESTS]), set(pids_a[MAX_REQUESTS:])
+    assert len(first) == 1 and len(second) == 1, f"learner A spread over workers: {pids_a}"
+    assert first != second, f"slot not respawned after {MAX_REQUESTS} requests: {pids_a}"
+    assert len(pids_b) == 1 and not pids_b & (first | second), "learners on different slots shared a worker"
+    assert pool._slots_available._value == pool.max_concurrency, "concurrency slots leaked"
+    print(
+        f"✅ AceWorkerPool: {len(requests)} responses with their ids, learner pinned to one pid, "
+        f"respawned after {MAX_REQUESTS} requests"
+    )
+
+
+def test_command_broadcast():
+    _, responses = _run_pool([_request("r1", "learner-0")], commands=[{"id": "cmd-1", "command": "no-such-command"}])
+    reply = responses.get("cmd-1")
+    assert reply is not None and len(reply["workers"]) == 2, f"broadcast reply: {reply}"
+    assert all("Unknown command" in worker["error"] for worker in reply["workers"]), reply
+    assert all("id" not in worker for worker in reply["workers"]), "per-worker replies kept the request id"
+    assert "error" not in responses["r1"], "request alongside a broadcast failed"
+    print("✅ AceWorkerPool: command answered once with every worker's reply")
+
+
+def test_stopping_worker_drains_and_flushes():
+    requests = [_request(f"a{n}", "learner-0") for n in range(2 * MAX_REQUESTS)]
+    with _recorded_shutdown() as steps:
+        _, responses = _run_pool(requests)
+        recorded = steps()
+    pids = [responses[payload["id"]]["scratch"]["pid"] for payload in requests]
+    recycled, replacement = pids[0], pids[-1]
+    flushed = [pid for step, pid in recorded if step == "flush"]
+    assert recycled != replacement, f"worker not recycled: {pids}"
+    assert recycled in flushed, "recycled worker exited without flushing its memory saves"
+    assert replacement in flushed, "worker stopped at shutdown without flushing its memory saves"
+    for pid in (recycled, replacement):
+        own = [step for step, step_pid in recorded if step_pid == pid]
+        assert own == ["drain", "flush"], f"worker {pid} shutdown steps {own}, expected drain then flush"
+    print("✅ AceWorkerPool: recycled and shut-down workers drain learning, then flush memory saves")
+
+
+def main():
+    tests = [
+        ("Start method and routing", test_default_start_method_preloads),
+        ("Affinity, recycling and ids", test_affinity_recycling_and_ids),
+        ("Command broadcast", test_command_broadcast),
+        ("Drain and flush on worker stop", test_stopping_worker_drains_and_flushes),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} worker pool test(s) failed")
+        return 1
+    print("🎉 ALL WORKER POOL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
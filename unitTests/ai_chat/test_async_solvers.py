@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Concurrent ToT / CoT solver tests.
+
+Replaces `LLM.chat` with a scripted stub that sleeps like a Gemini round trip
+(no API key or network needed) and checks that `solve_tot` sends each depth
+level's expansions and value calls together, that `solve_cot` draws its
+self-consistency samples together, and that the semaphore caps requests in
+flight.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import langgraph_utile  # noqa: E402
+
+ROUND_TRIP = 0.05
+
+
+class StubLLM(langgraph_utile.LLM):
+    lock = threading.Lock()
+    calls = 0
+    in_flight = 0
+    peak = 0
+
+    @classmethod
+    def reset(cls):
+        cls.calls = cls.in_flight = cls.peak = 0
+
+    def chat(self, messages, **kwargs):
+        with StubLLM.lock:
+            StubLLM.calls += 1
+            StubLLM.in_flight += 1
+            StubLLM.peak = max(StubLLM.peak, StubLLM.in_flight)
+        time.sleep(ROUND_TRIP)
+        with StubLLM.lock:
+            StubLLM.in_flight -= 1
+        prompt = messages[-1]["content"]
+        if "Now conclude" in prompt:
+            text = "<final>4</final>"
+        elif "strict evaluator" in messages[0]["content"]:
+            text = str(len(prompt) % 10)
+        elif "<partial>" in prompt:
+            text = json.dumps({"thoughts": ["add the ones", "count on", "use a number line"]})
+        else:
+            text = "<final>4</final>"
+        return {"choices": [{"message": {"content": text}}]}
+
+
+@contextlib.contextmanager
+def _stub_llm():
+    original = langgraph_utile.LLM
+    langgraph_utile.LLM = StubLLM
+    StubLLM.reset()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        langgraph_utile.LLM = original
+
+
+def _state(**scratch):
+    return {"messages": [{"role": "user", "content": "What is 2 + 2?"}], "mode": "tot", "scratch": scratch, "result": {}}
+
+
+def test_tot_levels_run_concurrently():
+    breadth, depth = 3, 2
+    with _stub_llm():
+        start = time.perf_counter()
+        result = langgraph_utile.solve_tot(_state(breadth=breadth, depth=depth))
+        elapsed = time.perf_counter() - start
+    # 1 + 3 expansions, 3 + 9 value calls, 1 final
+    assert StubLLM.calls == 17, f"expected 17 Gemini calls, saw {StubLLM.calls}"
+    serial = StubLLM.calls * ROUND_TRIP
+    assert elapsed < serial / 2, f"ToT took {elapsed:.2f}s; serial would be {serial:.2f}s"
+    assert result["answer"] == "4" and result["scratchpad"].startswith("Thought:"), f"unexpected result {result}"
+    print(f"✅ solve_tot: 17 calls in {elapsed:.2f}s (serial ~{serial:.2f}s), peak {StubLLM.peak} in flight")
+
+
+def test_semaphore_caps_requests():
+    with _stub_llm():
+        langgraph_utile.solve_tot(_state(breadth=3, depth=2, max_concurrency=2))
+    assert StubLLM.peak <= 2, f"{StubLLM.peak} requests in flight with max_concurrency=2"
+    print(f"✅ solve_tot: max_concurrency=2 kept {StubLLM.peak} requests in flight")
+
+
+def test_cot_samples_run_concurrently():
+    with _stub_llm():
+        start = time.perf_counter()
+        result = langgraph_utile.solve_cot(_state(k=5))
+        elapsed = time.perf_counter() - start
+    assert StubLLM.calls == 5 and len(result["raw_samples"]) == 5, "expected 5 self-consistency samples"
+    assert result["answer"] == "4", f"unexpected answer {result['answer']}"
+    assert elapsed < 5 * ROUND_TRIP / 2, f"CoT samples took {elapsed:.2f}s; looks serial"
+    print(f"✅ solve_cot: 5 samples in {elapsed:.2f}s")
+
+
+def main():
+    tests = [
+        ("Concurrent ToT levels", test_tot_levels_run_concurrently),
+        ("Concurrency cap", test_semaphore_caps_requests),
+        ("Concurrent CoT samples", test_cot_samples_run_concurrently),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} async solver test(s) failed")
+        return 1
+    print("🎉 ALL ASYNC SOLVER TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Curriculum snapshot tests.
+
+Builds a `CurriculumSnapshot` from fake rows (no Neo4j or Gemini needed) and
+checks title and keyword ranking, type filters and listing. Then runs the
+`curriculum_lookup` tool with a counting loader to check that the snapshot is
+loaded once, dropped when curriculum labels are invalidated, reloaded by the
+`refresh_curriculum` runner command, and left out of ReAct when
+ACE_CURRICULUM_SNAPSHOT=0.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import curriculum_snapshot  # noqa: E402
+import langgraph_utile  # noqa: E402
+import neo4j_qa_cache  # noqa: E402
+import run_ace_agent  # noqa: E402
+from curriculum_snapshot import CurriculumSnapshot  # noqa: E402
+from neo4j_qa_cache import Neo4jQACache  # noqa: E402
+
+RECORDS = [
+    ("Chapter", {"props": {"name": "Place Value", "order": 1}}),
+    ("Unit", {"props": {"name": "Tens and Ones", "order": 1}, "chapter": "Place Value"}),
+    ("Section", {"props": {"title": "Making Ten", "order": 1}, "chapter": "Place Value", "unit": "Tens and Ones"}),
+    ("Example", {
+        "props": {"title": "Borrowing with Dots and Boxes", "explanation": "Trade one ten for ten ones.", "order": 1},
+        "chapter": "Place Value", "unit": "Tens and Ones", "section": "Making Ten",
+    }),
+    ("Definition", {
+        "props": {"term": "Place value", "definition": "The value of a digit from its position."},
+        "chapter": "Place Value", "unit": "Tens and Ones",
+    }),
+    ("Problem", {
+        "props": {"instructions": "Show 23 using tens and ones.", "order": 1},
+        "chapter": "Place Value", "unit": "Tens and Ones",
+    }),
+]
+
+
+@contextlib.contextmanager
+def _fake_loader():
+    loads = []
+
+    def load():
+        loads.append(1)
+        return CurriculumSnapshot.from_records(RECORDS)
+
+    original_load = curriculum_snapshot.load_curriculum_snapshot
+    original_cache = neo4j_qa_cache._CACHE
+    curriculum_snapshot.load_curriculum_snapshot = load
+    curriculum_snapshot._SNAPSHOT = None
+    neo4j_qa_cache._CACHE = Neo4jQACache()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            yield loads
+    finally:
+        curriculum_snapshot.load_curriculum_snapshot = original_load
+        curriculum_snapshot._SNAPSHOT = None
+        neo4j_qa_cache._CACHE = original_cache
+
+
+def _lookup(**args):
+    return json.loads(langgraph_utile._curriculum_lookup_run(args))
+
+
+def test_search_ranking():
+    snapshot = CurriculumSnapshot.from_records(RECORDS)
+    assert len(snapshot) == len(RECORDS) and snapshot.counts()["Definition"] == 1
+    titles = [e.title for e in snapshot.search("making ten")]
+    assert titles[0] == "Making Ten", f"exact title not first: {titles}"
+    assert snapshot.search("borrowing")[0].title == "Borrowing with Dots and Boxes"
+    found = snapshot.search("ones", types=["Example"])
+    assert [e.label for e in found] == ["Example"], f"type filter ignored: {found}"
+    assert found[0].to_dict()["section"] == "Making Ten"
+    listed = snapshot.search("", types=["Unit", "Section"], limit=10)
+    assert [e.title for e in listed] == ["Tens and Ones", "Making Ten"], f"listing out of order: {listed}"
+    assert snapshot.search("photosynthesis") == []
+    print("✅ CurriculumSnapshot.search: exact titles first, keyword matches, type filters and listing")
+
+
+def test_lookup_loads_once():
+    with _fake_loader() as loads:
+        first = _lookup(query="place value", types=["Definition"])
+        second = _lookup(query="dots and boxes")
+        missing = _lookup(query="photosynthesis")
+    assert len(loads) == 1, f"snapshot loaded {len(loads)} times"
+    assert first["results"][0]["title"] == "Place value" and "definition" in first["results"][0]
+    assert second["results"][0]["type"] == "Example"
+    assert missing["results"] == [] and "neo4j_retrieveqa" in missing["note"]
+    assert "error" in langgraph_utile._curriculum_lookup_run({})
+    print("✅ curriculum_lookup: one load serves every lookup; misses point to neo4j_retrieveqa")
+
+
+def test_invalidation_and_refresh():
+    with _fake_loader() as loads:
+        _lookup(query="making ten")
+        neo4j_qa_cache.invalidate_neo4j_cache(["User"])
+        _lookup(query="making ten")
+        assert len(loads) == 1, "a non-curriculum write dropped the snapshot"
+        neo4j_qa_cache.invalidate_neo4j_cache(["Section"])
+        _lookup(query="making ten")
+        assert len(loads) == 2, "a curriculum write did not drop the snapshot"
+        response = run_ace_agent._handle_request(None, {"id": 7, "command": "refresh_curriculum"})
+        _lookup(query="making ten")
+        bad = run_ace_agent._handle_request(None, {"command": "nope"})
+    assert len(loads) == 3, f"refresh did not reload exactly once ({len(loads)} loads)"
+    assert response["id"] == 7 and response["entries"] == len(RECORDS), f"refresh reply: {response}"
+    assert "error" in bad
+    print("✅ Snapshot drops on curriculum invalidation and reloads on refresh_curriculum")
+
+
+def test_snapshot_can_be_disabled():
+    previous = os.environ.get("ACE_CURRICULUM_SNAPSHOT")
+    try:
+        os.environ["ACE_CURRICULUM_SNAPSHOT"] = "1"
+        enabled = [t["function"]["name"] for t in langgraph_utile._react_tool_schemas()]
+        os.environ["ACE_CURRICULUM_SNAPSHOT"] = "0"
+        disabled = [t["function"]["name"] for t in langgraph_utile._react_tool_schemas()]
+    finally:
+        if previous is None:
+            os.environ.pop("ACE_CURRICULUM_SNAPSHOT", None)
+        else:
+            os.environ["ACE_CURRICULUM_SNAPSHOT"] = previous
+    assert enabled.index("curriculum_lookup") < enabled.index("neo4j_retrieveqa"), f"tool order: {enabled}"
+    assert "curriculum_lookup" not in disabled and "neo4j_retrieveqa" in disabled, f"disabled tools: {disabled}"
+    print("✅ ACE_CURRICULUM_SNAPSHOT=0: ReAct is offered neo4j_retrieveqa only")
+
+
+def main():
+    tests = [
+        ("Search ranking", test_search_ranking),
+        ("Lookup tool", test_lookup_loads_once),
+        ("Invalidation and refresh", test_invalidation_and_refresh),
+        ("Disable switch", test_snapshot_can_be_disabled),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} curriculum snapshot test(s) failed")
+        return 1
+    print("🎉 ALL CURRICULUM SNAPSHOT TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
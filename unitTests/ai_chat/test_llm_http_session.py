@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Pooled Gemini HTTP session tests.
+
+Points `LLM` at a local keep-alive HTTP server that answers in Gemini's
+response format (no API key or network needed) and checks that calls from
+several `LLM` instances and threads reuse pooled connections instead of
+opening one per request, and that a forked worker gets its own session.
+"""
+
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import langgraph_utile  # noqa: E402
+from langgraph_utile import LLM, get_http_session  # noqa: E402
+
+langgraph_utile.LLM_HTTP2 = "0"  # the stub server only speaks HTTP/1.1
+
+CALLS = 12
+
+
+class GeminiStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with GeminiStub.lock:
+            GeminiStub.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({
+            "candidates": [{"finishReason": "STOP", "content": {"parts": [{"text": "4"}]}}],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GeminiStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_calls_reuse_pooled_connections():
+    server = _serve()
+    GeminiStub.connections = 0
+    langgraph_utile._HTTP_SESSION = None
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/generateContent"
+        llms = [LLM(), LLM(temperature=0.7)]
+        for llm in llms:
+            llm.endpoint = url
+
+        def ask(idx):
+            llm = llms[idx % len(llms)]
+            return llm.chat([{"role": "user", "content": "2 + 2?"}])["choices"][0]["message"]["content"]
+
+        with ThreadPoolExecutor(4) as pool:
+            answers = list(pool.map(ask, range(CALLS)))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert answers == ["4"] * CALLS, f"unexpected answers {answers}"
+    assert GeminiStub.connections <= 4, (
+        f"{CALLS} calls opened {GeminiStub.connections} connections; expected at most one per thread"
+    )
+    print(f"✅ LLM.chat: {CALLS} calls from 2 LLMs and 4 threads used {GeminiStub.connections} connections")
+
+
+def test_session_shared_and_rebuilt_after_fork():
+    first = get_http_session()
+    assert get_http_session() is first, "session not shared within the process"
+    original_pid = langgraph_utile._HTTP_SESSION_PID
+    langgraph_utile._HTTP_SESSION_PID = -1  # what a forked child sees
+    try:
+        rebuilt = get_http_session()
+    finally:
+        langgraph_utile._HTTP_SESSION_PID = original_pid
+    assert rebuilt is not first, "forked worker reused the parent's sockets"
+    print("✅ get_http_session(): one session per process, rebuilt after fork")
+
+
+def main():
+    tests = [
+        ("Pooled connections", test_calls_reuse_pooled_connections),
+        ("Shared session", test_session_shared_and_rebuilt_after_fork),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} LLM session test(s) failed")
+        return 1
+    print("🎉 ALL LLM SESSION TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
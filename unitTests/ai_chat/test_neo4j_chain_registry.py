@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Neo4j QA chain registry tests.
+
+Uses a fake Neo4jGraph and a stand-in chain builder (no Neo4j or Gemini
+needed) and checks that chains are reused per configuration whatever the
+requested top_k, that the schema is fetched once and refreshed only after
+ACE_NEO4J_SCHEMA_TTL_S, that a changed schema drops the registered chains and
+cached Cypher, and that top_k becomes a LIMIT in the executed Cypher.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import langgraph_utile  # noqa: E402
+import neo4j_qa_cache  # noqa: E402
+from langgraph_utile import _limit_cypher  # noqa: E402
+from neo4j_qa_cache import Neo4jQACache  # noqa: E402
+
+UNITS_CYPHER = "MATCH (c:Chapter)-[:HAS_UNIT]->(u:Unit) RETURN c.name, u.name ORDER BY c.order, u.order"
+
+
+class FakeGraph:
+    def __init__(self):
+        self.refreshes = 0
+        self.labels = ["Chapter", "Unit"]
+        self.queries = []
+
+    def refresh_schema(self):
+        self.refreshes += 1
+
+    @property
+    def get_structured_schema(self):
+        props = [{"property": "name", "type": "STRING"}]
+        return {"node_props": {label: props for label in self.labels}, "rel_props": {}, "relationships": []}
+
+    def query(self, cypher, params=None):
+        self.queries.append(cypher)
+        return [{"c.name": "Place Value", "u.name": f"Unit {i}"} for i in range(30)]
+
+
+class _Step:
+    output_key = "text"
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    def invoke(self, inputs, **kwargs):
+        self.calls += 1
+        return {"text": self.reply(inputs)}
+
+
+class FakeChain:
+    cypher_query_corrector = None
+
+    def __init__(self):
+        self.cypher_generation_chain = _Step(lambda inputs: UNITS_CYPHER)
+        self.qa_chain = _Step(lambda inputs: f"{len(inputs['context'])} units")
+
+
+@contextlib.contextmanager
+def _fake_neo4j():
+    graph = FakeGraph()
+    built = []
+
+    def new_chain(model, cypher_temperature, qa_temperature):
+        built.append((model, cypher_temperature, qa_temperature))
+        return FakeChain()
+
+    names = ("_NEO4J_GRAPH", "_NEO4J_SCHEMA", "_NEO4J_SCHEMA_AT", "_NEO4J_CHAINS", "_new_neo4j_chain")
+    originals = [getattr(langgraph_utile, name) for name in names] + [neo4j_qa_cache._CACHE]
+    langgraph_utile._NEO4J_GRAPH = graph
+    langgraph_utile._NEO4J_SCHEMA = None
+    langgraph_utile._NEO4J_SCHEMA_AT = 0.0
+    langgraph_utile._NEO4J_CHAINS = {}
+    langgraph_utile._new_neo4j_chain = new_chain
+    neo4j_qa_cache._CACHE = Neo4jQACache()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield graph, built
+    finally:
+        for name, original in zip(names, originals):
+            setattr(langgraph_utile, name, original)
+        neo4j_qa_cache._CACHE = originals[-1]
+
+
+def test_limit_cypher():
+    cases = [
+        ("MATCH (n:Unit) RETURN n.name", 5, "MATCH (n:Unit) RETURN n.name LIMIT 5"),
+        ("MATCH (n:Unit) RETURN n.name LIMIT 50;", 5, "MATCH (n:Unit) RETURN n.name LIMIT 5"),
+        ("MATCH (n:Unit) RETURN n.name limit 3", 10, "MATCH (n:Unit) RETURN n.name limit 3"),
+        ("MATCH (n:Unit) RETURN n.name LIMIT $k", 5, "MATCH (n:Unit) RETURN n.name LIMIT $k"),
+        ("MATCH (n:Unit) RETURN n.name", 10_000, f"MATCH (n:Unit) RETURN n.name LIMIT {langgraph_utile.NEO4J_MAX_ROWS}"),
+        # Writes without RETURN would become invalid
+        ("MATCH (u:User {id: $id}) SET u.xp = 10;", 5, "MATCH (u:User {id: $id}) SET u.xp = 10"),
+        ("MERGE (c:Chapter {name: 'Fractions'}) RETURN c", 5, "MERGE (c:Chapter {name: 'Fractions'}) RETURN c"),
+        # A trailing LIMIT would only bind the last UNION branch
+        (
+            "MATCH (c:Chapter) RETURN c.name AS name UNION MATCH (u:Unit) RETURN u.name AS name",
+            5,
+            "MATCH (c:Chapter) RETURN c.name AS name UNION MATCH (u:Unit) RETURN u.name AS name",
+        ),
+        (
+            "MATCH (c:Chapter) RETURN c.name AS name UNION ALL MATCH (u:Unit) RETURN u.name AS name LIMIT 50",
+            5,
+            "MATCH (c:Chapter) RETURN c.name AS name UNION ALL MATCH (u:Unit) RETURN u.name AS name LIMIT 50",
+        ),
+    ]
+    for cypher, limit, expected in cases:
+        got = _limit_cypher(cypher, limit)
+        assert got == expected, f"_limit_cypher({cypher!r}, {limit}) -> {got!r}"
+    print("✅ _limit_cypher: tightens or appends LIMIT, keeps parameterised LIMITs, writes and UNIONs")
+
+
+def test_registry_reuses_chains_per_config():
+    with _fake_neo4j() as (graph, built):
+        first = langgraph_utile._build_neo4j_chain("gemini-2.5-flash")
+        again = langgraph_utile._build_neo4j_chain("gemini-2.5-flash")
+        warmer = langgraph_utile._build_neo4j_chain("gemini-2.5-flash", qa_temperature=0.7)
+    assert first is again, "same configuration built a second chain"
+    assert warmer is not first and len(built) == 2, f"built {built}"
+    assert graph.refreshes == 1, f"schema fetched {graph.refreshes} times for 3 lookups"
+    print("✅ _build_neo4j_chain: one chain per (model, temperatures), one schema fetch")
+
+
+def test_schema_refreshes_after_ttl():
+    with _fake_neo4j() as (graph, built):
+        chain = langgraph_utile._build_neo4j_chain()
+        neo4j_qa_cache._CACHE.put_cypher("list the units", UNITS_CYPHER)
+
+        langgraph_utile._NEO4J_SCHEMA_AT -= langgraph_utile.NEO4J_SCHEMA_TTL_S + 1
+        langgraph_utile._neo4j_schema()
+        unchanged = langgraph_utile._build_neo4j_chain() is chain
+        kept = neo4j_qa_cache._CACHE.get_cypher("list the units")
+
+        graph.labels.append("Section")
+        langgraph_utile._NEO4J_SCHEMA_AT -= langgraph_utile.NEO4J_SCHEMA_TTL_S + 1
+        schema = langgraph_utile._neo4j_schema()
+        rebuilt = langgraph_utile._build_neo4j_chain() is not chain
+        dropped = neo4j_qa_cache._CACHE.get_cypher("list the units") is None
+    assert graph.refreshes == 3, f"expected 3 schema fetches, saw {graph.refreshes}"
+    assert unchanged and kept == UNITS_CYPHER, "an unchanged schema dropped chains or cached Cypher"
+    assert "Section" in schema and rebuilt and dropped, "a changed schema kept stale chains or Cypher"
+    print("✅ _neo4j_schema: refreshed after the TTL; a changed schema rebuilds chains and drops cached Cypher")
+
+
+def test_top_k_limits_executed_cypher():
+    with _fake_neo4j() as (graph, built):
+        run = langgraph_utile._neo4j_retrieveqa_run
+        small = json.loads(run({"question": "List the units", "top_k": 3}))
+        large = json.loads(run({"question": "List the units", "top_k": 20}))
+        chain = langgraph_utile._build_neo4j_chain()
+    assert graph.queries == [f"{UNITS_CYPHER} LIMIT 3", f"{UNITS_CYPHER} LIMIT 20"], f"ran {graph.queries}"
+    assert len(small["context"]) == 3 and len(large["context"]) == 20, "rows not capped at top_k"
+    assert chain.cypher_generation_chain.calls == 1, "the second top_k regenerated the Cypher"
+    assert len(built) == 1, "a different top_k built a new chain"
+    print("✅ neo4j_retrieveqa: top_k applied as LIMIT on one shared chain and cached Cypher")
+
+
+def main():
+    tests = [
+        ("LIMIT rewriting", test_limit_cypher),
+        ("Chain registry", test_registry_reuses_chains_per_config),
+        ("Schema TTL", test_schema_refreshes_after_ttl),
+        ("Per-call top_k", test_top_k_limits_executed_cypher),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} Neo4j chain registry test(s) failed")
+        return 1
+    print("🎉 ALL NEO4J CHAIN REGISTRY TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Precompiled Cypher template tests.
+
+Checks which questions `neo4j_cypher_templates` recognises, then runs
+`neo4j_retrieveqa` against a fake chain and graph (no Neo4j or Gemini
+needed) to check that a recognised question skips Cypher generation and
+sends the template's parameters to Neo4j, and that a template finding no
+rows, or ACE_NEO4J_TEMPLATES=0, falls back to the chain.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import langgraph_utile  # noqa: E402
+import neo4j_qa_cache  # noqa: E402
+from neo4j_cypher_templates import match_cypher_template  # noqa: E402
+from neo4j_qa_cache import Neo4jQACache  # noqa: E402
+
+GENERATED_CYPHER = "MATCH (u:Unit)-[:CONTAINS]->(s:Section) RETURN s.title AS section_title LIMIT 10"
+ROWS = [{"section_title": "Making Ten"}]
+
+
+class FakeGraph:
+    def __init__(self, template_rows):
+        self.template_rows = template_rows
+        self.queries = []
+
+    def query(self, cypher, params=None):
+        self.queries.append((cypher, params))
+        return list(self.template_rows if "$" in cypher else ROWS)
+
+
+class _Step:
+    output_key = "text"
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    def invoke(self, inputs, **kwargs):
+        self.calls += 1
+        return {"text": self.reply(inputs)}
+
+
+class FakeChain:
+    cypher_query_corrector = None
+
+    def __init__(self, template_rows):
+        self.graph = FakeGraph(template_rows)
+        self.cypher_generation_chain = _Step(lambda inputs: GENERATED_CYPHER)
+        self.qa_chain = _Step(lambda inputs: f"{len(inputs['context'])} rows")
+
+
+@contextlib.contextmanager
+def _fake_chain(template_rows=ROWS):
+    chain = FakeChain(template_rows)
+    names = ("_build_neo4j_chain", "_neo4j_graph", "_neo4j_schema")
+    originals = [getattr(langgraph_utile, name) for name in names] + [neo4j_qa_cache._CACHE]
+    langgraph_utile._build_neo4j_chain = lambda *args, **kwargs: chain
+    langgraph_utile._neo4j_graph = lambda: chain.graph
+    langgraph_utile._neo4j_schema = lambda: "Node properties: Unit {name}, Section {title}"
+    neo4j_qa_cache._CACHE = Neo4jQACache()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield chain
+    finally:
+        for name, original in zip(names, originals):
+            setattr(langgraph_utile, name, original)
+        neo4j_qa_cache._CACHE = originals[-1]
+
+
+def _ask(question, **args):
+    return json.loads(langgraph_utile._neo4j_retrieveqa_run({"question": question, **args}))
+
+
+def test_intents_recognised():
+    cases = [
+        ("List all chapters and their units", "chapter_units", {"limit": 10}),
+        ("What sections are in unit 'Tens and Ones'?", "unit_sections", {"unit": "tens and ones", "limit": 10}),
+        ("Find all examples in section Making Ten", "section_examples", {"section": "making ten", "limit": 10}),
+        ("Explain the example about borrowing", "example_search", {"keyword": "borrow", "limit": 10}),
+        ("Which user has the highest XP?", "xp_leaderboard", {"limit": 1}),
+        ("Show the top 3 users by XP", "xp_leaderboard", {"limit": 3}),
+        ("Show users who completed quizzes and their total XP earned", "quiz_xp", {"limit": 10}),
+        ("Quiz progress for all users", "quiz_progress", {"limit": 10}),
+    ]
+    for question, name, params in cases:
+        found = match_cypher_template(question, 10)
+        assert found is not None and (found.name, found.params) == (name, params), f"{question!r} -> {found}"
+        assert "$limit" in found.cypher, f"{name} does not take its LIMIT as a parameter"
+    fall_through = (
+        "How many users are in the system?",
+        "Which sections in unit 2 were added after March?",
+        "Examples about fractions in chapter 3",
+        "Show me examples about fractions in chapter 3",
+        "Explain the example about borrowing in Dots and Boxes",
+    )
+    for question in fall_through:
+        assert match_cypher_template(question, 10) is None, f"{question!r} should go to the chain"
+    print(f"✅ match_cypher_template: {len(cases)} intents recognised, other questions left to the chain")
+
+
+def test_template_skips_cypher_generation():
+    with _fake_chain() as chain:
+        first = _ask("What sections are in unit Tens and Ones?", top_k=5)
+        second = _ask("what sections are in unit tens and ones", top_k=5)
+    cypher, params = chain.graph.queries[0]
+    assert chain.cypher_generation_chain.calls == 0, "a recognised question called the Cypher LLM"
+    assert params == {"unit": "tens and ones", "limit": 5}, f"Neo4j got params {params}"
+    assert first["template"] == "unit_sections" and first["generated_cypher"] == cypher
+    assert len(chain.graph.queries) == 1 and chain.qa_chain.calls == 1, "repeat template question reached Neo4j"
+    assert second["answer"] == first["answer"] == "1 rows"
+    print("✅ neo4j_retrieveqa: template question answered without Cypher generation, then from cache")
+
+
+def test_empty_template_falls_back_to_chain():
+    with _fake_chain(template_rows=[]) as chain:
+        result = _ask("What sections are in unit Nonexistent?")
+    assert chain.cypher_generation_chain.calls == 1, "empty template result did not fall back to the chain"
+    assert "template" not in result and result["generated_cypher"] == GENERATED_CYPHER
+    assert result["context"] == ROWS and chain.qa_chain.calls == 1, "QA ran on the empty template rows"
+    print("✅ neo4j_retrieveqa: template without rows falls back to generated Cypher")
+
+
+def test_templates_can_be_disabled():
+    previous = os.environ.get("ACE_NEO4J_TEMPLATES")
+    os.environ["ACE_NEO4J_TEMPLATES"] = "0"
+    try:
+        with _fake_chain() as chain:
+            result = _ask("List all chapters and their units")
+    finally:
+        if previous is None:
+            os.environ.pop("ACE_NEO4J_TEMPLATES", None)
+        else:
+            os.environ["ACE_NEO4J_TEMPLATES"] = previous
+    assert chain.cypher_generation_chain.calls == 1 and "template" not in result, "ACE_NEO4J_TEMPLATES=0 ignored"
+    print("✅ ACE_NEO4J_TEMPLATES=0: every question goes through the chain")
+
+
+def main():
+    tests = [
+        ("Intent matching", test_intents_recognised),
+        ("Template fast path", test_template_skips_cypher_generation),
+        ("Empty template fallback", test_empty_template_falls_back_to_chain),
+        ("Disable switch", test_templates_can_be_disabled),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} Cypher template test(s) failed")
+        return 1
+    print("🎉 ALL CYPHER TEMPLATE TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+neo4j_retrieveqa cache tests.
+
+Installs a fake QA chain and graph (no Neo4j or Gemini needed) and checks
+that a repeated question skips Cypher generation, the Neo4j query and the QA
+call, that invalidating a label refetches only the rows, and that TTLs and
+write-query exclusion behave as documented.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import langgraph_utile  # noqa: E402
+import neo4j_qa_cache  # noqa: E402
+from neo4j_qa_cache import Neo4jQACache  # noqa: E402
+
+CHAPTERS_CYPHER = (
+    "MATCH (c:Chapter)-[:HAS_UNIT]->(u:Unit) RETURN c.name as chapter_name, u.name as unit_name "
+    "ORDER BY c.order, u.order LIMIT 10"
+)
+ROWS = [{"chapter_name": "Place Value", "unit_name": "Tens and Ones"}]
+
+
+class FakeGraph:
+    def __init__(self):
+        self.queries = []
+
+    def query(self, cypher, params=None):
+        self.queries.append(cypher)
+        return list(ROWS)
+
+
+class FakeQAChain:
+    output_key = "text"
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, inputs, **kwargs):
+        self.calls += 1
+        return {"text": f"{inputs['context'][0]['chapter_name']} has {inputs['context'][0]['unit_name']}"}
+
+
+class FakeCypherChain:
+    output_key = "text"
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, inputs, **kwargs):
+        self.calls += 1
+        return {"text": CHAPTERS_CYPHER}
+
+
+class FakeChain:
+    cypher_query_corrector = None
+
+    def __init__(self):
+        self.graph = FakeGraph()
+        self.qa_chain = FakeQAChain()
+        self.cypher_generation_chain = FakeCypherChain()
+
+    @property
+    def generations(self):
+        return self.cypher_generation_chain.calls
+
+
+@contextlib.contextmanager
+def _fake_chain():
+    chain = FakeChain()
+    names = ("_build_neo4j_chain", "_neo4j_graph", "_neo4j_schema")
+    originals = [getattr(langgraph_utile, name) for name in names] + [neo4j_qa_cache._CACHE]
+    langgraph_utile._build_neo4j_chain = lambda *args, **kwargs: chain
+    langgraph_utile._neo4j_graph = lambda: chain.graph
+    langgraph_utile._neo4j_schema = lambda: "Node properties: Chapter {name}, Unit {name}"
+    neo4j_qa_cache._CACHE = Neo4jQACache()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield chain
+    finally:
+        for name, original in zip(names, originals):
+            setattr(langgraph_utile, name, original)
+        neo4j_qa_cache._CACHE = originals[-1]
+
+
+def _ask(question):
+    return json.loads(langgraph_utile._neo4j_retrieveqa_run({"question": question}))
+
+
+def test_repeat_question_skips_llm_and_neo4j():
+    with _fake_chain() as chain:
+        first = _ask("Which units belong to each chapter")
+        second = _ask("  which units belong to each CHAPTER? ")
+    assert chain.generations == 1, f"Cypher generated {chain.generations} times"
+    assert len(chain.graph.queries) == 1 and chain.qa_chain.calls == 1, "repeat question reached Neo4j or the QA LLM"
+    assert second["answer"] == first["answer"] and second["generated_cypher"] == CHAPTERS_CYPHER
+    assert second["context"] == ROWS, "cached rows missing from the payload"
+    print("✅ neo4j_retrieveqa: repeated question served without LLM or Neo4j calls")
+
+
+def test_invalidate_refetches_rows_only():
+    with _fake_chain() as chain:
+        _ask("Which units belong to each chapter")
+        seen = []
+        neo4j_qa_cache._CACHE.add_invalidation_hook(seen.append)
+        untouched = neo4j_qa_cache.invalidate_neo4j_cache(["User"])
+        dropped = neo4j_qa_cache.invalidate_neo4j_cache(["Unit"])
+        _ask("Which units belong to each chapter")
+    assert (untouched, dropped) == (0, 1), f"label invalidation dropped {untouched}/{dropped} entries"
+    assert seen == [frozenset({"User"}), frozenset({"Unit"})], f"hooks saw {seen}"
+    assert chain.generations == 1, "invalidating rows should keep the cached Cypher"
+    assert len(chain.graph.queries) == 2 and chain.qa_chain.calls == 2, "rows were not refetched after invalidation"
+    print("✅ invalidate(['Unit']): rows refetched, Cypher reused, hooks notified")
+
+
+def test_ttls_and_write_queries():
+    now = [0.0]
+    cache = Neo4jQACache(rows_ttl=60, curriculum_ttl=3600, clock=lambda: now[0])
+    cache.put_rows(CHAPTERS_CYPHER, ROWS)
+    leaderboard = "MATCH (u:User) WHERE u.xp IS NOT NULL RETURN u.name, u.xp ORDER BY u.xp DESC LIMIT 5"
+    cache.put_rows(leaderboard, [{"u.name": "Ana", "u.xp": 120}])
+    written = cache.put_rows("MATCH (u:User {id: 'x'}) SET u.xp = 5 RETURN u", [])
+    now[0] = 120
+    assert cache.get_rows(leaderboard) is None, "XP rows outlived ACE_NEO4J_ROWS_TTL_S"
+    assert cache.get_rows(CHAPTERS_CYPHER) is not None, "curriculum rows expired early"
+    assert written is None, "write query results were cached"
+    now[0] = 7200
+    assert cache.get_rows(CHAPTERS_CYPHER) is None, "curriculum rows never expired"
+    print("✅ Neo4jQACache: curriculum rows outlive user rows, write queries skipped")
+
+
+def main():
+    tests = [
+        ("Repeat question", test_repeat_question_skips_llm_and_neo4j),
+        ("Label invalidation", test_invalidate_refetches_rows_only),
+        ("TTLs", test_ttls_and_write_queries),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} Neo4j QA cache test(s) failed")
+        return 1
+    print("🎉 ALL NEO4J QA CACHE TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Parallel ReAct tool execution tests.
+
+Runs `solve_react` with a stub `LLM` that asks for several tools in one turn
+and with slow stand-ins for the network tools (no Gemini, Google or Neo4j
+needed). Checks that the calls overlap and that their results are appended
+to the trace in the order Gemini requested them.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import langgraph_utile  # noqa: E402
+
+TOOL_LATENCY = 0.1
+
+
+def _call(name, **args):
+    return {"id": name, "type": "function", "function": {"name": name, "arguments": json.dumps(args)}}
+
+
+class StubLLM(langgraph_utile.LLM):
+    def chat(self, messages, **kwargs):
+        if messages[-1]["role"] != "tool":
+            return {"choices": [{"message": {"content": "", "tool_calls": [
+                _call("google_search", query="slow search"),
+                _call("neo4j_retrieveqa", question="which quiz is next?"),
+                _call("calculator", expression="2 + 2"),
+                _call("google_search", query="fast search"),
+            ]}}]}
+        return {"choices": [{"message": {"content": "<final>4</final>"}}]}
+
+
+def _slow_search(args):
+    time.sleep(TOOL_LATENCY * (2 if args["query"] == "slow search" else 1))
+    return f"search:{args['query']}"
+
+
+def _slow_neo4j(args):
+    time.sleep(TOOL_LATENCY)
+    return json.dumps({"answer": args["question"]})
+
+
+@contextlib.contextmanager
+def _stubs():
+    originals = (langgraph_utile.LLM, langgraph_utile._google_search_run, langgraph_utile._neo4j_retrieveqa_run)
+    langgraph_utile.LLM = StubLLM
+    langgraph_utile._google_search_run = _slow_search
+    langgraph_utile._neo4j_retrieveqa_run = _slow_neo4j
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        langgraph_utile.LLM, langgraph_utile._google_search_run, langgraph_utile._neo4j_retrieveqa_run = originals
+
+
+def test_tools_overlap_and_keep_order():
+    state = {"messages": [{"role": "user", "content": "What is 2 + 2?"}], "mode": "react", "scratch": {}, "result": {}}
+    with _stubs():
+        start = time.perf_counter()
+        result = langgraph_utile.solve_react(state)
+        elapsed = time.perf_counter() - start
+    tool_msgs = [m for m in result["trace"] if m["role"] == "tool"]
+    assert result["answer"] == "4", f"unexpected answer {result['answer']}"
+    assert [m["name"] for m in tool_msgs] == ["google_search", "neo4j_retrieveqa", "calculator", "google_search"], (
+        f"tool results out of order: {[m['name'] for m in tool_msgs]}"
+    )
+    assert tool_msgs[0]["content"] == "search:slow search" and tool_msgs[3]["content"] == "search:fast search", (
+        "search results swapped"
+    )
+    serial = TOOL_LATENCY * 4  # slow search 0.2 s + Neo4j QA 0.1 s + fast search 0.1 s
+    assert elapsed < serial * 0.75, f"tools took {elapsed:.2f}s; serial would be {serial:.2f}s"
+    print(f"✅ solve_react: 4 tool calls in {elapsed:.2f}s (serial ~{serial:.2f}s), results in call order")
+
+
+def main():
+    tests = [
+        ("Parallel tools in order", test_tools_overlap_and_keep_order),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} ReAct tool test(s) failed")
+        return 1
+    print("🎉 ALL REACT TOOL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
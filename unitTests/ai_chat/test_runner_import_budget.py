@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Import-time budget test for the ACE runner entry point.
+
+Cold-imports frontend/scripts/run_ace_agent.py in a fresh interpreter with
+`python -X importtime` and fails when:
+- any tool-only package (mcp, langchain_community, langchain_google_genai,
+  tavily) is imported at startup, or
+- total import time exceeds ACE_IMPORT_BUDGET_MS (default 2000 ms).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+BUDGET_MS = float(os.getenv("ACE_IMPORT_BUDGET_MS", "2000"))
+
+
+def test_deferred_imports_not_loaded():
+    from run_ace_agent import import_time_report
+
+    report = import_time_report()
+    assert not report["deferred_loaded"], (
+        f"Tool-only packages imported at startup: {report['deferred_loaded']}"
+    )
+    print("✅ Import Budget: no tool-only packages loaded at startup")
+
+
+def test_import_time_within_budget():
+    from run_ace_agent import import_time_report
+
+    report = import_time_report()
+    print(f"   run_ace_agent cold import: {report['total_ms']:.1f} ms (budget {BUDGET_MS:.0f} ms)")
+    for name, ms in report["slowest"][:5]:
+        print(f"   {ms:9.1f} ms  {name}")
+    assert report["total_ms"] <= BUDGET_MS, (
+        f"Import time {report['total_ms']:.1f} ms exceeds budget {BUDGET_MS:.0f} ms"
+    )
+    print("✅ Import Budget: cold import within budget")
+
+
+def main():
+    tests = [
+        ("Deferred imports", test_deferred_imports_not_loaded),
+        ("Import time budget", test_import_time_within_budget),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} import budget test(s) failed")
+        return 1
+    print("🎉 ALL IMPORT BUDGET TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
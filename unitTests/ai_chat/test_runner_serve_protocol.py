@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Resident runner protocol test.
+
+Starts `run_ace_agent.serve()` in a fresh interpreter with a stub LangGraph
+app (no Gemini or Neo4j needed), feeds it newline-delimited requests on
+stdin and fails when:
+- the first stdout line is not the `{"ready": true}` handshake,
+- a response does not echo its request id, or a malformed line does not
+  get an error response,
+- anything printed by the graph or its tools reaches stdout instead of
+  stderr.
+
+The one-shot `main()` used by ACE_RUNNER_MODE=spawn gets the same stub and
+must print nothing but its JSON answer line to stdout.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPT_DIR = PROJECT_ROOT / "frontend" / "scripts"
+
+TOOL_CHATTER = "tool chatter that must stay off the protocol stream"
+
+# Runs in the child: swap the graph for a stub, then run ENTRY on stdin.
+_STUB_RUNNER = f"""
+import sys
+import run_ace_agent
+
+
+class StubApp:
+    def invoke(self, state, config=None):
+        print({TOOL_CHATTER!r})
+        question = state["messages"][-1]["content"]
+        return {{"result": {{"answer": "echo: " + question}}, "mode": "cot", "scratch": {{}}}}
+
+
+def build_stub_graph(use_checkpointer=True):
+    print("graph built")  # outside _invoke's capture
+    return StubApp()
+
+
+run_ace_agent.build_ace_graph = build_stub_graph
+run_ace_agent._warm_storage = lambda: print({TOOL_CHATTER!r})
+run_ace_agent._drain_background_learning = lambda: print("learning drained")
+sys.exit(run_ace_agent.ENTRY())
+"""
+
+
+def _request(request_id, content):
+    return json.dumps({"id": request_id, "messages": [{"role": "user", "content": content}]})
+
+
+def _run(entry, stdin):
+    env = dict(os.environ, GEMINI_API_KEY=os.environ.get("GEMINI_API_KEY", "test-key"))
+    proc = subprocess.run(
+        [sys.executable, "-c", _STUB_RUNNER.replace("ENTRY", entry)],
+        cwd=str(SCRIPT_DIR),
+        input=stdin,
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=120,
+    )
+    assert proc.returncode == 0, f"{entry}() exited with {proc.returncode}:\n{proc.stderr[-2000:]}"
+    return proc
+
+
+def _serve(lines):
+    return _run("serve", "\n".join(lines) + "\n")
+
+
+def test_round_trip():
+    proc = _serve([
+        _request("req-1", "What is 7 + 5?"),
+        "",
+        "{not json",
+        _request(42, "Name a prime"),
+        json.dumps({"id": "req-bad", "messages": "not a list"}),
+    ])
+    out_lines = proc.stdout.splitlines()
+    try:
+        replies = [json.loads(line) for line in out_lines]
+    except json.JSONDecodeError as exc:
+        raise AssertionError(f"non-JSON line on the protocol stream: {exc}\n{proc.stdout}")
+
+    ready, *responses = replies
+    assert ready.get("ready") is True and isinstance(ready.get("pid"), int), f"bad handshake: {ready}"
+    assert len(responses) == 4, f"expected 4 responses (blank line skipped), got {len(responses)}"
+    first, malformed, second, invalid = responses
+    assert first["id"] == "req-1" and first["answer"] == "echo: What is 7 + 5?", f"first reply: {first}"
+    assert "Invalid JSON payload" in malformed["error"] and "id" not in malformed, f"malformed reply: {malformed}"
+    assert second["id"] == 42 and second["answer"] == "echo: Name a prime", f"second reply: {second}"
+    assert invalid["id"] == "req-bad" and "error" in invalid, f"invalid payload reply: {invalid}"
+    print("✅ serve(): ready handshake, ids echoed, malformed and invalid lines answered with errors")
+
+
+def test_prints_stay_off_stdout():
+    proc = _serve([_request("req-1", "What is 7 + 5?")])
+    assert TOOL_CHATTER not in proc.stdout and "graph built" not in proc.stdout, (
+        f"print output leaked onto the protocol stream:\n{proc.stdout}"
+    )
+    assert TOOL_CHATTER in proc.stderr and "graph built" in proc.stderr, "print output was lost instead of logged"
+    assert len(proc.stdout.splitlines()) == 2, f"unexpected stdout lines:\n{proc.stdout}"
+    print("✅ serve(): graph and tool prints go to stderr, stdout carries only protocol lines")
+
+
+def test_spawn_mode_prints_only_the_answer():
+    proc = _run("main", _request("req-1", "What is 7 + 5?"))
+    out_lines = proc.stdout.splitlines()
+    assert len(out_lines) == 1, f"spawn-mode stdout is not a single line:\n{proc.stdout}"
+    assert json.loads(out_lines[0])["answer"] == "echo: What is 7 + 5?", f"answer line: {out_lines[0]}"
+    for text in ("graph built", TOOL_CHATTER, "learning drained"):
+        assert text not in proc.stdout and text in proc.stderr, f"{text!r} was not routed to stderr"
+    print("✅ main(): stdout carries only the answer line; graph and learning prints go to stderr")
+
+
+def main():
+    tests = [
+        ("NDJSON round trip", test_round_trip),
+        ("Stdout isolation", test_prints_stay_off_stdout),
+        ("Spawn-mode stdout", test_spawn_mode_prints_only_the_answer),
+    ]
+    failed = 0
+    for name, func in tests:
+        print(f"\n--- Testing: {name} ---")
+        try:
+            func()
+        except AssertionError as exc:
+            print(f"❌ {name}: {exc}")
+            failed += 1
+        except Exception as exc:
+            print(f"❌ {name}: Failed - {exc}")
+            failed += 1
+
+    print()
+    if failed:
+        print(f"⚠️  {failed} runner protocol test(s) failed")
+        return 1
+    print("🎉 ALL RUNNER PROTOCOL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())